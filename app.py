@@ -1,17 +1,39 @@
-from flask import Flask, render_template, redirect, url_for, flash, request, session, jsonify
-from flask_mysqldb import MySQL
+from flask import Flask, render_template, redirect, url_for, flash, request, session, jsonify, g
+from services.db_pool import MySQLPool, query_count
+from services.board_registry import BoardRegistry
+from services.ad_rotation import AdRotation
+from services.homepage import HomepageSnapshot
+from services.view_counter import ViewCountBuffer
+from services.user_cache import UserCache
+from services.block_list import BlockList
+from services.thumbnails import ThumbnailWorker, generate_derivatives, iter_uploads
+from services.media_store import store_upload, store_file, fold_existing_uploads, remove_folded_files
+from services.chunked_upload import ChunkedUploads, UploadError
+from services.assets import AssetManifest, build_assets, fetch_vendor_assets
+from services.page_cache import PageCache
+from services.lazy_context import lazy_value, memoized, context_stats
+from services.warmup import warm_up, compile_templates, format_report
+from services.post_likes import has_liked
+from services.workers import on_worker_start, every, start_local_timers
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from flask_wtf.csrf import CSRFProtect, generate_csrf
+from flask_wtf.csrf import CSRFProtect, CSRFError, generate_csrf
+from jinja2 import FileSystemBytecodeCache
 from datetime import datetime, timedelta
 import os
 from werkzeug.utils import secure_filename
 import secrets
 from markupsafe import Markup
 import json
-import re
-import random
-import pytz
+import click
+import time
+from services.post_counters import reconcile_post_counters
+from services.notifications import get_notification_counts, reconcile_notification_counts
+from services.post_scores import decay_post_scores, rebuild_post_scores, DECAY_INTERVAL
+from services.search import rebuild_search_index
+from services.post_render import get_embed_url, rerender_stale_posts
+from services.post_media import rebuild_post_media, record_thumbnail
+from services.schema import pending_migrations, apply_migration, verify_schema, MigrationError
 
 # 애플리케이션 팩토리 패턴 적용
 def create_app():
@@ -40,11 +62,22 @@ def create_app():
     #app.config['MYSQL_PASSWORD'] = 'tjsrbQhshd!@34' # MySQL 비밀번호 설정
     app.config['MYSQL_DB'] = 'blackcombat'
     app.config['MYSQL_CURSORCLASS'] = 'DictCursor'
+    # 커넥션 풀 설정 (워커 프로세스별, uwsgi threads 수 기준)
+    app.config['MYSQL_POOL_SIZE'] = 4  # 요청 스레드 수 (flask.ini threads)
+    app.config['MYSQL_POOL_BACKGROUND_SIZE'] = 2  # 홈 화면 스냅샷, 조회수 반영, 점수 감쇠 등 백그라운드 작업용
+    app.config['MYSQL_POOL_TIMEOUT'] = 10  # 커넥션 대기 최대 시간(초)
+    app.config['MYSQL_POOL_MAX_LIFETIME'] = 3600  # 커넥션 최대 수명(초)
     app.config['UPLOAD_FOLDER'] = 'static/uploads'
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 최대 16MB 파일
+    app.config['CONTEXT_QUERY_WARN'] = 1  # 템플릿 컨텍스트 쿼리가 이보다 많으면 로그 (알림 카운터 캐시 미스 1회)
+    app.config['JINJA_BYTECODE_CACHE_DIR'] = os.path.join(app.root_path, 'tmp', 'jinja')
     
-    # MySQL, Bcrypt, LoginManager 초기화
-    mysql = MySQL(app)
+    # 컴파일한 템플릿을 파일로 캐시해 재시작된 워커도 다시 컴파일하지 않음
+    os.makedirs(app.config['JINJA_BYTECODE_CACHE_DIR'], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['JINJA_BYTECODE_CACHE_DIR'])
+    
+    # MySQL(커넥션 풀), Bcrypt, LoginManager 초기화
+    mysql = MySQLPool(app)
     bcrypt = Bcrypt(app)
     login_manager = LoginManager(app)
     login_manager.login_view = 'auth.login'  # 로그인 페이지 경로 설정
@@ -57,6 +90,26 @@ def create_app():
     # Extensions를 current_app에서 접근할 수 있도록 등록
     app.extensions['mysql'] = mysql
     app.extensions['bcrypt'] = bcrypt
+    # 게시판 목록 메모리 캐시
+    app.extensions['boards'] = BoardRegistry(app)
+    # 광고 로테이션 메모리 캐시
+    app.extensions['ads'] = AdRotation(app)
+    # 홈 화면 스냅샷
+    app.extensions['homepage'] = HomepageSnapshot(app)
+    # 조회수 쓰기 지연 버퍼
+    app.extensions['views'] = ViewCountBuffer(app)
+    # 로그인 사용자 정보 메모리 캐시
+    app.extensions['users'] = UserCache(app)
+    # IP/사용자 차단 목록 메모리 캐시
+    app.extensions['blocks'] = BlockList(app)
+    # 업로드 이미지 썸네일 생성 워커
+    app.extensions['thumbnails'] = ThumbnailWorker(app)
+    # 분할(청크) 이미지 업로드
+    app.extensions['chunked_uploads'] = ChunkedUploads(app)
+    # 정적 파일 지문(해시) 주소와 immutable 캐시
+    app.extensions['assets'] = AssetManifest(app)
+    # 비로그인 방문자용 전체 페이지 캐시
+    app.extensions['pages'] = PageCache(app)
 
     # Blueprint 등록은 create_app 함수 내부에서
     from routes.auth import auth
@@ -69,7 +122,52 @@ def create_app():
     
     return app, mysql, bcrypt, login_manager, csrf
 
+app_load_start = time.perf_counter()
 app, mysql, bcrypt, login_manager, csrf = create_app()
+APP_LOAD_MS = round((time.perf_counter() - app_load_start) * 1000, 1)
+
+# 워커 시작(fork) 직후 캐시/홈 화면 스냅샷/템플릿을 미리 준비하고 소요 시간을 기록
+@on_worker_start
+def warm_worker_caches():
+    with app.app_context():
+        report = warm_up([
+            ('boards', app.extensions['boards'].load),
+            ('ads', app.extensions['ads'].load),
+            ('blocks', app.extensions['blocks'].load),
+            ('homepage', app.extensions['homepage'].get),
+            ('templates', lambda: compile_templates(app)),
+        ])
+    report['app_load_ms'] = APP_LOAD_MS
+    app.extensions['startup_report'] = report
+    print(f"{format_report(report)} (앱 로딩 {APP_LOAD_MS}ms)")
+
+# 썸네일이 만들어지면 아직 원본을 가리키는 게시글 대표 이미지(cover_thumb)를 썸네일 경로로 변경
+@app.extensions['thumbnails'].on_generated
+def record_post_thumbnail(relpath):
+    with app.app_context():
+        cur = mysql.connection.cursor()
+        record_thumbnail(cur, relpath)
+        mysql.connection.commit()
+        cur.close()
+
+# 인기글 점수 주기적 감쇠 (uwsgi에서는 워커 하나에서만 실행)
+@every(DECAY_INTERVAL)
+def decay_hot_scores():
+    with app.app_context():
+        cur = mysql.connection.cursor()
+        decay_post_scores(cur)
+        mysql.connection.commit()
+        cur.close()
+
+# 완료되지 않은 분할 업로드 임시 파일 정리 (uwsgi에서는 워커 하나에서만 실행)
+@every(3600)
+def cleanup_chunked_uploads():
+    removed = app.extensions['chunked_uploads'].cleanup()
+    if removed:
+        print(f"미완료 분할 업로드 {removed}개 정리")
+
+# uwsgi 없이 실행하면(python app.py) 첫 요청에서 주기 작업 스레드 시작 (flask CLI 명령에서는 시작하지 않음)
+app.before_request(start_local_timers)
 
 # CSRF 예외 경로 추가 (필요한 경우)
 @csrf.exempt
@@ -83,10 +181,8 @@ def load_user(user_id):
         # user_id가 올바른 형식인지 확인
         user_id = int(user_id)
         
-        cursor = mysql.connection.cursor()
-        cursor.execute('SELECT * FROM users WHERE id = %s', (user_id,))
-        user = cursor.fetchone()
-        cursor.close()
+        # 캐시된 사용자 정보 사용 (변경 시 UserCache.bump()로 무효화)
+        user = app.extensions['users'].get(user_id)
         
         if user:
             # 실제 UserMixin 상속 클래스 반환
@@ -103,18 +199,34 @@ def load_user(user_id):
     
     return None
 
+# 로그인 세션의 닉네임/권한을 현재 사용자 정보에 맞춤 (관리자가 바꾼 권한이 다음 요청부터 반영되도록)
+@app.before_request
+def sync_session_user():
+    if not session.get('loggedin'):
+        return
+    try:
+        user = app.extensions['users'].get(session['id'])
+    except Exception as e:
+        print(f"Error syncing session user: {e}")
+        return
+    
+    if user is None:
+        # 삭제된 회원은 로그아웃 처리
+        logout_user()
+        session.clear()
+        return
+    for key in ('nickname', 'is_admin', 'is_vip'):
+        if session.get(key) != user[key]:
+            session[key] = user[key]
+
 # 전역 컨텍스트 프로세서
-@app.context_processor
-def inject_board_list():
+# 템플릿 공통 값은 지연 계산 (템플릿에서 실제로 사용할 때만 요청당 한 번 계산)
+def load_board_list():
     try:
-        cursor = mysql.connection.cursor()
-        cursor.execute('SELECT id, name, route FROM boards ORDER BY id')
-        boards = cursor.fetchall()
-        cursor.close()
-        return dict(boards=boards)
+        return app.extensions['boards'].all()
     except:
         # DB 연결 실패 등의 경우 기본값 사용
-        boards = [
+        return [
             {'id': 1, 'name': '자유', 'route': 'free'},
             {'id': 2, 'name': '익명', 'route': 'anonymous'},
             {'id': 3, 'name': '경기소식', 'route': 'game_news'},
@@ -124,11 +236,36 @@ def inject_board_list():
             {'id': 7, 'name': '질문', 'route': 'question'},
             {'id': 8, 'name': '선수응원', 'route': 'support'}
         ]
-        return dict(boards=boards)
+
+def load_csrf_token():
+    # 공유(캐시) 페이지에는 토큰을 넣지 않고 viewer_fragment 로 따로 받음
+    if g.get('shared_page'):
+        return ''
+    return generate_csrf()
+
+def load_notification_counts():
+    if 'loggedin' in session and session['loggedin']:
+        try:
+            # 읽지 않은 쪽지 수, 친구 요청 수 (사용자별 카운터, 메모리 캐시)
+            return get_notification_counts(mysql, session['id'])
+        except:
+            # 오류 발생 시 기본값 제공
+            return dict(unread_count=0, friend_request_count=0)
+    # 로그인하지 않은 경우 0으로 설정
+    return dict(unread_count=0, friend_request_count=0)
+
+notification_counts = memoized('notification_counts', load_notification_counts)
+
+LAZY_CONTEXT = dict(
+    boards=lazy_value('boards', load_board_list),
+    csrf_token=lazy_value('csrf_token', load_csrf_token),
+    unread_count=lazy_value('unread_count', lambda: notification_counts()['unread_count']),
+    friend_request_count=lazy_value('friend_request_count', lambda: notification_counts()['friend_request_count']),
+)
 
 @app.context_processor
-def inject_csrf_token():
-    return dict(csrf_token=generate_csrf())
+def inject_lazy_context():
+    return LAZY_CONTEXT
 
 # VIP 타입 정보를 템플릿에 제공하는 함수
 @app.context_processor
@@ -136,29 +273,15 @@ def inject_vip_types():
     # VIP 타입 상수 정의
     return dict(VIP_YELLOW=1, VIP_BLUE=2)
 
-# 알림 정보 주입
-@app.context_processor
-def inject_notification_counts():
-    if 'loggedin' in session and session['loggedin']:
-        try:
-            cur = mysql.connection.cursor()
-            
-            # 읽지 않은 쪽지 수 확인
-            cur.execute('SELECT COUNT(*) as unread_count FROM messages WHERE receiver_id = %s AND is_read = 0 AND receiver_deleted = 0', (session['id'],))
-            unread_count = cur.fetchone()['unread_count']
-            
-            # 친구 요청 수 확인
-            cur.execute('SELECT COUNT(*) as request_count FROM friendships WHERE friend_id = %s AND status = "pending"', (session['id'],))
-            friend_request_count = cur.fetchone()['request_count']
-            
-            cur.close()
-            return dict(unread_count=unread_count, friend_request_count=friend_request_count)
-        except:
-            # 오류 발생 시 기본값 제공
-            return dict(unread_count=0, friend_request_count=0)
-    else:
-        # 로그인하지 않은 경우 0으로 설정
-        return dict(unread_count=0, friend_request_count=0)
+# 요청별 쿼리 수 기록 (지연 컨텍스트에서 실행된 쿼리는 따로 표시)
+@app.after_request
+def report_query_counts(response):
+    stats = context_stats()
+    response.headers['X-DB-Queries'] = str(query_count())
+    response.headers['X-Context-Queries'] = str(stats['queries'])
+    if stats['queries'] > app.config['CONTEXT_QUERY_WARN']:
+        print(f"템플릿 컨텍스트 쿼리 {stats['queries']}회 ({request.endpoint}): {', '.join(stats['resolved'])}")
+    return response
 
 # 이미지 업로드 API 엔드포인트
 @app.route('/upload_image', methods=['POST'])
@@ -188,152 +311,141 @@ def upload_image():
         return jsonify({'success': False, 'error': '파일 크기가 16MB를 초과합니다.'})
     
     try:
-        seoul_timezone = pytz.timezone('Asia/Seoul')
-        filename = secure_filename(file.filename or '')
-        filename = f"{datetime.now(seoul_timezone).strftime('%Y%m%d%H%M%S')}_{random.randint(1000, 9999)}_{filename}"
-        
-        upload_folder = os.path.join(app.root_path, app.config['UPLOAD_FOLDER'])
-        os.makedirs(upload_folder, exist_ok=True)
-        
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
+        # 같은 내용의 파일은 해시로 찾아 기존 경로를 그대로 반환 (디스크에 다시 쓰지 않음)
+        cur = mysql.connection.cursor()
+        relpath, created = store_upload(cur, app.static_folder, file.stream, secure_filename(file.filename or ''))
+        mysql.connection.commit()
+        cur.close()
         
-        relative_path = os.path.join('static', 'uploads', filename).replace('\\', '/')
+        relative_path = f'static/{relpath}'
+        if created:
+            # 목록/홈 카드용 썸네일은 백그라운드에서 생성
+            app.extensions['thumbnails'].enqueue(relative_path)
         
         return jsonify({'success': True, 'path': relative_path})
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+def upload_error_response(e):
+    body = {'success': False, 'error': str(e)}
+    if e.received is not None:
+        body['received'] = e.received
+    return jsonify(body), e.status
+
+# 분할 업로드 시작: {"filename", "size"} -> {"upload_id", "chunk_size", "received"}
+@app.route('/upload_image/chunked', methods=['POST'])
+def chunked_upload_init():
+    data = request.get_json(silent=True) or {}
+    try:
+        state = app.extensions['chunked_uploads'].create(secure_filename(data.get('filename') or ''), data.get('size'))
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify(dict(state, success=True))
+
+# 분할 업로드 상태 확인(GET, 이어 보낼 위치) / 청크 추가(PUT, ?offset=받은 크기, 본문은 파일 조각)
+@app.route('/upload_image/chunked/<upload_id>', methods=['GET', 'PUT'])
+def chunked_upload_chunk(upload_id):
+    uploads = app.extensions['chunked_uploads']
+    try:
+        if request.method == 'GET':
+            state = uploads.status(upload_id)
+        else:
+            state = uploads.append(upload_id, request.args.get('offset', -1, type=int),
+                                   request.stream, request.content_length)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify(dict(state, success=True))
+
+# 분할 업로드 완료: 내용 주소 저장소로 옮기고 upload_image 와 같은 형식으로 응답
+@app.route('/upload_image/chunked/<upload_id>/finalize', methods=['POST'])
+def chunked_upload_finalize(upload_id):
+    uploads = app.extensions['chunked_uploads']
+    try:
+        part_path, filename, sha256, size = uploads.finalize(upload_id)
+        cur = mysql.connection.cursor()
+        relpath, created = store_file(cur, app.static_folder, part_path, sha256, size, filename)
+        mysql.connection.commit()
+        cur.close()
+    except UploadError as e:
+        return upload_error_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    uploads.discard(upload_id)
+
+    relative_path = f'static/{relpath}'
+    if created:
+        app.extensions['thumbnails'].enqueue(relative_path)
+    return jsonify({'success': True, 'path': relative_path})
+
 # 홈페이지 라우트
 @app.route('/')
 def index():
-    cur = mysql.connection.cursor()
-
     user_agent = request.headers.get('User-Agent')
     is_mobile = 'Mobile' in user_agent
     
-    # 베스트 게시글 가져오기 (좋아요 수 기준)
-    cur.execute('''
-        SELECT 
-            posts.id, 
-            posts.title, 
-            posts.created_at, 
-            posts.view_count, 
-            CASE 
-                WHEN boards.route = 'anonymous' THEN '익명' 
-                ELSE users.nickname 
-            END as nickname,
-            CASE 
-                WHEN boards.route = 'anonymous' THEN NULL 
-                ELSE users.is_vip 
-            END as is_vip,
-            boards.name as board_name, 
-            (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count,
-            (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-            boards.route as board_route
-        FROM posts 
-        LEFT JOIN users ON posts.user_id = users.id
-        JOIN boards ON posts.board_id = boards.id
-        ORDER BY like_count DESC, posts.created_at DESC
-        LIMIT 8
-    ''')
-    best_posts = cur.fetchall()
+    # 베스트/게시판별 최신/실시간 게시글 (홈 화면 스냅샷, DB 조회 없음)
+    snapshot = app.extensions['homepage'].get()
     
-    # 각 게시판별 최신 게시글
-    board_posts = {}
-    
-    # 게시판 목록 가져오기
-    try:
-        cur.execute('SELECT id, name, route FROM boards ORDER BY id')
-        board_list = cur.fetchall()
-    except:
-        # DB 오류시 기본값 사용
-        board_list = inject_board_list()['boards']
-    
-    for board in board_list:
-        # 익명 게시판은 별도 처리 (user_id가 0인 게시물도 조회)
-        if board['route'] == 'anonymous':
-            cur.execute('''
-                SELECT posts.id, posts.title, posts.created_at, posts.view_count, images_data,
-                       '익명' as nickname, NULL as is_vip, boards.route as board_route, boards.name as board_name,
-                       (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-                       (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count
-                FROM posts 
-                JOIN boards ON posts.board_id = boards.id
-                WHERE posts.board_id = %s
-                ORDER BY posts.created_at DESC
-                LIMIT 8
-            ''', (board['id'],))
-        else:
-            cur.execute('''
-                SELECT posts.id, posts.title, posts.created_at, posts.view_count, images_data,
-                        users.nickname, users.is_vip, boards.route as board_route, boards.name as board_name,
-                       (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-                       (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count
-                FROM posts 
-                JOIN users ON posts.user_id = users.id
-                JOIN boards ON posts.board_id = boards.id
-                WHERE posts.board_id = %s
-                ORDER BY posts.created_at DESC
-                LIMIT 8
-            ''', (board['id'],))
-        board_posts[board['route']] = cur.fetchall()
-    
-    # 실시간 게시글 (모든 게시판에서 최신순으로)
-    cur.execute('''
-        SELECT 
-            posts.id, 
-            posts.title, 
-            posts.created_at, 
-            posts.view_count, 
-            CASE 
-                WHEN boards.route = 'anonymous' THEN '익명' 
-                ELSE users.nickname 
-            END as nickname,
-            CASE 
-                WHEN boards.route = 'anonymous' THEN NULL 
-                ELSE users.is_vip 
-            END as is_vip,
-            boards.name as board_name, 
-            boards.route as board_route,
-            (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count,
-            (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count
-        FROM posts 
-        LEFT JOIN users ON posts.user_id = users.id
-        JOIN boards ON posts.board_id = boards.id
-        ORDER BY posts.created_at DESC
-        LIMIT 15
-    ''')
-    realtime_posts = cur.fetchall()
-    
-    # 광고 가져오기 - 위치별로 구분
-    banner_ad = None
-    sidebar_ad = None
-    footer_ad = None
-    center_ad = None
+    # 비로그인 방문자는 스냅샷이 바뀌기 전까지 렌더링된 페이지를 재사용 (공지/닉네임/VIP 변경은 'site' 알림으로 비움)
+    pages = app.extensions['pages']
+    cache_key = ('index', request.full_path, is_mobile, snapshot['built_at'])
+    cached = pages.cached_response(cache_key)
+    if cached:
+        return cached
+    best_posts = snapshot['best_posts']
+    board_posts = snapshot['board_posts']
+    realtime_posts = snapshot['realtime_posts']
     
+    # 광고 가져오기 - 위치별로 구분 (메모리 캐시에서 선택)
     # 메인 배너 광고
-    cur.execute('SELECT * FROM ads WHERE position = "banner" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    banner_ad = cur.fetchone()
+    banner_ad = app.extensions['ads'].pick('banner')
     
     # 사이드바 광고
-    cur.execute('SELECT * FROM ads WHERE position = "side" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    sidebar_ad = cur.fetchone()
+    sidebar_ad = app.extensions['ads'].pick('side')
     
     # 푸터 광고
-    cur.execute('SELECT * FROM ads WHERE position = "footer" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    footer_ad = cur.fetchone()
+    footer_ad = app.extensions['ads'].pick('footer')
 
     # 푸터 광고
-    cur.execute('SELECT * FROM ads WHERE position = "center" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    center_ad = cur.fetchone()
+    center_ad = app.extensions['ads'].pick('center')
     
-    cur.close()
-    return render_template('index.html', best_posts=best_posts, now=datetime.now(), board_posts=board_posts, 
+    return pages.render(cache_key, [('homepage',)], 'index.html', best_posts=best_posts, now=datetime.now(), board_posts=board_posts, 
                           realtime_posts=realtime_posts, banner_ad=banner_ad, 
                           sidebar_ad=sidebar_ad, footer_ad=footer_ad, center_ad=center_ad, is_mobile=is_mobile)
 
+# 공유(캐시) 페이지에서 토큰 없이 보낸 폼 (JS를 끄거나 viewer_fragment 를 받기 전)
+# 플래시 메시지가 있는 페이지는 캐시를 쓰지 않으므로, 돌아간 페이지에는 토큰이 들어 있어 다시 보내면 처리됨
+@app.errorhandler(CSRFError)
+def handle_csrf_error(e):
+    if request.form.get('csrf_token'):
+        return e
+    flash('페이지를 새로 불러왔습니다. 다시 시도해 주세요.', 'warning')
+    referrer = request.referrer
+    if referrer and referrer.startswith(request.host_url):
+        return redirect(referrer)
+    return redirect(url_for('index'))
+
+# 공유(캐시) 페이지의 사용자별 정보: CSRF 토큰, 게시글 추천 여부/추천 수
+@app.route('/fragment/viewer')
+def viewer_fragment():
+    data = {'csrf_token': generate_csrf()}
+    post_id = request.args.get('post_id', type=int)
+    if post_id:
+        cur = mysql.connection.cursor()
+        cur.execute('SELECT like_count FROM posts WHERE id = %s', (post_id,))
+        post = cur.fetchone()
+        if post:
+            data['like_count'] = post['like_count']
+            if 'loggedin' in session:
+                data['is_liked'] = has_liked(cur, post_id, user_id=session['id'])
+            else:
+                data['is_liked'] = has_liked(cur, post_id, ip_address=request.remote_addr)
+        cur.close()
+    response = jsonify(data)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 # robots.txt와 sitemap.xml 라우트 추가
 @app.route('/robots.txt')
 def robots_txt():
@@ -364,33 +476,129 @@ def from_json(value):
     except (ValueError, TypeError):
         return []
 
-# 동영상 URL을 임베드 URL로 변환하는 함수
-@app.template_global()
-def get_embed_url(url):
-    """
-    동영상 URL을 임베드 URL로 변환합니다.
-    지원: YouTube, Vimeo, 네이버TV 등
-    """
-    # YouTube
-    youtube_regex = r'(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})'
-    youtube_match = re.search(youtube_regex, url)
-    if youtube_match:
-        return f'https://www.youtube.com/embed/{youtube_match.group(1)}'
+# 동영상 URL을 임베드 URL로 변환하는 함수 (services/post_render.py)
+app.add_template_global(get_embed_url, 'get_embed_url')
+
+# 게시글 댓글/좋아요, 사용자 알림 카운터 보정 명령 (flask --app app reconcile-counters)
+@app.cli.command('reconcile-counters')
+@click.option('--post-id', type=int, default=None, help='특정 게시글만 보정합니다. (알림 카운터는 건너뜀)')
+def reconcile_counters_command(post_id):
+    cur = mysql.connection.cursor()
+    fixed = reconcile_post_counters(cur, post_id)
+    if post_id is None:
+        reconcile_notification_counts(cur)
+    mysql.connection.commit()
+    cur.close()
+    click.echo(f'카운터 보정 완료: {fixed}개 게시글')
+
+# 인기글 점수 재계산 (flask --app app rebuild-scores)
+@app.cli.command('rebuild-scores')
+def rebuild_scores_command():
+    cur = mysql.connection.cursor()
+    count = rebuild_post_scores(cur)
+    mysql.connection.commit()
+    cur.close()
+    click.echo(f'인기글 점수 재계산 완료: {count}개 게시글')
+
+# 검색 색인 재생성 (flask --app app rebuild-search-index)
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    cur = mysql.connection.cursor()
+    count = rebuild_search_index(cur)
+    mysql.connection.commit()
+    cur.close()
+    click.echo(f'검색 색인 재생성 완료: {count}개 문서')
+
+# 이전 렌더러 버전으로 저장된 게시글 본문 다시 렌더링 (flask --app app rerender-posts)
+@app.cli.command('rerender-posts')
+def rerender_posts_command():
+    cur = mysql.connection.cursor()
+    count = rerender_stale_posts(cur)
+    mysql.connection.commit()
+    cur.close()
+    click.echo(f'게시글 본문 렌더링 완료: {count}개 게시글')
+
+# 게시글 이미지 목록/대표 썸네일 재생성 (flask --app app rebuild-post-media)
+@app.cli.command('rebuild-post-media')
+def rebuild_post_media_command():
+    cur = mysql.connection.cursor()
+    count = rebuild_post_media(cur, app.static_folder)
+    mysql.connection.commit()
+    cur.close()
+    click.echo(f'게시글 이미지 목록 재생성 완료: 이미지가 있는 게시글 {count}개')
+
+# 기존 업로드 이미지 썸네일 일괄 생성 (flask --app app generate-thumbnails)
+@app.cli.command('generate-thumbnails')
+@click.option('--force', is_flag=True, help='이미 있는 썸네일도 다시 만듭니다.')
+def generate_thumbnails_command(force):
+    count = 0
+    for relpath in iter_uploads(app.static_folder):
+        try:
+            count += generate_derivatives(app.static_folder, relpath, force=force)
+        except Exception as e:
+            click.echo(f'썸네일 생성 실패 ({relpath}): {e}')
+    click.echo(f'썸네일 생성 완료: {count}개 파일')
+
+# 기존 업로드를 내용 주소 경로로 옮기고 중복 파일 정리 (flask --app app fold-uploads)
+@app.cli.command('fold-uploads')
+def fold_uploads_command():
+    cur = mysql.connection.cursor()
+    folded = fold_existing_uploads(cur, app.static_folder, list(iter_uploads(app.static_folder)))
+    mysql.connection.commit()
+    cur.close()
+    # 참조를 모두 바꾼 뒤에 이전 파일 삭제
+    remove_folded_files(app.static_folder, folded)
+    distinct = len({new for _, new, _ in folded})
+    click.echo(f'업로드 정리 완료: {len(folded)}개 파일 -> {distinct}개, {sum(rows for _, _, rows in folded)}개 행 경로 변경')
+
+# 정적 파일 지문 빌드 (flask --app app build-assets) - 배포 후 워커를 재시작해야 새 manifest 를 읽습니다
+@app.cli.command('build-assets')
+@click.option('--fetch-vendor', is_flag=True, help='외부 CSS/JS 라이브러리를 static/vendor 로 내려받습니다.')
+def build_assets_command(fetch_vendor):
+    if fetch_vendor:
+        fetched = fetch_vendor_assets(app.static_folder)
+        click.echo(f'외부 라이브러리 {fetched}개 다운로드')
+    manifest = build_assets(app.static_folder)
+    click.echo(f'정적 파일 빌드 완료: {len(manifest)}개 파일')
+
+# 대기 중인 스키마 마이그레이션 적용 (flask --app app apply-migrations)
+@app.cli.command('apply-migrations')
+@click.option('--fake', is_flag=True, help='실행하지 않고 적용된 것으로만 기록합니다. (수동 적용한 경우)')
+def apply_migrations_command(fake):
+    cur = mysql.connection.cursor()
+    pending = pending_migrations(cur)
+    mysql.connection.commit()
+    cur.close()
+    
+    if not pending:
+        click.echo('적용할 마이그레이션이 없습니다.')
+        return
     
-    # Vimeo
-    vimeo_regex = r'(?:https?:\/\/)?(?:www\.)?vimeo\.com\/(\d+)'
-    vimeo_match = re.search(vimeo_regex, url)
-    if vimeo_match:
-        return f'https://player.vimeo.com/video/{vimeo_match.group(1)}'
+    for version, name, path in pending:
+        try:
+            apply_migration(mysql.connection, version, name, path, fake=fake)
+        except MigrationError as e:
+            click.echo(f'마이그레이션 실패 - {e}', err=True)
+            click.echo(f'원인을 고친 뒤 다시 실행하면 {e.index}번째 문장부터 이어서 적용합니다.', err=True)
+            raise SystemExit(1)
+        click.echo(f'{"기록" if fake else "적용"} 완료: {version:03d}_{name}')
+
+# 실제 스키마와 기대 인덱스 비교 (flask --app app verify-schema)
+@app.cli.command('verify-schema')
+def verify_schema_command():
+    cur = mysql.connection.cursor()
+    missing, redundant = verify_schema(cur)
+    cur.close()
     
-    # 네이버TV
-    naver_regex = r'(?:https?:\/\/)?(?:tv\.naver\.com\/v\/(\d+))'
-    naver_match = re.search(naver_regex, url)
-    if naver_match:
-        return f'https://tv.naver.com/embed/{naver_match.group(1)}'
+    for table, name, columns in missing:
+        click.echo(f'[누락] {table}.{name} ({", ".join(columns)})')
+    for table, name, columns, covered_by in redundant:
+        click.echo(f'[중복] {table}.{name} ({", ".join(columns)}) -> {covered_by} 인덱스로 대체 가능')
     
-    # 지원하지 않는 URL은 그대로 반환
-    return url
+    if not missing and not redundant:
+        click.echo('스키마 인덱스가 정상입니다.')
+    if missing:
+        raise SystemExit(1)
 
 if __name__ == '__main__':
     app.run(debug=True, host="0.0.0.0") 
@@ -0,0 +1,11 @@
+-- 게시글 댓글/좋아요 카운터 컬럼 추가 (목록 조회 시 상관 서브쿼리 제거용)
+ALTER TABLE posts
+    ADD COLUMN comment_count INT NOT NULL DEFAULT 0 AFTER view_count,
+    ADD COLUMN like_count INT NOT NULL DEFAULT 0 AFTER comment_count;
+
+-- 기존 게시글 카운터 채우기 (이후 드리프트는 `flask --app app reconcile-counters` 로 보정)
+UPDATE posts
+LEFT JOIN (SELECT post_id, COUNT(*) AS cnt FROM comments GROUP BY post_id) AS c ON c.post_id = posts.id
+LEFT JOIN (SELECT post_id, COUNT(*) AS cnt FROM post_likes GROUP BY post_id) AS l ON l.post_id = posts.id
+SET posts.comment_count = COALESCE(c.cnt, 0),
+    posts.like_count = COALESCE(l.cnt, 0);
@@ -0,0 +1,25 @@
+-- 자주 사용하는 조회 조건을 위한 보조 인덱스 (InnoDB 온라인 DDL, 테이블 잠금 없이 추가)
+
+-- 게시판 목록 / 커서 페이지네이션: WHERE board_id = ? ORDER BY created_at DESC, id DESC
+ALTER TABLE posts ADD INDEX idx_posts_board_created (board_id, created_at), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 프로필 내 게시글: WHERE user_id = ? ORDER BY created_at DESC
+ALTER TABLE posts ADD INDEX idx_posts_user_created (user_id, created_at), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 게시글 댓글: WHERE post_id = ? ORDER BY created_at
+ALTER TABLE comments ADD INDEX idx_comments_post_created (post_id, created_at), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 좋아요 여부 확인 (IP 기반 / 로그인 사용자)
+ALTER TABLE post_likes ADD INDEX idx_post_likes_post_ip_user (post_id, ip_address, user_id), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 읽지 않은 쪽지 수
+ALTER TABLE messages ADD INDEX idx_messages_receiver_unread (receiver_id, is_read, receiver_deleted), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 받은 친구 요청 수
+ALTER TABLE friendships ADD INDEX idx_friendships_friend_status (friend_id, status), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 차단 IP 확인
+ALTER TABLE blocked_ips ADD INDEX idx_blocked_ips_ip_expires (ip_address, expires_at), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- 차단 사용자 확인
+ALTER TABLE blocked_users ADD INDEX idx_blocked_users_user_expires (user_id, expires_at), ALGORITHM=INPLACE, LOCK=NONE;
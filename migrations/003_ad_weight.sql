@@ -0,0 +1,2 @@
+-- 광고 노출 가중치 (같은 위치의 광고끼리 가중치 비율로 노출, 0이면 노출하지 않음)
+ALTER TABLE ads ADD COLUMN weight INT NOT NULL DEFAULT 1 AFTER position;
@@ -0,0 +1,22 @@
+-- 인기글 점수 테이블 (좋아요/댓글/조회 가중치 합을 시간에 따라 감쇠한 값)
+CREATE TABLE post_scores (
+    post_id INT PRIMARY KEY,
+    board_id INT NOT NULL,
+    score DOUBLE NOT NULL DEFAULT 0,
+    decayed_at DATETIME NOT NULL,
+    INDEX idx_post_scores_score (score),
+    INDEX idx_post_scores_board_score (board_id, score),
+    FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+);
+
+-- 기존 게시글 점수 채우기 (가중치 좋아요 3, 댓글 2, 조회 0.1 / 반감기 24시간, 작성 시각 기준 감쇠)
+-- 이후 다시 계산하려면 `flask --app app rebuild-scores`
+INSERT INTO post_scores (post_id, board_id, score, decayed_at)
+SELECT id, board_id, scored.score, NOW()
+FROM (
+    SELECT id, board_id,
+           (like_count * 3 + comment_count * 2 + view_count * 0.1)
+           * POW(0.5, TIMESTAMPDIFF(SECOND, created_at, NOW()) / 86400) AS score
+    FROM posts
+) AS scored
+WHERE scored.score >= 0.01;
@@ -0,0 +1,21 @@
+-- 비로그인(IP) 좋아요 중복 방지 키
+-- user_id 가 NULL 인 좋아요는 unique_post_user 로 막을 수 없으므로, IP 좋아요에만 값이 있는 생성 컬럼에 유니크 키를 둡니다.
+
+-- 기존 중복 IP 좋아요 정리 (가장 먼저 누른 것만 남김)
+DELETE dup FROM post_likes dup
+JOIN post_likes keep
+  ON keep.post_id = dup.post_id
+ AND keep.ip_address = dup.ip_address
+ AND keep.user_id IS NULL
+ AND keep.id < dup.id
+WHERE dup.user_id IS NULL;
+
+ALTER TABLE post_likes
+    ADD COLUMN anon_ip VARCHAR(45) AS (IF(user_id IS NULL, ip_address, NULL)) STORED,
+    ADD UNIQUE KEY unique_post_anon_ip (post_id, anon_ip);
+
+-- 정리된 좋아요 수 반영
+UPDATE posts
+LEFT JOIN (SELECT post_id, COUNT(*) AS cnt FROM post_likes GROUP BY post_id) AS l ON l.post_id = posts.id
+SET posts.like_count = COALESCE(l.cnt, 0)
+WHERE posts.like_count <> COALESCE(l.cnt, 0);
@@ -0,0 +1,20 @@
+-- 사용자별 알림 카운터 (읽지 않은 쪽지 수, 받은 친구 요청 수)
+CREATE TABLE user_notification_counts (
+    user_id INT PRIMARY KEY,
+    unread_messages INT NOT NULL DEFAULT 0,
+    friend_requests INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- 기존 사용자 카운터 채우기 (이후 드리프트는 `flask --app app reconcile-counters` 로 보정)
+INSERT INTO user_notification_counts (user_id, unread_messages, friend_requests)
+SELECT users.id, COALESCE(m.cnt, 0), COALESCE(f.cnt, 0)
+FROM users
+LEFT JOIN (
+    SELECT receiver_id, COUNT(*) AS cnt FROM messages
+    WHERE is_read = 0 AND receiver_deleted = 0 GROUP BY receiver_id
+) AS m ON m.receiver_id = users.id
+LEFT JOIN (
+    SELECT friend_id, COUNT(*) AS cnt FROM friendships
+    WHERE status = 'pending' GROUP BY friend_id
+) AS f ON f.friend_id = users.id;
@@ -0,0 +1,30 @@
+-- 게시글/댓글 전문 검색 색인 (한국어 검색을 위해 ngram 파서 사용, 기본 ngram_token_size=2)
+CREATE TABLE search_documents (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    doc_type ENUM('post', 'comment') NOT NULL,
+    doc_id INT NOT NULL,
+    post_id INT NOT NULL,
+    board_id INT NOT NULL,
+    title VARCHAR(255) NOT NULL DEFAULT '',
+    body MEDIUMTEXT NOT NULL,
+    created_at DATETIME NOT NULL,
+    UNIQUE KEY unique_search_doc (doc_type, doc_id),
+    INDEX idx_search_documents_post (post_id),
+    FULLTEXT INDEX ft_search_title (title) WITH PARSER ngram,
+    FULLTEXT INDEX ft_search_title_body (title, body) WITH PARSER ngram,
+    FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 기존 게시글/댓글 색인 (태그 제거는 근사치, 정확히 다시 만들려면 `flask --app app rebuild-search-index`)
+INSERT INTO search_documents (doc_type, doc_id, post_id, board_id, title, body, created_at)
+SELECT 'post', id, id, board_id, COALESCE(title, ''),
+       TRIM(REGEXP_REPLACE(REGEXP_REPLACE(COALESCE(content, ''), '<[^>]+>', ' '), '[[:space:]]+', ' ')),
+       created_at
+FROM posts;
+
+INSERT INTO search_documents (doc_type, doc_id, post_id, board_id, title, body, created_at)
+SELECT 'comment', comments.id, comments.post_id, posts.board_id, '',
+       TRIM(REGEXP_REPLACE(REGEXP_REPLACE(COALESCE(comments.content, ''), '<[^>]+>', ' '), '[[:space:]]+', ' ')),
+       comments.created_at
+FROM comments
+JOIN posts ON comments.post_id = posts.id;
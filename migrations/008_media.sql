@@ -0,0 +1,12 @@
+-- 내용 주소 기반 업로드 저장소 (services/media_store.py 참고)
+-- 기존 업로드 파일의 중복 정리와 경로 변경은 파일을 읽어야 하므로 `flask --app app fold-uploads` 로 수행합니다.
+CREATE TABLE media (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    sha256 CHAR(64) NOT NULL,
+    path VARCHAR(255) NOT NULL,
+    size INT NOT NULL,
+    width INT NULL,
+    height INT NULL,
+    created_at DATETIME NOT NULL,
+    UNIQUE KEY unique_media_sha256 (sha256)
+);
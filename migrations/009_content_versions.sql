@@ -0,0 +1,10 @@
+-- 조건부 GET(ETag / Last-Modified)용 변경 버전 (services/content_versions.py 참고)
+-- scope: 'site'(object_id 0, 공지/회원 정보), 'board'(게시판 id), 'post'(게시글 id)
+-- 행이 없으면 버전 0으로 취급하므로 기존 데이터는 채우지 않습니다.
+CREATE TABLE content_versions (
+    scope VARCHAR(10) NOT NULL,
+    object_id INT NOT NULL,
+    version INT NOT NULL DEFAULT 0,
+    changed_at DATETIME(3) NOT NULL,
+    PRIMARY KEY (scope, object_id)
+);
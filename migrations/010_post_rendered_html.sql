@@ -0,0 +1,6 @@
+-- 글 작성/수정 시 렌더링한 본문 HTML (services/post_render.py 참고)
+-- 기존 게시글은 renderer_version 0 이므로 처음 조회될 때 렌더링됩니다.
+-- 미리 채우려면 `flask --app app rerender-posts`
+ALTER TABLE posts
+    ADD COLUMN rendered_html MEDIUMTEXT NULL AFTER video_data,
+    ADD COLUMN renderer_version INT NOT NULL DEFAULT 0 AFTER rendered_html;
@@ -0,0 +1,43 @@
+-- 게시글 이미지 목록과 목록/홈 카드용 대표 썸네일 (services/post_media.py 참고)
+-- 목록에서 images_data JSON 을 해석하지 않도록 posts.cover_thumb 에 대표 이미지 경로(static 기준)를 둡니다.
+-- 여기서는 원본 경로를 넣고, 012_cover_thumb_path 와 rebuild-post-media 가 썸네일 경로로 바꿉니다.
+CREATE TABLE post_media (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    post_id INT NOT NULL,
+    ordinal SMALLINT NOT NULL,
+    path VARCHAR(255) NOT NULL,
+    thumb_path VARCHAR(255) NULL,
+    width INT NULL,
+    height INT NULL,
+    caption VARCHAR(255) NOT NULL DEFAULT '',
+    UNIQUE KEY unique_post_media_ordinal (post_id, ordinal),
+    FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+);
+
+ALTER TABLE posts
+    ADD COLUMN cover_thumb VARCHAR(255) NULL AFTER images_data;
+
+-- 기존 images_data JSON ({"paths": [...], "captions": [...]}) 변환 (업로드 이미지만, 경로는 uploads/... 형식으로)
+INSERT IGNORE INTO post_media (post_id, ordinal, path, caption)
+SELECT post_id, ordinal, IF(path LIKE 'static/%', SUBSTRING(path, 8), path), caption
+FROM (
+    SELECT posts.id AS post_id, images.n - 1 AS ordinal, TRIM(LEADING '/' FROM images.path) AS path,
+           COALESCE(JSON_UNQUOTE(JSON_EXTRACT(posts.images_data, CONCAT('$.captions[', images.n - 1, ']'))), '') AS caption
+    FROM posts,
+         JSON_TABLE(IF(JSON_VALID(posts.images_data), posts.images_data, '{}'), '$.paths[*]'
+                    COLUMNS (n FOR ORDINALITY, path VARCHAR(255) PATH '$')) AS images
+    WHERE posts.images_data IS NOT NULL
+) AS legacy
+WHERE path LIKE 'uploads/%';
+
+-- 이전 형식의 단일 이미지 (images_data 가 있는 글은 첫 번째 자리가 이미 차 있으므로 무시됨)
+INSERT IGNORE INTO post_media (post_id, ordinal, path, caption)
+SELECT id, 0, IF(path LIKE 'static/%', SUBSTRING(path, 8), path), ''
+FROM (SELECT id, TRIM(LEADING '/' FROM image_path) AS path FROM posts WHERE image_path IS NOT NULL) AS legacy
+WHERE path LIKE 'uploads/%';
+
+-- 대표 이미지 (썸네일 경로/가로·세로와 본문(<img>) 이미지는 `flask --app app rebuild-post-media` 로 채웁니다)
+UPDATE posts
+JOIN (SELECT post_id, MIN(ordinal) AS ordinal FROM post_media GROUP BY post_id) AS first ON first.post_id = posts.id
+JOIN post_media ON post_media.post_id = first.post_id AND post_media.ordinal = first.ordinal
+SET posts.cover_thumb = post_media.path;
@@ -0,0 +1,9 @@
+-- 게시글 대표 이미지(posts.cover_thumb)에 원본 대신 썸네일 경로를 둡니다. (services/post_media.py 참고)
+-- 썸네일 작업이 끝나면 원본 경로로 post_media 를 찾아 thumb_path 와 cover_thumb 를 채우므로 path 인덱스를 추가합니다.
+CREATE INDEX idx_post_media_path ON post_media (path);
+
+-- 이미 썸네일이 있는 대표 이미지는 바로 썸네일 경로로 (나머지는 `flask --app app rebuild-post-media` 로 채웁니다)
+UPDATE posts
+JOIN post_media ON post_media.post_id = posts.id AND post_media.path = posts.cover_thumb
+SET posts.cover_thumb = post_media.thumb_path
+WHERE post_media.thumb_path IS NOT NULL;
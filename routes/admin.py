@@ -1,8 +1,10 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, current_app, jsonify
 from functools import wraps
-import os
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from services import workers
+from services.block_list import parse_network
+from services.media_store import store_upload
+from services.content_versions import bump_site_version, publish_site_change
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -10,6 +12,9 @@ admin_bp = Blueprint('admin', __name__)
 def get_mysql():
     return current_app.extensions['mysql']
 
+def get_boards():
+    return current_app.extensions['boards']
+
 # 관리자 접근 데코레이터
 def admin_required(f):
     @wraps(f)
@@ -67,6 +72,38 @@ def dashboard():
                           today_post_count=today_post_count, recent_users=recent_users,
                           recent_posts=recent_posts, ads=ads)
 
+# DB 커넥션 풀 상태 (현재 워커 기준)
+@admin_bp.route('/admin/db-pool')
+@admin_required
+def db_pool_stats():
+    return jsonify(get_mysql().stats())
+
+# 조회수 버퍼 상태와 반영 지연 (현재 워커 기준)
+@admin_bp.route('/admin/view-buffer')
+@admin_required
+def view_buffer_stats():
+    return jsonify(current_app.extensions['views'].stats())
+
+# 워커 시작 예열 보고 (현재 워커 기준)
+@admin_bp.route('/admin/startup')
+@admin_required
+def startup_report():
+    return jsonify(current_app.extensions.get('startup_report') or {})
+
+# 비로그인 페이지 캐시 상태 (현재 워커 기준)
+@admin_bp.route('/admin/page-cache')
+@admin_required
+def page_cache_stats():
+    return jsonify(current_app.extensions['pages'].stats())
+
+# 게시판 캐시 다시 읽기 (DB에서 게시판을 직접 수정한 뒤 모든 워커에 반영)
+@admin_bp.route('/admin/boards/reload', methods=['POST'])
+@admin_required
+def reload_boards():
+    workers.publish('boards')
+    flash('게시판 정보를 다시 불러왔습니다.', 'success')
+    return redirect(url_for('admin.dashboard'))
+
 # 회원 관리
 @admin_bp.route('/admin/users')
 @admin_required
@@ -119,7 +156,11 @@ def toggle_vip(user_id):
         # 현재 VIP 상태에 따라 변경
         vip_type = request.form.get('vip_type', '0')
         cur.execute('UPDATE users SET is_vip = %s WHERE id = %s', (vip_type, user_id))
+        # 목록/본문의 VIP 표시가 바뀌므로 조건부 GET 버전 증가
+        bump_site_version(cur)
         mysql.connection.commit()
+        current_app.extensions['users'].bump()
+        publish_site_change()
         
         # 설정된 VIP 타입에 따른 메시지 표시
         vip_message = {
@@ -152,8 +193,7 @@ def posts():
     board_id = request.args.get('board_id', type=int)
     
     # 게시판 목록 조회
-    cur.execute('SELECT * FROM boards')
-    boards = cur.fetchall()
+    boards = get_boards().all()
     
     # 총 게시글 수 조회 (페이지네이션용)
     if board_id:
@@ -251,9 +291,12 @@ def add_notice():
             INSERT INTO notices (title, content, user_id, created_at, is_active)
             VALUES (%s, %s, %s, NOW(), %s)
         ''', (title, content, session['id'], 1 if is_active else 0))
+        # 게시판 목록의 공지사항이 바뀌므로 조건부 GET 버전 증가
+        bump_site_version(cur)
         
         mysql.connection.commit()
         cur.close()
+        publish_site_change()
         
         flash('공지사항이 등록되었습니다.', 'success')
         return redirect(url_for('admin.notices'))
@@ -291,9 +334,11 @@ def edit_notice(notice_id):
             SET title = %s, content = %s, updated_at = NOW(), is_active = %s
             WHERE id = %s
         ''', (title, content, 1 if is_active else 0, notice_id))
+        bump_site_version(cur)
         
         mysql.connection.commit()
         cur.close()
+        publish_site_change()
         
         flash('공지사항이 수정되었습니다.', 'success')
         return redirect(url_for('admin.notices'))
@@ -311,9 +356,11 @@ def delete_notice(notice_id):
     
     # 공지사항 삭제
     cur.execute('DELETE FROM notices WHERE id = %s', (notice_id,))
+    bump_site_version(cur)
     mysql.connection.commit()
     
     cur.close()
+    publish_site_change()
     
     flash('공지사항이 삭제되었습니다.', 'success')
     return redirect(url_for('admin.notices'))
@@ -332,6 +379,7 @@ def add_ad():
         content = request.form['content']
         link = request.form['link']
         position = request.form['position']
+        weight = max(request.form.get('weight', 1, type=int) or 0, 0)
         is_active = 1 if 'is_active' in request.form else 0
         
         # 입력값 검증
@@ -350,17 +398,14 @@ def add_ad():
                     if '.' in file.filename:
                         file_ext = file.filename.rsplit('.', 1)[1].lower()
                         if file_ext in allowed_extensions:
-                            filename = secure_filename(file.filename)
-                            # 파일명이 중복되지 않도록 타임스탬프 추가
-                            filename = f"ad_{datetime.now().strftime('%Y%m%d%H%M%S')}_{filename}"
-                            # 업로드 폴더 경로 확인 및 생성
-                            upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'ads')
-                            if not os.path.exists(upload_dir):
-                                os.makedirs(upload_dir)
-                            file_path = os.path.join(upload_dir, filename)
-                            file.save(file_path)
-                            image_path = f"uploads/ads/{filename}"
-                            print(f"광고 이미지 저장 성공: {file_path}")
+                            # 같은 내용의 이미지는 기존 파일을 재사용 (내용 해시 기준 저장)
+                            media_cur = get_mysql().connection.cursor()
+                            image_path, created = store_upload(media_cur, current_app.static_folder, file.stream,
+                                                               secure_filename(file.filename))
+                            media_cur.close()
+                            if created:
+                                current_app.extensions['thumbnails'].enqueue(image_path)
+                            print(f"광고 이미지 저장 성공: {image_path}")
                         else:
                             flash('허용되지 않는 파일 형식입니다. (PNG, JPG, JPEG, GIF만 가능)', 'danger')
                             return render_template('admin/add_ad.html')
@@ -375,13 +420,16 @@ def add_ad():
         # 광고 저장
         cur = mysql.connection.cursor()
         cur.execute('''
-            INSERT INTO ads (title, content, image_path, link_url, position, is_active, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s, NOW())
-        ''', (title, content, image_path, link, position, is_active))
+            INSERT INTO ads (title, content, image_path, link_url, position, weight, is_active, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+        ''', (title, content, image_path, link, position, weight, is_active))
         
         mysql.connection.commit()
         cur.close()
         
+        # 모든 워커의 광고 캐시 갱신
+        workers.publish('ads')
+        
         flash('광고가 등록되었습니다.', 'success')
         return redirect(url_for('admin.ads'))
     
@@ -411,6 +459,7 @@ def edit_ad(ad_id):
         content = request.form['content']
         link = request.form['link']
         position = request.form['position']
+        weight = max(request.form.get('weight', 1, type=int) or 0, 0)
         is_active = 1 if 'is_active' in request.form else 0
         
         # 입력값 검증
@@ -428,17 +477,14 @@ def edit_ad(ad_id):
                 try:
                     file_ext = file.filename.rsplit('.', 1)[1].lower()
                     if file_ext in allowed_extensions:
-                        filename = secure_filename(file.filename)
-                        # 파일명이 중복되지 않도록 타임스탬프 추가
-                        filename = f"ad_{datetime.now().strftime('%Y%m%d%H%M%S')}_{filename}"
-                        # 업로드 폴더 경로 확인 및 생성
-                        upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'ads')
-                        if not os.path.exists(upload_dir):
-                            os.makedirs(upload_dir)
-                        file_path = os.path.join(upload_dir, filename)
-                        file.save(file_path)
-                        image_path = f"uploads/ads/{filename}"
-                        print(f"광고 이미지 업데이트 성공: {file_path}")
+                        # 같은 내용의 이미지는 기존 파일을 재사용 (내용 해시 기준 저장)
+                        media_cur = get_mysql().connection.cursor()
+                        image_path, created = store_upload(media_cur, current_app.static_folder, file.stream,
+                                                           secure_filename(file.filename))
+                        media_cur.close()
+                        if created:
+                            current_app.extensions['thumbnails'].enqueue(image_path)
+                        print(f"광고 이미지 업데이트 성공: {image_path}")
                     else:
                         flash('허용되지 않는 파일 형식입니다. (PNG, JPG, JPEG, GIF만 가능)', 'danger')
                         return render_template('admin/edit_ad.html', ad=ad)
@@ -450,13 +496,16 @@ def edit_ad(ad_id):
         # 광고 수정
         cur.execute('''
             UPDATE ads
-            SET title = %s, content = %s, image_path = %s, link_url = %s, position = %s, is_active = %s
+            SET title = %s, content = %s, image_path = %s, link_url = %s, position = %s, weight = %s, is_active = %s
             WHERE id = %s
-        ''', (title, content, image_path, link, position, is_active, ad_id))
+        ''', (title, content, image_path, link, position, weight, is_active, ad_id))
         
         mysql.connection.commit()
         cur.close()
         
+        # 모든 워커의 광고 캐시 갱신
+        workers.publish('ads')
+        
         flash('광고가 수정되었습니다.', 'success')
         return redirect(url_for('admin.ads'))
     
@@ -485,6 +534,9 @@ def delete_ad(ad_id):
     mysql.connection.commit()
     cur.close()
     
+    # 모든 워커의 광고 캐시 갱신
+    workers.publish('ads')
+    
     flash('광고가 삭제되었습니다.', 'success')
     return redirect(url_for('admin.ads'))
 
@@ -538,6 +590,15 @@ def add_ip_block():
     reason = request.form['reason']
     expires_at = request.form['expires_at'] if request.form.get('expires_at') else None
 
+    # 단일 IP 또는 CIDR 대역(예: 123.123.123.0/24)만 허용하고 표준 형식으로 저장
+    try:
+        network = parse_network(ip_address)
+    except ValueError:
+        cur.close()
+        flash('올바른 IP 주소 또는 대역(CIDR)이 아닙니다.', 'danger')
+        return redirect(url_for('admin.blocks'))
+    ip_address = str(network.network_address) if network.prefixlen == network.max_prefixlen else str(network)
+
     try:
         # IP 주소 차단 추가
         cur.execute('''
@@ -546,6 +607,7 @@ def add_ip_block():
         ''', (ip_address, reason, expires_at, session['id']))
 
         mysql.connection.commit()
+        workers.publish('blocks')
         flash(f'IP 주소 {ip_address}가 차단되었습니다.', 'success')
     except Exception as e:
         mysql.connection.rollback()
@@ -575,6 +637,7 @@ def remove_ip_block(block_id):
         # IP 차단 해제
         cur.execute('DELETE FROM blocked_ips WHERE id = %s', (block_id,))
         mysql.connection.commit()
+        workers.publish('blocks')
 
         flash(f'IP 주소 {block["ip_address"]}의 차단이 해제되었습니다.', 'success')
     except Exception as e:
@@ -619,6 +682,7 @@ def add_user_block():
         ''', (user_id, reason, expires_at, session['id']))
 
         mysql.connection.commit()
+        workers.publish('blocks')
         flash(f'사용자 {user["nickname"]}이(가) 차단되었습니다.', 'success')
     except Exception as e:
         mysql.connection.rollback()
@@ -653,6 +717,7 @@ def remove_user_block(block_id):
         # 사용자 차단 해제
         cur.execute('DELETE FROM blocked_users WHERE id = %s', (block_id,))
         mysql.connection.commit()
+        workers.publish('blocks')
 
         flash(f'사용자 {block["nickname"]}의 차단이 해제되었습니다.', 'success')
     except Exception as e:
@@ -675,8 +740,11 @@ def delete_user(user_id):
         cur.close()
         abort(404)
     cur.execute('DELETE FROM users WHERE id = %s', (user_id,))
+    bump_site_version(cur)
     mysql.connection.commit()
     cur.close()
+    current_app.extensions['users'].bump()
+    publish_site_change()
     flash('회원이 삭제되었습니다.', 'success')
     return redirect(url_for('admin.users'))
 
@@ -691,8 +759,11 @@ def change_nickname(user_id):
     mysql = get_mysql()
     cur = mysql.connection.cursor()
     cur.execute('UPDATE users SET nickname = %s WHERE id = %s', (new_nickname, user_id))
+    bump_site_version(cur)
     mysql.connection.commit()
     cur.close()
+    current_app.extensions['users'].bump()
+    publish_site_change()
     flash('닉네임이 변경되었습니다.', 'success')
     return redirect(url_for('admin.users'))
 
@@ -709,5 +780,6 @@ def change_email(user_id):
     cur.execute('UPDATE users SET email = %s WHERE id = %s', (new_email, user_id))
     mysql.connection.commit()
     cur.close()
+    current_app.extensions['users'].bump()
     flash('이메일이 변경되었습니다.', 'success')
     return redirect(url_for('admin.users'))
@@ -3,6 +3,9 @@ from flask_login import login_user, login_required, logout_user, current_user
 import re
 import secrets
 import datetime
+from services.content_versions import bump_site_version, publish_site_change
+from services.notifications import (adjust_unread_messages, adjust_friend_requests, reconcile_notification_counts,
+                                    get_notification_counts, publish_notification_counts)
 
 auth_bp = Blueprint('auth', __name__)
 # app.py가 auth라는 이름으로 import하므로 별칭 추가
@@ -241,19 +244,13 @@ def profile():
     ''', (current_user.id,))
     
     comments = cur.fetchall()
-    
-    # 읽지 않은 쪽지 수 확인
-    cur.execute('SELECT COUNT(*) as unread_count FROM messages WHERE receiver_id = %s AND is_read = 0 AND receiver_deleted = 0', (current_user.id,))
-    unread_count = cur.fetchone()['unread_count']
-    
-    # 친구 요청 수 확인
-    cur.execute('SELECT COUNT(*) as request_count FROM friendships WHERE friend_id = %s AND status = "pending"', (current_user.id,))
-    friend_request_count = cur.fetchone()['request_count']
-    
     cur.close()
     
+    # 읽지 않은 쪽지 수, 친구 요청 수 (사용자별 카운터)
+    counts = get_notification_counts(mysql, current_user.id)
+    
     return render_template('auth/profile.html', user=user, posts=posts, comments=comments, 
-                           unread_count=unread_count, friend_request_count=friend_request_count)
+                           unread_count=counts['unread_count'], friend_request_count=counts['friend_request_count'])
 
 # 아이디/비밀번호 찾기 페이지
 @auth_bp.route('/find-account', methods=['GET'])
@@ -567,6 +564,8 @@ def edit_profile():
             
             # 닉네임 업데이트
             cur.execute('UPDATE users SET nickname = %s WHERE id = %s', (nickname, current_user.id))
+            # 목록/본문의 작성자 닉네임이 바뀌므로 조건부 GET 버전 증가
+            bump_site_version(cur)
             session['nickname'] = nickname
             flash('닉네임이 변경되었습니다.', 'success')
         
@@ -591,6 +590,9 @@ def edit_profile():
         
         mysql.connection.commit()
         cur.close()
+        current_app.extensions['users'].bump()
+        if nickname and nickname != user['nickname']:
+            publish_site_change()
         return redirect(url_for('auth.profile'))
     
     # 현재 사용자 정보 가져오기
@@ -632,13 +634,11 @@ def messages():
         ''', (current_user.id,))
     
     messages = cur.fetchall()
-    
-    # 읽지 않은 쪽지 수 확인
-    cur.execute('SELECT COUNT(*) as unread_count FROM messages WHERE receiver_id = %s AND is_read = 0 AND receiver_deleted = 0', (current_user.id,))
-    unread_count = cur.fetchone()['unread_count']
-    
     cur.close()
     
+    # 읽지 않은 쪽지 수 (사용자별 카운터)
+    unread_count = get_notification_counts(mysql, current_user.id)['unread_count']
+    
     return render_template('auth/messages.html', messages=messages, message_type=message_type, unread_count=unread_count)
 
 # 쪽지 상세 보기
@@ -668,8 +668,11 @@ def view_message(message_id):
     
     # 받은 쪽지일 경우 읽음 처리
     if message['receiver_id'] == current_user.id and message['is_read'] == 0:
-        cur.execute('UPDATE messages SET is_read = 1 WHERE id = %s', (message_id,))
+        cur.execute('UPDATE messages SET is_read = 1 WHERE id = %s AND is_read = 0', (message_id,))
+        if not message['receiver_deleted']:
+            adjust_unread_messages(cur, current_user.id, -cur.rowcount)
         mysql.connection.commit()
+        publish_notification_counts()
     
     cur.close()
     
@@ -738,9 +741,11 @@ def send_message():
             INSERT INTO messages (sender_id, receiver_id, title, content, is_read, created_at)
             VALUES (%s, %s, %s, %s, 0, NOW())
         ''', (current_user.id, receiver_data['id'], title, content))
+        adjust_unread_messages(cur, receiver_data['id'], 1)
         
         mysql.connection.commit()
         cur.close()
+        publish_notification_counts()
         
         flash('쪽지를 성공적으로 보냈습니다.', 'success')
         return redirect(url_for('auth.messages', type='sent'))
@@ -776,7 +781,10 @@ def delete_message(message_id):
     
     # 받은 사람이 삭제하는 경우
     if message['receiver_id'] == current_user.id:
-        cur.execute('UPDATE messages SET receiver_deleted = 1 WHERE id = %s', (message_id,))
+        cur.execute('UPDATE messages SET receiver_deleted = 1 WHERE id = %s AND receiver_deleted = 0', (message_id,))
+        # 읽지 않은 쪽지를 삭제하면 알림 수에서 제외
+        if not message['is_read']:
+            adjust_unread_messages(cur, current_user.id, -cur.rowcount)
     
     # 양쪽 다 삭제했으면 실제로 삭제
     cur.execute('SELECT * FROM messages WHERE id = %s', (message_id,))
@@ -787,6 +795,7 @@ def delete_message(message_id):
     
     mysql.connection.commit()
     cur.close()
+    publish_notification_counts()
     
     flash('쪽지가 삭제되었습니다.', 'success')
     
@@ -914,9 +923,11 @@ def add_friend():
         INSERT INTO friendships (user_id, friend_id, status, created_at)
         VALUES (%s, %s, 'pending', NOW())
     ''', (current_user.id, user['id']))
+    adjust_friend_requests(cur, user['id'], 1)
     
     mysql.connection.commit()
     cur.close()
+    publish_notification_counts()
     
     flash('친구 요청을 보냈습니다.', 'success')
     return redirect(url_for('auth.friends'))
@@ -947,8 +958,9 @@ def respond_friend_request(request_id, action):
         return redirect(url_for('auth.friends'))
     
     if action == 'accept':
-        # 친구 요청 수락
-        cur.execute('UPDATE friendships SET status = "accepted", updated_at = NOW() WHERE id = %s', (request_id,))
+        # 친구 요청 수락 (대기 중이던 요청이 처리되므로 받은 친구 요청 수 감소)
+        cur.execute('UPDATE friendships SET status = "accepted", updated_at = NOW() WHERE id = %s AND status = "pending"', (request_id,))
+        adjust_friend_requests(cur, current_user.id, -cur.rowcount)
         
         # 양방향 친구 관계 생성
         cur.execute('''
@@ -959,11 +971,13 @@ def respond_friend_request(request_id, action):
         flash('친구 요청을 수락했습니다.', 'success')
     else:
         # 친구 요청 거절
-        cur.execute('UPDATE friendships SET status = "rejected", updated_at = NOW() WHERE id = %s', (request_id,))
+        cur.execute('UPDATE friendships SET status = "rejected", updated_at = NOW() WHERE id = %s AND status = "pending"', (request_id,))
+        adjust_friend_requests(cur, current_user.id, -cur.rowcount)
         flash('친구 요청을 거절했습니다.', 'success')
     
     mysql.connection.commit()
     cur.close()
+    publish_notification_counts()
     
     return redirect(url_for('auth.friends'))
 
@@ -1031,8 +1045,13 @@ def block_user(user_id):
         VALUES (%s, %s, 'blocked', NOW())
     ''', (current_user.id, user_id))
     
+    # 삭제된 관계에 대기 중 친구 요청이 있었을 수 있으므로 두 사용자의 알림 카운터를 다시 계산
+    reconcile_notification_counts(cur, current_user.id)
+    reconcile_notification_counts(cur, user_id)
+    
     mysql.connection.commit()
     cur.close()
+    publish_notification_counts()
     
     flash('사용자를 차단했습니다.', 'success')
     return redirect(url_for('auth.friends'))
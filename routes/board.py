@@ -1,14 +1,21 @@
 # type: ignore
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, jsonify, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, jsonify, current_app, make_response
 from flask_login import login_required, current_user
 import os
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import random
-import json
 import re
 import pytz
 import hashlib
+from services.post_counters import adjust_comment_count, adjust_like_count
+from services.pagination import fetch_posts_page, get_board_total, invalidate_board_total, count_pages
+from services.post_likes import toggle_like, has_liked
+from services.post_scores import add_post_score, fetch_hot_posts, LIKE_WEIGHT, COMMENT_WEIGHT
+from services.search import index_post, index_comment, unindex_comment, search
+from services.content_versions import bump_content_versions, page_validators, not_modified_response, with_validators
+from services.post_render import render_post, ensure_rendered, RENDERER_VERSION
+from services.post_media import post_images, save_post_media
 
 seoul_timezone = pytz.timezone('Asia/Seoul')
 
@@ -21,6 +28,26 @@ def get_mysql():
 def get_bcrypt():
     return current_app.extensions['bcrypt']
 
+def get_boards():
+    return current_app.extensions['boards']
+
+def get_ads():
+    return current_app.extensions['ads']
+
+def get_blocks():
+    return current_app.extensions['blocks']
+
+# 게시글/댓글/좋아요 변경이 커밋된 뒤 호출 (조건부 GET 버전 증가, 페이지 캐시 무효화, 홈 화면 스냅샷 갱신 요청)
+def after_post_write(board_id, post_id):
+    mysql = get_mysql()
+    cur = mysql.connection.cursor()
+    bump_content_versions(cur, board_id, post_id)
+    mysql.connection.commit()
+    cur.close()
+    # 다른 워커의 캐시는 버전이 바뀌어 더 이상 쓰이지 않고, 현재 워커는 바로 비움
+    current_app.extensions['pages'].invalidate(('board', board_id), ('post', post_id))
+    current_app.extensions['homepage'].request_refresh()
+
 # 익명 사용자 닉네임 생성 및 관리 함수들
 def get_anonymous_nickname(ip_address):
     """IP 주소 기반으로 익명 닉네임을 생성하거나 기존 닉네임을 반환합니다."""
@@ -92,18 +119,31 @@ def board_main(board_route):
     user_agent = request.headers.get('User-Agent')
     is_mobile = 'Mobile' in user_agent
 
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
 
     if not board:
         cur.close()
         abort(404)
     
+    # 바뀐 내용이 없으면 쿼리/렌더링 없이 304 응답
+    etag, last_modified = page_validators(mysql, board['id'])
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified:
+        cur.close()
+        return not_modified
+    
+    # 비로그인 방문자는 같은 버전으로 렌더링된 페이지를 재사용
+    pages = current_app.extensions['pages']
+    cached = pages.cached_response(etag)
+    if cached:
+        cur.close()
+        return with_validators(cached, etag, last_modified)
     
-    # 페이지네이션
+    # 페이지네이션 (before/after 커서가 있으면 커서 방식, 없으면 ?page= 방식)
     page = request.args.get('page', 1, type=int)
+    before = request.args.get('before')
+    after = request.args.get('after')
     per_page = 15
-    offset = (page - 1) * per_page
     
     # 활성화된 공지사항 조회 (최대 10개까지)
     cur.execute('''
@@ -119,63 +159,124 @@ def board_main(board_route):
     # 게시글 조회
     if board['route'] == 'anonymous':
         # 익명 게시판은 단순히 '익명'으로 표시
-        cur.execute('''
+        posts, page, cursors = fetch_posts_page(cur, '''
             SELECT posts.*, posts.ip_address, posts.images_data, posts.content, posts.created_at,
-                  (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-                  (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count, boards.name as board_name
+                  boards.name as board_name
             FROM posts
             JOIN boards ON posts.board_id = boards.id
-            WHERE posts.board_id = %s
-            ORDER BY posts.created_at DESC
-            LIMIT %s OFFSET %s
-        ''', (board['id'], per_page, offset))
+        ''', board['id'], per_page, page=page, before=before, after=after)
         
-        posts = cur.fetchall()
         # 익명 게시판에서는 게시글에 단순히 '익명' 설정
         for post in posts:
             post['nickname'] = '익명'
     else:
         # 일반 게시판은 작성자 정보 표시
-        cur.execute('''
+        posts, page, cursors = fetch_posts_page(cur, '''
             SELECT posts.*, users.nickname, users.is_vip, posts.images_data, posts.content, posts.created_at,
-                  (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-                  (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count,
                   boards.name as board_name, boards.route as route
             FROM posts
             JOIN users ON posts.user_id = users.id
             JOIN boards ON posts.board_id = boards.id
-            WHERE posts.board_id = %s
-            ORDER BY posts.created_at DESC
-            LIMIT %s OFFSET %s
-        ''', (board['id'], per_page, offset))
-        
-        posts = cur.fetchall()
+        ''', board['id'], per_page, page=page, before=before, after=after)
     
-    # 총 게시글 수 조회 (페이지네이션용)
-    cur.execute('SELECT COUNT(*) as count FROM posts WHERE board_id = %s', (board['id'],))
-    total_count = cur.fetchone()['count']
-    total_pages = (total_count + per_page - 1) // per_page
+    # 총 게시글 수 조회 (페이지네이션용, 캐시된 값)
+    total_count = get_board_total(cur, board['id'])
+    total_pages = count_pages(total_count, per_page)
     
     # 위치별 광고 선택
     # 사이드바 광고
-    cur.execute('SELECT * FROM ads WHERE position = "side" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    sidebar_ad = cur.fetchone()
+    sidebar_ad = get_ads().pick('side')
     
     # 배너 광고
-    cur.execute('SELECT * FROM ads WHERE position = "banner" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    banner_ad = cur.fetchone()
+    banner_ad = get_ads().pick('banner')
     
     # 푸터 광고
-    cur.execute('SELECT * FROM ads WHERE position = "footer" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    footer_ad = cur.fetchone()
+    footer_ad = get_ads().pick('footer')
     
     cur.close()
     
     # 현재 날짜 정보 가져오기
     now = datetime.now(seoul_timezone).strftime('%Y-%m-%d %H:%M:%S')
     
-    return render_template('board/list.html', board=board, posts=posts, notices=notices,
-                          page=page, total_pages=total_pages, now=now,
+    response = pages.render(etag, [('board', board['id'])], 'board/list.html', board=board, posts=posts, notices=notices,
+                          page=page, total_pages=total_pages, cursors=cursors, now=now,
+                          sidebar_ad=sidebar_ad, banner_ad=banner_ad, footer_ad=footer_ad, is_mobile=is_mobile)
+    return with_validators(response, etag, last_modified)
+
+# 게시글/댓글 검색 (전체 또는 게시판별)
+@board_bp.route('/search')
+@board_bp.route('/board/<string:board_route>/search')
+def search_posts(board_route=None):
+    user_agent = request.headers.get('User-Agent')
+    is_mobile = 'Mobile' in user_agent
+
+    board = None
+    if board_route:
+        board = get_boards().get_by_route(board_route)
+        if not board:
+            abort(404)
+    
+    query = request.args.get('q', '').strip()[:100]
+    cursor = request.args.get('cursor')
+    
+    result = search(get_mysql(), query, board_id=board['id'] if board else None, cursor=cursor)
+    
+    if request.args.get('format') == 'json':
+        response = jsonify({
+            'hits': [dict(hit, created_at=hit['created_at'].strftime('%Y-%m-%d %H:%M')) for hit in result['hits']],
+            'next_cursor': result['next_cursor'],
+            'took_ms': result['took_ms'],
+            'cached': result['cached'],
+        })
+    else:
+        # 위치별 광고 선택
+        sidebar_ad = get_ads().pick('side')
+        banner_ad = get_ads().pick('banner')
+        footer_ad = get_ads().pick('footer')
+        
+        response = make_response(render_template('board/search.html', board=board, query=query, cursor=cursor,
+                                 hits=result['hits'], next_cursor=result['next_cursor'],
+                                 took_ms=result['took_ms'], cached=result['cached'],
+                                 sidebar_ad=sidebar_ad, banner_ad=banner_ad, footer_ad=footer_ad, is_mobile=is_mobile))
+    
+    # 검색 소요 시간을 응답 헤더로도 제공 (브라우저 개발자 도구에서 확인)
+    response.headers['Server-Timing'] = f"search;dur={result['took_ms']};desc=\"{'cache' if result['cached'] else 'db'}\""
+    return response
+
+# 게시판 인기글 (시간 감쇠 점수 순)
+@board_bp.route('/board/<string:board_route>/hot')
+def board_hot(board_route):
+    mysql = get_mysql()
+    cur = mysql.connection.cursor()
+
+    user_agent = request.headers.get('User-Agent')
+    is_mobile = 'Mobile' in user_agent
+
+    board = get_boards().get_by_route(board_route)
+
+    if not board:
+        cur.close()
+        abort(404)
+    
+    posts = fetch_hot_posts(cur, board['id'], limit=15)
+    cur.close()
+    
+    # 익명 게시판은 작성자 정보를 가림
+    if board['route'] == 'anonymous':
+        for post in posts:
+            post['nickname'] = '익명'
+            post['is_vip'] = None
+    
+    # 위치별 광고 선택
+    sidebar_ad = get_ads().pick('side')
+    banner_ad = get_ads().pick('banner')
+    footer_ad = get_ads().pick('footer')
+    
+    now = datetime.now(seoul_timezone).strftime('%Y-%m-%d %H:%M:%S')
+    
+    # 인기글은 한 페이지만 보여주므로 공지/페이지 바 없이 목록 템플릿을 사용
+    return render_template('board/list.html', board=board, posts=posts, notices=[],
+                          page=1, total_pages=1, cursors={'next': None, 'prev': None}, now=now, is_hot=True,
                           sidebar_ad=sidebar_ad, banner_ad=banner_ad, footer_ad=footer_ad, is_mobile=is_mobile)
 
 # 게시글 작성 화면
@@ -188,8 +289,7 @@ def write_post(board_route):
     user_agent = request.headers.get('User-Agent')
     is_mobile = 'Mobile' in user_agent
 
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
 
     if not board:
         cur.close()
@@ -211,16 +311,13 @@ def write_post(board_route):
     
     # 위치별 광고 선택
     # 사이드바 광고
-    cur.execute('SELECT * FROM ads WHERE position = "side" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    sidebar_ad = cur.fetchone()
+    sidebar_ad = get_ads().pick('side')
     
     # 배너 광고
-    cur.execute('SELECT * FROM ads WHERE position = "banner" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    banner_ad = cur.fetchone()
+    banner_ad = get_ads().pick('banner')
     
     # 푸터 광고
-    cur.execute('SELECT * FROM ads WHERE position = "footer" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    footer_ad = cur.fetchone()
+    footer_ad = get_ads().pick('footer')
     
     if request.method == 'POST':
         title = request.form['title']
@@ -241,11 +338,8 @@ def write_post(board_route):
                                       sidebar_ad=sidebar_ad, banner_ad=banner_ad, footer_ad=footer_ad, is_mobile=is_mobile)
             anonymous_password = hash_anonymous_password(password)
         
-        cur.execute('''
-            SELECT * FROM blocked_ips 
-            WHERE ip_address = %s AND (expires_at IS NULL OR expires_at > NOW())
-        ''', (ip_address,))
-        blocked_ip = cur.fetchone()
+        # 차단된 IP(대역)인지 확인 (메모리 차단 목록)
+        blocked_ip = get_blocks().check_ip(ip_address)
         
         if blocked_ip:
             reason = f" (사유: {blocked_ip['reason']})" if blocked_ip['reason'] else ""
@@ -255,11 +349,7 @@ def write_post(board_route):
         # 차단된 사용자인지 확인
         if board['route'] != 'anonymous' and 'loggedin' in session:
             user_id = session['id']
-            cur.execute('''
-                SELECT * FROM blocked_users 
-                WHERE user_id = %s AND (expires_at IS NULL OR expires_at > NOW())
-            ''', (user_id,))
-            blocked_user = cur.fetchone()
+            blocked_user = get_blocks().check_user(user_id)
             
             if blocked_user:
                 reason = f" (사유: {blocked_user['reason']})" if blocked_user['reason'] else ""
@@ -285,13 +375,19 @@ def write_post(board_route):
         user_id = session.get('id', 0) if board['route'] != 'anonymous' else 0
         
         cur.execute('''
-            INSERT INTO posts (board_id, user_id, title, content, video_data, created_at, view_count, is_anonymous, ip_address, anonymous_password)
-            VALUES (%s, %s, %s, %s, %s, NOW(), 0, %s, %s, %s)
-        ''', (board['id'], user_id, title, content, video_data, 1 if board['route'] == 'anonymous' else 0, ip_address, anonymous_password))
+            INSERT INTO posts (board_id, user_id, title, content, video_data, rendered_html, renderer_version, created_at, view_count, is_anonymous, ip_address, anonymous_password)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), 0, %s, %s, %s)
+        ''', (board['id'], user_id, title, content, video_data, render_post(content, video_data), RENDERER_VERSION,
+              1 if board['route'] == 'anonymous' else 0, ip_address, anonymous_password))
+        post_id = cur.lastrowid
+        index_post(cur, post_id, board['id'], title, content)
+        save_post_media(cur, current_app.static_folder, post_id, post_images(content),
+                        current_app.extensions['thumbnails'].enqueue)
         
         mysql.connection.commit()
-        post_id = cur.lastrowid
         cur.close()
+        invalidate_board_total(board['id'])
+        after_post_write(board['id'], post_id)
         
         flash('게시글이 등록되었습니다.', 'success')
         return redirect(url_for('board.view_post', board_route=board_route, post_id=post_id))
@@ -309,13 +405,27 @@ def view_post(board_route, post_id):
     user_agent = request.headers.get('User-Agent')
     is_mobile = 'Mobile' in user_agent
 
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
 
     if not board:
         cur.close()
         abort(404)
     
+    # 바뀐 내용이 없으면 쿼리/렌더링 없이 304 응답 (조회수는 그대로 기록)
+    etag, last_modified = page_validators(mysql, board['id'], post_id)
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified:
+        cur.close()
+        current_app.extensions['views'].record(post_id)
+        return not_modified
+    
+    # 비로그인 방문자는 같은 버전으로 렌더링된 페이지를 재사용 (조회수는 그대로 기록)
+    pages = current_app.extensions['pages']
+    cached = pages.cached_response(etag)
+    if cached:
+        cur.close()
+        current_app.extensions['views'].record(post_id)
+        return with_validators(cached, etag, last_modified)
     
     # 게시글 조회
     cur.execute('''
@@ -331,6 +441,10 @@ def view_post(board_route, post_id):
         cur.close()
         abort(404)
     
+    # 렌더러 버전이 바뀐 이전 게시글은 이번 조회에서 다시 렌더링해 저장
+    if ensure_rendered(cur, post):
+        mysql.connection.commit()
+    
     # 익명 게시판인 경우 IP 기반 닉네임 설정
     if post['is_anonymous'] and post['ip_address']:
         post['nickname'] = '익명'  # 게시글은 단순히 '익명'으로 표시
@@ -340,25 +454,10 @@ def view_post(board_route, post_id):
     # 현재 로그인한 사용자가 관리자인지 확인
     is_admin = session.get('is_admin', False)
     
-    # 이미지 데이터 처리
-    images_data = None
-    if post.get('images_data'):
-        try:
-            images_data = json.loads(post['images_data'])
-        except (json.JSONDecodeError, TypeError):
-            pass
-    
-    # 이전 형식의 단일 이미지 처리
-    if post.get('image_path') and not images_data:
-        # 단일 이미지를 images_data 형식에 맞게 변환
-        images_data = {
-            'paths': [post['image_path']],
-            'captions': ['']
-        }
-    
-    # 조회수 증가
-    cur.execute('UPDATE posts SET view_count = view_count + 1 WHERE id = %s', (post_id,))
-    mysql.connection.commit()
+    # 조회수 증가 (버퍼에 모아 주기적으로 반영, 인기글 점수 포함)
+    views = current_app.extensions['views']
+    views.record(post_id)
+    post['view_count'] += views.pending(post_id)
     
     # 댓글 조회
     cur.execute('''
@@ -378,84 +477,62 @@ def view_post(board_route, post_id):
         elif comment['is_anonymous']:
             comment['nickname'] = '익명'
     
-    # 좋아요 정보 조회
-    like_count = 0
-    is_liked = False
-    
-    cur.execute('SELECT COUNT(*) as count FROM post_likes WHERE post_id = %s', (post_id,))
-    like_result = cur.fetchone()
-    like_count = like_result['count'] if like_result else 0
-    
+    # 좋아요 정보 조회 (좋아요 수는 posts.like_count 카운터 사용)
+    like_count = post['like_count']
     if 'loggedin' in session:
         # 로그인 사용자의 경우
-        cur.execute('SELECT * FROM post_likes WHERE post_id = %s AND user_id = %s', (post_id, session['id']))
-        is_liked = bool(cur.fetchone())
+        is_liked = has_liked(cur, post_id, user_id=session['id'])
+    elif pages.eligible():
+        # 공유(캐시) 페이지는 추천 여부를 viewer_fragment 로 따로 받음
+        is_liked = False
     else:
         # 비로그인 사용자의 경우 IP 주소 기반
-        ip_address = request.remote_addr
-        cur.execute('SELECT * FROM post_likes WHERE post_id = %s AND ip_address = %s AND user_id IS NULL', 
-                   (post_id, ip_address))
-        is_liked = bool(cur.fetchone())
+        is_liked = has_liked(cur, post_id, ip_address=request.remote_addr)
     
     # 위치별 광고 선택
     # 사이드바 광고
-    cur.execute('SELECT * FROM ads WHERE position = "side" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    sidebar_ad = cur.fetchone()
+    sidebar_ad = get_ads().pick('side')
     
     # 배너 광고
-    cur.execute('SELECT * FROM ads WHERE position = "banner" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    banner_ad = cur.fetchone()
+    banner_ad = get_ads().pick('banner')
     
     # 푸터 광고
-    cur.execute('SELECT * FROM ads WHERE position = "footer" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    footer_ad = cur.fetchone()
+    footer_ad = get_ads().pick('footer')
 
     # 푸터 광고
-    cur.execute('SELECT * FROM ads WHERE position = "center" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    center_ad = cur.fetchone()
+    center_ad = get_ads().pick('center')
     
     # 댓글 아래에 표시할 게시판 리스트 조회
     page = request.args.get('page', 1, type=int)
     per_page = 15
-    offset = (page - 1) * per_page
     
-    # 총 게시글 수 조회 (페이지네이션용)
-    cur.execute('SELECT COUNT(*) as count FROM posts WHERE board_id = %s', (board['id'],))
-    total_count = cur.fetchone()['count']
-    total_pages = (total_count + per_page - 1) // per_page
+    # 총 게시글 수 조회 (페이지네이션용, 캐시된 값)
+    total_count = get_board_total(cur, board['id'])
+    total_pages = count_pages(total_count, per_page)
     
     if board['route'] == 'anonymous':
-        cur.execute('''
-            SELECT posts.*, '익명' as nickname,
-                   (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-                   (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count
+        posts, page, _ = fetch_posts_page(cur, '''
+            SELECT posts.*, '익명' as nickname
             FROM posts
-            WHERE posts.board_id = %s
-            ORDER BY posts.created_at DESC
-            LIMIT %s OFFSET %s
-        ''', (board['id'], per_page, offset))
+        ''', board['id'], per_page, page=page)
     else:
-        cur.execute('''
-            SELECT posts.*, users.nickname, users.is_vip,
-                   (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-                   (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count
+        posts, page, _ = fetch_posts_page(cur, '''
+            SELECT posts.*, users.nickname, users.is_vip
             FROM posts
             JOIN users ON posts.user_id = users.id
-            WHERE posts.board_id = %s
-            ORDER BY posts.created_at DESC
-            LIMIT %s OFFSET %s
-        ''', (board['id'], per_page, offset))
-    posts = cur.fetchall()
+        ''', board['id'], per_page, page=page)
     now = datetime.now(seoul_timezone).strftime('%Y-%m-%d %H:%M:%S')
 
     cur.close()
     
-    return render_template('board/view.html', board=board, post=post,
+    response = pages.render(etag, [('board', board['id']), ('post', post_id)], 'board/view.html',
+                          fragment_args={'post_id': post_id}, board=board, post=post,
                           comments=comments, like_count=like_count,
-                          is_liked=is_liked, images_data=images_data,
+                          is_liked=is_liked,
                           sidebar_ad=sidebar_ad, banner_ad=banner_ad, footer_ad=footer_ad,
                           center_ad=center_ad, posts=posts, now=now, is_admin=is_admin, 
                           is_mobile=is_mobile, page=page, total_pages=total_pages)
+    return with_validators(response, etag, last_modified)
 
 # 댓글 작성
 @board_bp.route('/board/<string:board_route>/<int:post_id>/comment', methods=['POST'])
@@ -464,8 +541,7 @@ def write_comment(board_route, post_id):
     mysql = get_mysql()
     cur = mysql.connection.cursor()
     
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
 
     if not board:
         cur.close()
@@ -480,12 +556,8 @@ def write_comment(board_route, post_id):
     # 클라이언트 IP 주소 가져오기
     ip_address = request.remote_addr
     
-    # 차단된 IP 주소인지 확인
-    cur.execute('''
-        SELECT * FROM blocked_ips 
-        WHERE ip_address = %s AND (expires_at IS NULL OR expires_at > NOW())
-    ''', (ip_address,))
-    blocked_ip = cur.fetchone()
+    # 차단된 IP(대역)인지 확인 (메모리 차단 목록)
+    blocked_ip = get_blocks().check_ip(ip_address)
     
     if blocked_ip:
         reason = f" (사유: {blocked_ip['reason']})" if blocked_ip['reason'] else ""
@@ -516,11 +588,7 @@ def write_comment(board_route, post_id):
         user_id = session['id']
         
         # 차단된 사용자인지 확인
-        cur.execute('''
-            SELECT * FROM blocked_users 
-            WHERE user_id = %s AND (expires_at IS NULL OR expires_at > NOW())
-        ''', (user_id,))
-        blocked_user = cur.fetchone()
+        blocked_user = get_blocks().check_user(user_id)
         
         if blocked_user:
             reason = f" (사유: {blocked_user['reason']})" if blocked_user['reason'] else ""
@@ -539,72 +607,57 @@ def write_comment(board_route, post_id):
         INSERT INTO comments (post_id, user_id, content, created_at, is_anonymous, ip_address, anonymous_password)
         VALUES (%s, %s, %s, NOW(), %s, %s, %s)
     ''', (post_id, user_id, content, 1 if board['route'] == 'anonymous' else 0, ip_address, anonymous_password))
+    index_comment(cur, cur.lastrowid, post_id, board['id'], content)
+    adjust_comment_count(cur, post_id, 1)
+    add_post_score(cur, post_id, board['id'], COMMENT_WEIGHT)
     
     mysql.connection.commit()
     cur.close()
+    after_post_write(board['id'], post_id)
     
     flash('댓글이 등록되었습니다.', 'success')
     return redirect(url_for('board.view_post', board_route=board_route, post_id=post_id))
 
-# 게시글 좋아요
+# 게시글 좋아요 (토글)
+# fetch 요청(Accept: application/json)에는 JSON으로, 일반 폼 전송에는 게시글로 리다이렉트로 응답합니다.
 @board_bp.route('/board/<string:board_route>/<int:post_id>/like', methods=['POST'])
 def like_post(board_route, post_id):
     # 필요한 객체는 current_app을 통해 접근
     mysql = get_mysql()
     cur = mysql.connection.cursor()
+    wants_json = request.accept_mimetypes.best == 'application/json'
     
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
 
     if not board:
         cur.close()
         abort(404)
     
-    cur.execute('SELECT * FROM posts WHERE id = %s AND board_id = %s', (post_id, board['id']))
+    cur.execute('SELECT id, like_count FROM posts WHERE id = %s AND board_id = %s', (post_id, board['id']))
     post = cur.fetchone()
     
     if not post:
         cur.close()
         abort(404)
     
-    # 로그인 사용자와 비로그인 사용자 구분
+    # 로그인 사용자는 user_id, 비로그인 사용자는 IP 주소 기준으로 토글
     if 'loggedin' in session:
-        # 로그인 사용자의 경우
-        user_id = session['id']
-        ip_address = None
-        
-        # 이미 좋아요 했는지 확인
-        cur.execute('SELECT * FROM post_likes WHERE post_id = %s AND user_id = %s', (post_id, user_id))
-        like = cur.fetchone()
-        
-        if like:
-            # 이미 좋아요 했으면 취소
-            cur.execute('DELETE FROM post_likes WHERE post_id = %s AND user_id = %s', (post_id, user_id))
-        else:
-            # 좋아요 추가
-            cur.execute('INSERT INTO post_likes (post_id, user_id, ip_address, created_at) VALUES (%s, %s, %s, NOW())', 
-                       (post_id, user_id, ip_address))
+        liked, delta = toggle_like(cur, post_id, user_id=session['id'])
     else:
-        # 비로그인 사용자의 경우 IP 주소 기반
-        user_id = None
-        ip_address = request.remote_addr
-        
-        # 이미 좋아요 했는지 확인 (IP 주소 기반)
-        cur.execute('SELECT * FROM post_likes WHERE post_id = %s AND ip_address = %s AND user_id IS NULL', 
-                   (post_id, ip_address))
-        like = cur.fetchone()
-        
-        if like:
-            # 이미 좋아요 했으면 취소
-            cur.execute('DELETE FROM post_likes WHERE post_id = %s AND ip_address = %s AND user_id IS NULL', 
-                       (post_id, ip_address))
-        else:
-            # 좋아요 추가
-            cur.execute('INSERT INTO post_likes (post_id, user_id, ip_address, created_at) VALUES (%s, %s, %s, NOW())', 
-                       (post_id, user_id, ip_address))
+        liked, delta = toggle_like(cur, post_id, ip_address=request.remote_addr)
+    
+    like_count = post['like_count']
+    if delta:
+        like_count = adjust_like_count(cur, post_id, delta)
+        add_post_score(cur, post_id, board['id'], LIKE_WEIGHT * delta)
     
     mysql.connection.commit()
     cur.close()
+    if delta:
+        after_post_write(board['id'], post_id)
+    
+    if wants_json:
+        return jsonify({'success': True, 'liked': liked, 'like_count': like_count})
     return redirect(url_for('board.view_post', board_route=board_route, post_id=post_id))
 
 # 게시글 수정 화면
@@ -618,8 +671,7 @@ def edit_post(board_route, post_id):
     user_agent = request.headers.get('User-Agent')
     is_mobile = 'Mobile' in user_agent
     
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
 
     if not board:
         cur.close()
@@ -648,34 +700,15 @@ def edit_post(board_route, post_id):
         flash('게시글 수정 권한이 없습니다.', 'danger')
         return redirect(url_for('board.view_post', board_route=board_route, post_id=post_id))
     
-    # 이미지 데이터 처리
-    images_data = None
-    if post.get('images_data'):
-        try:
-            images_data = json.loads(post['images_data'])
-        except (json.JSONDecodeError, TypeError):
-            pass
-    
-    # 이전 형식의 단일 이미지 처리
-    if post.get('image_path') and not images_data:
-        # 단일 이미지를 images_data 형식에 맞게 변환
-        images_data = {
-            'paths': [post['image_path']],
-            'captions': ['']
-        }
-    
     # 위치별 광고 선택
     # 사이드바 광고
-    cur.execute('SELECT * FROM ads WHERE position = "side" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    sidebar_ad = cur.fetchone()
+    sidebar_ad = get_ads().pick('side')
     
     # 배너 광고
-    cur.execute('SELECT * FROM ads WHERE position = "banner" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    banner_ad = cur.fetchone()
+    banner_ad = get_ads().pick('banner')
     
     # 푸터 광고
-    cur.execute('SELECT * FROM ads WHERE position = "footer" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    footer_ad = cur.fetchone()
+    footer_ad = get_ads().pick('footer')
     
     if request.method == 'POST':
         title = request.form['title']
@@ -693,19 +726,21 @@ def edit_post(board_route, post_id):
         # 게시글 수정
         cur.execute('''
             UPDATE posts 
-            SET title = %s, content = %s, video_data = %s, updated_at = NOW()
+            SET title = %s, content = %s, video_data = %s, rendered_html = %s, renderer_version = %s, updated_at = NOW()
             WHERE id = %s
-        ''', (title, content, video_data, post_id))
+        ''', (title, content, video_data, render_post(content, video_data), RENDERER_VERSION, post_id))
+        index_post(cur, post_id, board['id'], title, content)
+        save_post_media(cur, current_app.static_folder, post_id,
+                        post_images(content, post.get('images_data'), post.get('image_path')),
+                        current_app.extensions['thumbnails'].enqueue)
         
         mysql.connection.commit()
         cur.close()
+        after_post_write(board['id'], post_id)
         
         flash('게시글이 수정되었습니다.', 'success')
         return redirect(url_for('board.view_post', board_route=board_route, post_id=post_id))
     
-    # JSON 데이터를 템플릿에서 사용할 수 있도록 문자열로 변환
-    post['images_data_json'] = json.dumps(images_data or {'paths': [], 'captions': []})
-    
     return render_template('board/edit.html', board=board, post=post, 
                           sidebar_ad=sidebar_ad, banner_ad=banner_ad, footer_ad=footer_ad)
 
@@ -728,8 +763,7 @@ def delete_post(board_route, post_id):
     cur = mysql.connection.cursor()
     
     try:
-        cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-        board = cur.fetchone()
+        board = get_boards().get_by_route(board_route)
 
         if not board:
             cur.close()
@@ -762,6 +796,8 @@ def delete_post(board_route, post_id):
             
             # 변경사항 커밋
             mysql.connection.commit()
+            invalidate_board_total(board['id'])
+            after_post_write(board['id'], post_id)
             flash('게시글이 삭제되었습니다.', 'success')
             
         except Exception as e:
@@ -785,8 +821,7 @@ def delete_comment(board_route, post_id, comment_id):
     cur = mysql.connection.cursor()
     
     # 게시판 데이터 조회
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
 
     if not board:
         cur.close()
@@ -817,8 +852,13 @@ def delete_comment(board_route, post_id, comment_id):
     
     # 댓글 삭제
     cur.execute('DELETE FROM comments WHERE id = %s', (comment_id,))
+    removed = cur.rowcount
+    unindex_comment(cur, comment_id)
+    adjust_comment_count(cur, post_id, -removed)
+    add_post_score(cur, post_id, board['id'], -COMMENT_WEIGHT * removed)
     mysql.connection.commit()
     cur.close()
+    after_post_write(board['id'], post_id)
     
     flash('댓글이 삭제되었습니다.', 'success')
     return redirect(url_for('board.view_post', board_route=board_route, post_id=post_id))
@@ -830,59 +870,61 @@ def board_posts_json(board_route):
     mysql = get_mysql()
     cur = mysql.connection.cursor()
 
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
 
     if not board:
         cur.close()
         abort(404)
     
-    # 페이지네이션
+    # 마지막 요청 이후 바뀐 내용이 없으면 304 응답
+    etag, last_modified = page_validators(mysql, board['id'], html=False)
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified:
+        cur.close()
+        return not_modified
+    
+    # 페이지네이션 (before/after 커서가 있으면 커서 방식, 없으면 ?page= 방식)
     page = request.args.get('page', 1, type=int)
+    before = request.args.get('before')
+    after = request.args.get('after')
     per_page = 15
-    offset = (page - 1) * per_page
     
-    # 총 게시글 수 조회 (페이지네이션용)
-    cur.execute('SELECT COUNT(*) as count FROM posts WHERE board_id = %s', (board['id'],))
-    total_count = cur.fetchone()['count']
-    total_pages = (total_count + per_page - 1) // per_page
+    # 총 게시글 수 조회 (페이지네이션용, 캐시된 값)
+    total_count = get_board_total(cur, board['id'])
+    total_pages = count_pages(total_count, per_page)
     
     # 게시글 조회
     if board['route'] == 'anonymous':
-        cur.execute('''
-            SELECT posts.*, '익명' as nickname,
-                   (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-                   (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count
+        posts, page, cursors = fetch_posts_page(cur, '''
+            SELECT posts.*, '익명' as nickname
             FROM posts
-            WHERE posts.board_id = %s
-            ORDER BY posts.created_at DESC
-            LIMIT %s OFFSET %s
-        ''', (board['id'], per_page, offset))
+        ''', board['id'], per_page, page=page, before=before, after=after)
     else:
-        cur.execute('''
-            SELECT posts.*, users.nickname, users.is_vip,
-                   (SELECT COUNT(*) FROM comments WHERE post_id = posts.id) as comment_count,
-                   (SELECT COUNT(*) FROM post_likes WHERE post_id = posts.id) as like_count
+        posts, page, cursors = fetch_posts_page(cur, '''
+            SELECT posts.*, users.nickname, users.is_vip
             FROM posts
             JOIN users ON posts.user_id = users.id
-            WHERE posts.board_id = %s
-            ORDER BY posts.created_at DESC
-            LIMIT %s OFFSET %s
-        ''', (board['id'], per_page, offset))
+        ''', board['id'], per_page, page=page, before=before, after=after)
     
-    posts = cur.fetchall()
     cur.close()
     
+    # 목록에는 렌더링된 본문이 필요 없으므로 응답에서 제외
+    for post in posts:
+        post.pop('rendered_html', None)
+    
     # 현재 날짜 정보 가져오기
     now = datetime.now(seoul_timezone).strftime('%Y-%m-%d %H:%M:%S')
     
-    return jsonify({
+    response = jsonify({
         'board': board,
         'posts': posts,
         'now': now,
         'page': page,
-        'total_pages': total_pages
+        'total_pages': total_pages,
+        'next_cursor': cursors['next'],
+        'prev_cursor': cursors['prev']
     })
+    return with_validators(response, etag, last_modified)
 
 # 익명 게시글 비밀번호 확인
 @board_bp.route('/board/<string:board_route>/<int:post_id>/verify_password', methods=['POST'])
@@ -890,8 +932,7 @@ def verify_anonymous_post_password(board_route, post_id):
     mysql = get_mysql()
     cur = mysql.connection.cursor()
     
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
     
     if not board or board['route'] != 'anonymous':
         cur.close()
@@ -940,8 +981,7 @@ def edit_anonymous_post(board_route, post_id):
     mysql = get_mysql()
     cur = mysql.connection.cursor()
     
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
     
     if not board or board['route'] != 'anonymous':
         cur.close()
@@ -969,12 +1009,9 @@ def edit_anonymous_post(board_route, post_id):
     is_mobile = 'Mobile' in user_agent
     
     # 위치별 광고 선택
-    cur.execute('SELECT * FROM ads WHERE position = "side" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    sidebar_ad = cur.fetchone()
-    cur.execute('SELECT * FROM ads WHERE position = "banner" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    banner_ad = cur.fetchone()
-    cur.execute('SELECT * FROM ads WHERE position = "footer" AND is_active = 1 ORDER BY RAND() LIMIT 1')
-    footer_ad = cur.fetchone()
+    sidebar_ad = get_ads().pick('side')
+    banner_ad = get_ads().pick('banner')
+    footer_ad = get_ads().pick('footer')
     
     if request.method == 'POST':
         title = request.form['title']
@@ -997,12 +1034,17 @@ def edit_anonymous_post(board_route, post_id):
         # 게시글 수정
         cur.execute('''
             UPDATE posts 
-            SET title = %s, content = %s, video_data = %s, updated_at = NOW()
+            SET title = %s, content = %s, video_data = %s, rendered_html = %s, renderer_version = %s, updated_at = NOW()
             WHERE id = %s AND is_anonymous = 1
-        ''', (title, content, video_data, post_id))
+        ''', (title, content, video_data, render_post(content, video_data), RENDERER_VERSION, post_id))
+        index_post(cur, post_id, board['id'], title, content)
+        save_post_media(cur, current_app.static_folder, post_id,
+                        post_images(content, post.get('images_data'), post.get('image_path')),
+                        current_app.extensions['thumbnails'].enqueue)
         
         mysql.connection.commit()
         cur.close()
+        after_post_write(board['id'], post_id)
         
         # 인증 세션 삭제
         if auth_key in session:
@@ -1017,9 +1059,6 @@ def edit_anonymous_post(board_route, post_id):
     else:
         post['nickname'] = '익명'
     
-    # JSON 데이터를 템플릿에서 사용할 수 있도록 문자열로 변환
-    post['images_data_json'] = json.dumps({} or {'paths': [], 'captions': []})
-    
     return render_template('board/edit_anonymous.html', board=board, post=post, 
                           sidebar_ad=sidebar_ad, banner_ad=banner_ad, footer_ad=footer_ad)
 
@@ -1029,8 +1068,7 @@ def delete_anonymous_post(board_route, post_id):
     mysql = get_mysql()
     cur = mysql.connection.cursor()
     
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
     
     if not board or board['route'] != 'anonymous':
         cur.close()
@@ -1074,6 +1112,8 @@ def delete_anonymous_post(board_route, post_id):
         cur.execute('DELETE FROM posts WHERE id = %s AND is_anonymous = 1', (post_id,))
         
         mysql.connection.commit()
+        invalidate_board_total(board['id'])
+        after_post_write(board['id'], post_id)
         
         # 인증 세션 삭제
         if auth_key in session:
@@ -1095,8 +1135,7 @@ def verify_anonymous_comment_password(board_route, post_id, comment_id):
     mysql = get_mysql()
     cur = mysql.connection.cursor()
     
-    cur.execute('SELECT * FROM boards WHERE route = %s', (board_route,))
-    board = cur.fetchone()
+    board = get_boards().get_by_route(board_route)
     
     if not board or board['route'] != 'anonymous':
         cur.close()
@@ -1125,8 +1164,14 @@ def verify_anonymous_comment_password(board_route, post_id, comment_id):
     
     # 댓글 삭제
     cur.execute('DELETE FROM comments WHERE id = %s AND is_anonymous = 1', (comment_id,))
+    removed = cur.rowcount
+    if removed:
+        unindex_comment(cur, comment_id)
+    adjust_comment_count(cur, post_id, -removed)
+    add_post_score(cur, post_id, board['id'], -COMMENT_WEIGHT * removed)
     mysql.connection.commit()
     cur.close()
+    after_post_write(board['id'], post_id)
     
     flash('댓글이 삭제되었습니다.', 'success')
     return redirect(url_for('board.view_post', board_route=board_route, post_id=post_id)) 
@@ -44,11 +44,18 @@ CREATE TABLE IF NOT EXISTS posts (
     content TEXT NOT NULL,
     image_path VARCHAR(255) NULL,
     images_data TEXT NULL,
+    cover_thumb VARCHAR(255) NULL,
     video_data TEXT NULL,
+    rendered_html MEDIUMTEXT NULL,
+    renderer_version INT NOT NULL DEFAULT 0,
     view_count INT NOT NULL DEFAULT 0,
+    comment_count INT NOT NULL DEFAULT 0,
+    like_count INT NOT NULL DEFAULT 0,
     is_anonymous TINYINT(1) NOT NULL DEFAULT 0,
     created_at DATETIME NOT NULL,
     updated_at DATETIME NULL,
+    INDEX idx_posts_board_created (board_id, created_at),
+    INDEX idx_posts_user_created (user_id, created_at),
     FOREIGN KEY (board_id) REFERENCES boards(id) ON DELETE CASCADE
 );
 
@@ -60,6 +67,7 @@ CREATE TABLE IF NOT EXISTS comments (
     content TEXT NOT NULL,
     is_anonymous TINYINT(1) NOT NULL DEFAULT 0,
     created_at DATETIME NOT NULL,
+    INDEX idx_comments_post_created (post_id, created_at),
     FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
 );
 
@@ -67,9 +75,25 @@ CREATE TABLE IF NOT EXISTS comments (
 CREATE TABLE IF NOT EXISTS post_likes (
     id INT AUTO_INCREMENT PRIMARY KEY,
     post_id INT NOT NULL,
-    user_id INT NOT NULL,
+    user_id INT,
+    ip_address VARCHAR(45),
     created_at DATETIME NOT NULL,
+    -- 비로그인(IP) 좋아요에만 값이 있는 컬럼 (IP 좋아요 중복 방지용)
+    anon_ip VARCHAR(45) AS (IF(user_id IS NULL, ip_address, NULL)) STORED,
     UNIQUE KEY unique_post_user (post_id, user_id),
+    UNIQUE KEY unique_post_anon_ip (post_id, anon_ip),
+    INDEX idx_post_likes_post_ip_user (post_id, ip_address, user_id),
+    FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+);
+
+-- 인기글 점수 테이블 (시간 감쇠, services/post_scores.py 참고)
+CREATE TABLE IF NOT EXISTS post_scores (
+    post_id INT PRIMARY KEY,
+    board_id INT NOT NULL,
+    score DOUBLE NOT NULL DEFAULT 0,
+    decayed_at DATETIME NOT NULL,
+    INDEX idx_post_scores_score (score),
+    INDEX idx_post_scores_board_score (board_id, score),
     FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
 );
 
@@ -80,6 +104,7 @@ CREATE TABLE IF NOT EXISTS ads (
     content TEXT NOT NULL,
     image_path VARCHAR(255) NULL,
     link VARCHAR(255) NULL,
+    weight INT NOT NULL DEFAULT 1,
     is_active TINYINT(1) NOT NULL DEFAULT 1,
     created_at DATETIME NOT NULL
 );
@@ -107,6 +132,7 @@ CREATE TABLE IF NOT EXISTS messages (
     sender_deleted TINYINT(1) NOT NULL DEFAULT 0,
     receiver_deleted TINYINT(1) NOT NULL DEFAULT 0,
     created_at DATETIME NOT NULL,
+    INDEX idx_messages_receiver_unread (receiver_id, is_read, receiver_deleted),
     FOREIGN KEY (sender_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (receiver_id) REFERENCES users(id) ON DELETE CASCADE
 );
@@ -120,10 +146,72 @@ CREATE TABLE IF NOT EXISTS friendships (
     created_at DATETIME NOT NULL,
     updated_at DATETIME NULL,
     UNIQUE KEY unique_friendship (user_id, friend_id),
+    INDEX idx_friendships_friend_status (friend_id, status),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (friend_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- 사용자별 알림 카운터 (services/notifications.py 참고)
+CREATE TABLE IF NOT EXISTS user_notification_counts (
+    user_id INT PRIMARY KEY,
+    unread_messages INT NOT NULL DEFAULT 0,
+    friend_requests INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- 게시글/댓글 전문 검색 색인 (ngram 파서, services/search.py 참고)
+CREATE TABLE IF NOT EXISTS search_documents (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    doc_type ENUM('post', 'comment') NOT NULL,
+    doc_id INT NOT NULL,
+    post_id INT NOT NULL,
+    board_id INT NOT NULL,
+    title VARCHAR(255) NOT NULL DEFAULT '',
+    body MEDIUMTEXT NOT NULL,
+    created_at DATETIME NOT NULL,
+    UNIQUE KEY unique_search_doc (doc_type, doc_id),
+    INDEX idx_search_documents_post (post_id),
+    FULLTEXT INDEX ft_search_title (title) WITH PARSER ngram,
+    FULLTEXT INDEX ft_search_title_body (title, body) WITH PARSER ngram,
+    FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+);
+
+-- 내용 주소 기반 업로드 파일 (services/media_store.py 참고)
+CREATE TABLE IF NOT EXISTS media (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    sha256 CHAR(64) NOT NULL,
+    path VARCHAR(255) NOT NULL,
+    size INT NOT NULL,
+    width INT NULL,
+    height INT NULL,
+    created_at DATETIME NOT NULL,
+    UNIQUE KEY unique_media_sha256 (sha256)
+);
+
+-- 조건부 GET용 게시판/게시글 변경 버전 (services/content_versions.py 참고)
+CREATE TABLE IF NOT EXISTS content_versions (
+    scope VARCHAR(10) NOT NULL,
+    object_id INT NOT NULL,
+    version INT NOT NULL DEFAULT 0,
+    changed_at DATETIME(3) NOT NULL,
+    PRIMARY KEY (scope, object_id)
+);
+
+-- 게시글 이미지 목록 (services/post_media.py 참고)
+CREATE TABLE IF NOT EXISTS post_media (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    post_id INT NOT NULL,
+    ordinal SMALLINT NOT NULL,
+    path VARCHAR(255) NOT NULL,
+    thumb_path VARCHAR(255) NULL,
+    width INT NULL,
+    height INT NULL,
+    caption VARCHAR(255) NOT NULL DEFAULT '',
+    UNIQUE KEY unique_post_media_ordinal (post_id, ordinal),
+    INDEX idx_post_media_path (path),
+    FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+);
+
 -- 기본 게시판 데이터 삽입
 INSERT INTO boards (name, route, description, created_at) VALUES
 ('자유', 'free', '자유롭게 이야기를 나눌 수 있는 게시판입니다.', NOW()),
@@ -0,0 +1,63 @@
+# 광고 로테이션
+# 활성화된 광고를 위치별로 워커 메모리에 두고, 요청마다 DB 조회(ORDER BY RAND()) 없이 가중치 랜덤으로 고릅니다.
+# 광고가 추가/수정/삭제되면 workers.publish('ads')로 모든 워커의 캐시를 비웁니다.
+import random
+import threading
+import time
+
+from services import workers
+
+# 알림 없이 바뀐 경우를 대비한 최대 유지 시간 (초)
+RELOAD_INTERVAL = 300
+
+
+class AdRotation:
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._by_position = {}
+        self._loaded_at = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        workers.subscribe('ads', self.invalidate)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def load(self):
+        """활성화된 광고를 DB에서 다시 읽습니다. (앱 컨텍스트 필요)"""
+        cur = self.app.extensions['mysql'].connection.cursor()
+        cur.execute('SELECT * FROM ads WHERE is_active = 1')
+        rows = cur.fetchall()
+        cur.close()
+
+        by_position = {}
+        for row in rows:
+            weight = row.get('weight')
+            weight = 1 if weight is None else weight
+            if weight <= 0:
+                continue
+            ads, weights = by_position.setdefault(row['position'], ([], []))
+            ads.append(dict(row))
+            weights.append(weight)
+
+        with self._lock:
+            self._by_position = by_position
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > RELOAD_INTERVAL:
+            self.load()
+
+    def pick(self, position):
+        """위치에 맞는 광고 하나를 가중치 랜덤으로 고릅니다. 없으면 None."""
+        self._ensure_loaded()
+        entry = self._by_position.get(position)
+        if not entry:
+            return None
+        ads, weights = entry
+        return dict(random.choices(ads, weights=weights)[0])
@@ -0,0 +1,199 @@
+# 정적 파일 지문(fingerprint) 빌드와 캐시
+# `flask build-assets` 가 static/css, static/js, static/vendor 의 파일을 내용 해시가 붙은 이름으로
+# static/dist 에 복사하고 .gz/.br 압축본과 manifest.json 을 만듭니다.
+# url_for('static', filename='css/style.css') 는 manifest 가 있으면 해시 파일 주소로 바뀌고,
+# dist 아래 파일은 내용이 바뀌면 이름도 바뀌므로 1년 immutable 캐시로 응답합니다.
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import urllib.request
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 .gz만 생성
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_FILE = 'manifest.json'
+
+# 지문을 붙일 디렉터리 (static 기준)
+ASSET_DIRS = ('css', 'js', 'vendor')
+ASSET_EXTENSIONS = {'.css', '.js', '.svg', '.png', '.jpg', '.gif', '.webp', '.woff', '.woff2', '.ttf', '.eot'}
+# 미리 압축해 둘 형식 (이미 압축된 이미지/woff2 제외)
+COMPRESS_EXTENSIONS = {'.css', '.js', '.svg', '.ttf', '.eot'}
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# 외부 CDN에서 받아 static/vendor 에 두는 파일 (static 기준 경로 -> 원본 주소)
+# 아직 받지 않았으면 asset_url()이 원본 CDN 주소를 대신 반환합니다.
+VENDOR_ASSETS = {
+    'vendor/bootstrap/css/bootstrap.min.css':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'vendor/bootstrap/js/bootstrap.bundle.min.js':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'vendor/jquery/jquery-3.6.0.min.js':
+        'https://code.jquery.com/jquery-3.6.0.min.js',
+    'vendor/fontawesome/css/all.min.css':
+        'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+}
+for _font in ('fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility'):
+    for _ext in ('woff2', 'ttf'):
+        VENDOR_ASSETS[f'vendor/fontawesome/webfonts/{_font}.{_ext}'] = \
+            f'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/webfonts/{_font}.{_ext}'
+
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def fetch_vendor_assets(static_folder, force=False):
+    """VENDOR_ASSETS 를 내려받습니다. 받은 파일 수를 반환합니다."""
+    fetched = 0
+    for relpath, source_url in VENDOR_ASSETS.items():
+        target = os.path.join(static_folder, relpath)
+        if os.path.exists(target) and not force:
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with urllib.request.urlopen(source_url, timeout=30) as response:
+            data = response.read()
+        with open(f'{target}.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(f'{target}.tmp', target)
+        fetched += 1
+    return fetched
+
+
+def _iter_assets(static_folder):
+    for directory in ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(static_folder, directory)):
+            for filename in files:
+                if os.path.splitext(filename)[1].lower() in ASSET_EXTENSIONS:
+                    full_path = os.path.join(root, filename)
+                    yield os.path.relpath(full_path, static_folder).replace(os.sep, '/')
+
+
+def _fingerprinted(relpath, data):
+    stem, ext = posixpath.splitext(relpath)
+    return f'{DIST_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+
+def _rewrite_css_urls(relpath, css, manifest):
+    """CSS의 상대 url()을 해시 파일 경로로 바꿉니다. (폰트/이미지가 먼저 처리되어 있어야 함)"""
+    source_dir = posixpath.dirname(relpath)
+    dist_dir = posixpath.dirname(f'{DIST_DIR}/{relpath}')
+
+    def replace(match):
+        ref = match.group(2).strip()
+        if ref.startswith(('data:', 'http:', 'https:', '//', '#', '/')):
+            return match.group(0)
+        # 폰트 주소의 ?v=... 나 #iefix 같은 꼬리는 그대로 둠
+        split_at = len(ref)
+        for marker in ('?', '#'):
+            if marker in ref:
+                split_at = min(split_at, ref.index(marker))
+        path, suffix = ref[:split_at], ref[split_at:]
+        target = posixpath.normpath(posixpath.join(source_dir, path))
+        if target not in manifest:
+            return match.group(0)
+        quote = match.group(1)
+        return f'url({quote}{posixpath.relpath(manifest[target], dist_dir)}{suffix}{quote})'
+
+    return CSS_URL_RE.sub(replace, css)
+
+
+def _write(static_folder, relpath, data):
+    target = os.path.join(static_folder, relpath)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(data)
+    if posixpath.splitext(relpath)[1].lower() in COMPRESS_EXTENSIONS:
+        with open(f'{target}.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(f'{target}.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+
+
+def build_assets(static_folder):
+    """정적 파일을 지문이 붙은 이름으로 static/dist 에 복사하고 manifest 를 반환합니다."""
+    manifest = {}
+    relpaths = sorted(_iter_assets(static_folder), key=lambda p: (p.endswith('.css'), p))
+    for relpath in relpaths:
+        with open(os.path.join(static_folder, relpath), 'rb') as f:
+            data = f.read()
+        if relpath.endswith('.css'):
+            data = _rewrite_css_urls(relpath, data.decode('utf-8'), manifest).encode('utf-8')
+        manifest[relpath] = _fingerprinted(relpath, data)
+        _write(static_folder, manifest[relpath], data)
+
+    manifest_path = os.path.join(static_folder, DIST_DIR, MANIFEST_FILE)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(f'{manifest_path}.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f'{manifest_path}.tmp', manifest_path)
+    return manifest
+
+
+class AssetManifest:
+    def __init__(self, app=None):
+        self.app = None
+        self._manifest = {}
+        self._cdn_urls = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.load()
+        app.url_defaults(self._fingerprint_url)
+        app.add_template_global(self.asset_url, 'asset_url')
+        # dist 아래 파일은 압축본/immutable 캐시로 응답하도록 기본 static 뷰 교체
+        app.view_functions['static'] = self.send_static
+
+    def load(self):
+        try:
+            with open(os.path.join(self.app.static_folder, DIST_DIR, MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            # 빌드 전에는 원래 파일을 그대로 사용
+            manifest = {}
+        # 아직 받지 않은 외부 라이브러리는 CDN 주소 사용 (렌더링마다 파일을 확인하지 않도록 여기서 한 번만 결정)
+        self._cdn_urls = {
+            filename: url for filename, url in VENDOR_ASSETS.items()
+            if filename not in manifest and not os.path.exists(os.path.join(self.app.static_folder, filename))
+        }
+        self._manifest = manifest
+
+    def _fingerprint_url(self, endpoint, values):
+        if endpoint == 'static':
+            filename = values.get('filename')
+            if filename in self._manifest:
+                values['filename'] = self._manifest[filename]
+
+    def asset_url(self, filename):
+        """정적 파일 주소. 아직 받지 않은 외부 라이브러리는 원본 CDN 주소를 반환합니다."""
+        if filename in self._cdn_urls:
+            return self._cdn_urls[filename]
+        return url_for('static', filename=filename)
+
+    def send_static(self, filename):
+        if not filename.startswith(f'{DIST_DIR}/'):
+            return self.app.send_static_file(filename)
+
+        static_folder = self.app.static_folder
+        response = None
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if encoding in request.accept_encodings and os.path.isfile(os.path.join(static_folder, filename + suffix)):
+                response = send_from_directory(static_folder, filename + suffix,
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                response.headers['Content-Encoding'] = encoding
+                break
+        if response is None:
+            response = send_from_directory(static_folder, filename)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,26 @@
+# 파일 원자적 교체
+# 다른 스레드/프로세스가 반쯤 쓴 파일을 읽지 않도록 같은 디렉터리의 임시 파일에 쓴 뒤 os.replace 로 바꿉니다.
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def replacing(target):
+    """
+    target 과 같은 디렉터리에 호출마다 다른 임시 파일을 만들어 경로를 넘기고, 블록이 끝나면 target 으로 교체합니다.
+    예외가 나면 임시 파일을 지웁니다. 같은 target 을 여러 스레드가 동시에 써도 각자 자기 임시 파일을 사용합니다.
+    """
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
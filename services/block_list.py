@@ -0,0 +1,170 @@
+# IP/사용자 차단 목록 메모리 캐시
+# blocked_ips 는 IP 또는 CIDR 대역(예: 123.123.123.0/24)을 비트 단위 radix 트리로, blocked_users 는 user_id 사전으로
+# 워커별로 읽어 두고, 글/댓글 작성 시 DB 조회 없이 확인합니다.
+# 만료 시각은 힙으로 관리해 지난 항목부터 제거하고, 관리자 화면에서 변경하면 workers.publish('blocks')로 다시 읽습니다.
+# 만료 비교는 DB 시계 기준입니다. (읽을 때 DB의 NOW()를 함께 가져와 경과 시간만큼 더함)
+import heapq
+import ipaddress
+import itertools
+import threading
+import time
+from datetime import timedelta
+
+from services import workers
+
+# 알림 없이 DB가 바뀐 경우를 대비한 최대 유지 시간 (초)
+RELOAD_INTERVAL = 300
+
+
+def parse_network(value):
+    """'1.2.3.4' 또는 '1.2.3.0/24' 형식을 네트워크로 변환합니다. 잘못된 값이면 ValueError."""
+    network = ipaddress.ip_network(value.strip(), strict=False)
+    # IPv4-mapped IPv6 주소(::ffff:1.2.3.4)는 IPv4로 취급
+    if network.version == 6 and network.network_address.ipv4_mapped and network.prefixlen >= 96:
+        network = ipaddress.ip_network(f'{network.network_address.ipv4_mapped}/{network.prefixlen - 96}')
+    return network
+
+
+def _parse_address(value):
+    address = ipaddress.ip_address(value)
+    if address.version == 6 and address.ipv4_mapped:
+        return address.ipv4_mapped
+    return address
+
+
+class _RadixTree:
+    """네트워크 접두사 비트로 내려가는 이진 트라이. 각 노드에 그 대역의 차단 항목 목록을 둡니다."""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, network, entry):
+        """항목을 추가하고 그 항목 목록을 가진 노드를 반환합니다."""
+        node = self.root
+        bits = int(network.network_address)
+        width = network.max_prefixlen
+        for i in range(network.prefixlen):
+            node = node.setdefault((bits >> (width - 1 - i)) & 1, {})
+        node.setdefault('entries', []).append(entry)
+        return node
+
+    def match(self, address, now):
+        """주소를 포함하는 유효한 차단 항목 중 가장 좁은 대역의 항목을 반환합니다."""
+        node = self.root
+        bits = int(address)
+        width = address.max_prefixlen
+        found = None
+        for i in range(width + 1):
+            for entry in node.get('entries', ()):
+                if entry['expires_at'] is None or entry['expires_at'] > now:
+                    found = entry
+            if i == width:
+                break
+            node = node.get((bits >> (width - 1 - i)) & 1)
+            if node is None:
+                break
+        return found
+
+
+class BlockList:
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._trees = {4: _RadixTree(), 6: _RadixTree()}
+        self._users = {}
+        self._expiry = []
+        self._loaded_at = None
+        self._db_now = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        workers.subscribe('blocks', self.invalidate)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def load(self):
+        """DB에서 만료되지 않은 차단 목록을 다시 읽습니다. (앱 컨텍스트 필요)"""
+        cur = self.app.extensions['mysql'].connection.cursor()
+        cur.execute('SELECT NOW() AS db_now')
+        db_now = (cur.fetchone()['db_now'], time.monotonic())
+        cur.execute('SELECT id, ip_address, reason, expires_at FROM blocked_ips '
+                    'WHERE expires_at IS NULL OR expires_at > NOW()')
+        ip_rows = cur.fetchall()
+        cur.execute('SELECT id, user_id, reason, expires_at FROM blocked_users '
+                    'WHERE expires_at IS NULL OR expires_at > NOW()')
+        user_rows = cur.fetchall()
+        cur.close()
+
+        trees = {4: _RadixTree(), 6: _RadixTree()}
+        users = {}
+        expiry = []
+        seq = itertools.count()
+        for row in ip_rows:
+            try:
+                network = parse_network(row['ip_address'])
+            except ValueError:
+                print(f"잘못된 차단 IP 무시: {row['ip_address']}")
+                continue
+            entry = {'id': row['id'], 'reason': row['reason'], 'expires_at': row['expires_at']}
+            node = trees[network.version].insert(network, entry)
+            if entry['expires_at'] is not None:
+                expiry.append((entry['expires_at'], next(seq), node, 'entries', entry))
+        for row in user_rows:
+            entry = {'id': row['id'], 'reason': row['reason'], 'expires_at': row['expires_at']}
+            users.setdefault(row['user_id'], []).append(entry)
+            if entry['expires_at'] is not None:
+                expiry.append((entry['expires_at'], next(seq), users, row['user_id'], entry))
+        heapq.heapify(expiry)
+
+        with self._lock:
+            self._trees = trees
+            self._users = users
+            self._expiry = expiry
+            self._db_now = db_now
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > RELOAD_INTERVAL:
+            self.load()
+
+    def _now(self):
+        # 마지막으로 읽은 DB의 NOW()에 경과 시간을 더한 현재 DB 시각 (앱 서버와 DB의 시간대가 달라도 같은 기준)
+        db_now, loaded_at = self._db_now
+        return db_now + timedelta(seconds=time.monotonic() - loaded_at)
+
+    def _purge_expired(self, now):
+        # 만료된 항목을 힙 순서대로 제거 (힙 맨 앞만 확인하므로 대부분 O(1))
+        # 잠금 없이 목록을 순회하는 check_ip/check_user 를 위해 목록을 제자리에서 고치지 않고 새 목록으로 바꿈
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, _, owner, key, entry = heapq.heappop(self._expiry)
+                remaining = [other for other in owner.get(key, ()) if other is not entry]
+                if remaining:
+                    owner[key] = remaining
+                else:
+                    owner.pop(key, None)
+
+    def check_ip(self, ip_address):
+        """IP가 차단 대역에 포함되면 차단 항목(id, reason, expires_at)을, 아니면 None을 반환합니다."""
+        self._ensure_loaded()
+        try:
+            address = _parse_address(ip_address)
+        except ValueError:
+            return None
+        now = self._now()
+        self._purge_expired(now)
+        return self._trees[address.version].match(address, now)
+
+    def check_user(self, user_id):
+        """사용자가 차단되어 있으면 차단 항목을, 아니면 None을 반환합니다."""
+        self._ensure_loaded()
+        now = self._now()
+        self._purge_expired(now)
+        for entry in self._users.get(user_id, ()):
+            if entry['expires_at'] is None or entry['expires_at'] > now:
+                return entry
+        return None
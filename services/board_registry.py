@@ -0,0 +1,61 @@
+# 게시판 목록 메모리 캐시
+# 게시판은 거의 바뀌지 않으므로 워커별로 한 번 읽어 두고 route/id로 조회합니다.
+# 변경 시에는 workers.publish('boards')로 모든 워커의 캐시를 비웁니다.
+import threading
+import time
+
+from services import workers
+
+# 수동 SQL 변경 등 알림 없이 바뀐 경우를 대비한 최대 유지 시간 (초)
+RELOAD_INTERVAL = 600
+
+
+class BoardRegistry:
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._by_route = {}
+        self._by_id = {}
+        self._ordered = []
+        self._loaded_at = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        workers.subscribe('boards', self.invalidate)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def load(self):
+        """DB에서 게시판 목록을 다시 읽습니다. (앱 컨텍스트 필요)"""
+        cur = self.app.extensions['mysql'].connection.cursor()
+        cur.execute('SELECT * FROM boards ORDER BY id')
+        rows = cur.fetchall()
+        cur.close()
+
+        with self._lock:
+            self._ordered = [dict(row) for row in rows]
+            self._by_route = {row['route']: row for row in self._ordered}
+            self._by_id = {row['id']: row for row in self._ordered}
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > RELOAD_INTERVAL:
+            self.load()
+
+    def get_by_route(self, route):
+        self._ensure_loaded()
+        board = self._by_route.get(route)
+        return dict(board) if board else None
+
+    def get_by_id(self, board_id):
+        self._ensure_loaded()
+        board = self._by_id.get(board_id)
+        return dict(board) if board else None
+
+    def all(self):
+        self._ensure_loaded()
+        return [dict(board) for board in self._ordered]
@@ -0,0 +1,204 @@
+# 분할(청크) 업로드
+# 이미지를 init -> append(여러 번) -> finalize 순서로 나눠 받아 임시 파일에 바로 이어 씁니다.
+# 요청 하나가 짧게 끝나므로 느린 모바일 업로드가 uwsgi 스레드를 오래 잡고 있지 않고,
+# 연결이 끊겨도 받은 위치(received)부터 다시 보내면 됩니다.
+# 업로드 상태는 임시 디렉터리의 파일로 관리하므로 어느 워커가 받아도 이어 쓸 수 있습니다.
+import fcntl
+import hashlib
+import json
+import os
+import re
+import secrets
+import threading
+import time
+
+# 청크 하나의 최대 크기
+CHUNK_SIZE = 1024 * 1024
+
+# 이 시간(초) 동안 완료되지 않은 업로드는 정리
+SESSION_TTL = 24 * 60 * 60
+
+READ_SIZE = 64 * 1024
+
+# 확장자별 파일 시그니처 (첫 청크에서 확인)
+SIGNATURES = {
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpg': (b'\xff\xd8\xff',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'gif': (b'GIF87a', b'GIF89a'),
+}
+SIGNATURE_LENGTH = max(len(sig) for sigs in SIGNATURES.values() for sig in sigs)
+
+UPLOAD_ID_RE = re.compile(r'^[A-Za-z0-9_-]{20,64}$')
+
+
+class UploadError(Exception):
+    """업로드 요청 오류. status 는 응답 코드, received 는 현재까지 받은 크기입니다."""
+
+    def __init__(self, message, status=400, received=None):
+        super().__init__(message)
+        self.status = status
+        self.received = received
+
+
+class ChunkedUploads:
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        # 업로드별 (해시한 위치, 해시 객체) - 같은 워커가 이어 받으면 finalize 때 파일을 다시 읽지 않음
+        self._hashers = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CHUNKED_UPLOAD_FOLDER', os.path.join(app.root_path, 'tmp', 'uploads'))
+        app.config.setdefault('CHUNKED_UPLOAD_MAX_SIZE', app.config.get('MAX_CONTENT_LENGTH') or 16 * 1024 * 1024)
+        self.app = app
+
+    def _paths(self, upload_id):
+        if not upload_id or not UPLOAD_ID_RE.match(upload_id):
+            raise UploadError('잘못된 업로드 ID입니다.', 404)
+        folder = self.app.config['CHUNKED_UPLOAD_FOLDER']
+        return os.path.join(folder, f'{upload_id}.json'), os.path.join(folder, f'{upload_id}.part')
+
+    def _load(self, upload_id):
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            received = os.path.getsize(part_path)
+        except (OSError, ValueError):
+            raise UploadError('업로드를 찾을 수 없습니다.', 404)
+        return meta, part_path, received
+
+    def create(self, filename, size):
+        """업로드를 시작합니다. {'upload_id', 'chunk_size', 'received'}를 반환합니다."""
+        ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+        if ext not in SIGNATURES:
+            raise UploadError('허용되지 않는 파일 형식입니다.', 415)
+        max_size = self.app.config['CHUNKED_UPLOAD_MAX_SIZE']
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError('파일 크기가 올바르지 않습니다.')
+        if size > max_size:
+            raise UploadError(f'파일 크기가 {max_size // (1024 * 1024)}MB를 초과합니다.', 413)
+
+        folder = self.app.config['CHUNKED_UPLOAD_FOLDER']
+        os.makedirs(folder, exist_ok=True)
+        upload_id = secrets.token_urlsafe(24)
+        meta_path, part_path = self._paths(upload_id)
+        open(part_path, 'wb').close()
+        with open(meta_path, 'w') as f:
+            json.dump({'filename': filename, 'ext': ext, 'size': size, 'created_at': time.time()}, f)
+        with self._lock:
+            self._hashers[upload_id] = (0, hashlib.sha256())
+        return {'upload_id': upload_id, 'chunk_size': CHUNK_SIZE, 'received': 0}
+
+    def status(self, upload_id):
+        meta, _, received = self._load(upload_id)
+        return {'upload_id': upload_id, 'size': meta['size'], 'received': received}
+
+    def append(self, upload_id, offset, stream, length):
+        """
+        offset 위치부터 청크를 이어 씁니다. offset 이 받은 크기와 다르면 409와 함께 받은 크기를 알려 줍니다.
+        도중에 연결이 끊겨도 이미 쓴 부분은 남으므로 status 로 위치를 확인하고 이어 보내면 됩니다.
+        """
+        meta, part_path, _ = self._load(upload_id)
+        if length is None or length <= 0:
+            raise UploadError('빈 청크입니다.', 400)
+        if length > CHUNK_SIZE:
+            raise UploadError(f'청크는 최대 {CHUNK_SIZE // 1024}KB까지 보낼 수 있습니다.', 413)
+        if offset == 0 and length < min(SIGNATURE_LENGTH, meta['size']):
+            raise UploadError('첫 청크가 너무 작습니다.', 400, 0)
+
+        with open(part_path, 'r+b') as part:
+            # 같은 업로드에 대한 동시 요청(다른 워커 포함)은 파일 잠금으로 순서를 맞춤
+            fcntl.flock(part, fcntl.LOCK_EX)
+            received = os.fstat(part.fileno()).st_size
+            if offset != received:
+                raise UploadError('업로드 위치가 맞지 않습니다.', 409, received)
+            if received + length > meta['size']:
+                raise UploadError('선언한 파일 크기를 초과합니다.', 413, received)
+
+            with self._lock:
+                hashed_at, hasher = self._hashers.pop(upload_id, (None, None))
+            if hashed_at != received:
+                hasher = None
+
+            part.seek(received)
+            head = b''
+            remaining = length
+            try:
+                while remaining > 0:
+                    data = stream.read(min(READ_SIZE, remaining))
+                    if not data:
+                        break
+                    if received == 0 and len(head) < SIGNATURE_LENGTH:
+                        # 파일 앞부분이 선언한 형식의 시그니처와 맞는지 확인
+                        head += data[:SIGNATURE_LENGTH - len(head)]
+                        if len(head) >= min(SIGNATURE_LENGTH, meta['size']) and \
+                                not any(head.startswith(sig) for sig in SIGNATURES[meta['ext']]):
+                            part.truncate(0)
+                            part.seek(0)
+                            raise UploadError('이미지 파일이 아닙니다.', 415, 0)
+                    part.write(data)
+                    if hasher is not None:
+                        hasher.update(data)
+                    remaining -= len(data)
+            finally:
+                part.flush()
+                written = part.tell()
+                if hasher is not None and written > 0:
+                    with self._lock:
+                        self._hashers[upload_id] = (written, hasher)
+        return {'upload_id': upload_id, 'size': meta['size'], 'received': written}
+
+    def finalize(self, upload_id):
+        """
+        모두 받았는지 확인하고 (임시 파일 경로, 원본 파일명, sha256, 크기)를 반환합니다.
+        임시 파일은 호출한 쪽이 옮기거나 지운 뒤 discard 를 호출합니다.
+        """
+        meta, part_path, received = self._load(upload_id)
+        if received != meta['size']:
+            raise UploadError('아직 모든 청크를 받지 못했습니다.', 409, received)
+
+        with self._lock:
+            hashed_at, hasher = self._hashers.pop(upload_id, (None, None))
+        if hashed_at != received:
+            # 다른 워커가 받은 청크가 있으면 파일을 다시 읽어 해시
+            hasher = hashlib.sha256()
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(READ_SIZE), b''):
+                    hasher.update(chunk)
+        return part_path, meta['filename'], hasher.hexdigest(), received
+
+    def discard(self, upload_id):
+        meta_path, part_path = self._paths(upload_id)
+        with self._lock:
+            self._hashers.pop(upload_id, None)
+        for path in (part_path, meta_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def cleanup(self):
+        """SESSION_TTL 보다 오래된 미완료 업로드를 삭제합니다. 삭제한 개수를 반환합니다."""
+        folder = self.app.config['CHUNKED_UPLOAD_FOLDER']
+        if not os.path.isdir(folder):
+            return 0
+        cutoff = time.time() - SESSION_TTL
+        removed = 0
+        for name in os.listdir(folder):
+            upload_id, ext = os.path.splitext(name)
+            if ext != '.json':
+                continue
+            try:
+                # 마지막으로 청크를 받은 시각 기준
+                part_path = os.path.join(folder, f'{upload_id}.part')
+                last_active = os.path.getmtime(part_path if os.path.exists(part_path) else os.path.join(folder, name))
+                if last_active < cutoff:
+                    self.discard(upload_id)
+                    removed += 1
+            except (OSError, UploadError):
+                continue
+        return removed
@@ -0,0 +1,108 @@
+# 게시판/게시글 변경 버전과 조건부 GET (ETag / Last-Modified)
+# content_versions 에 게시판별, 게시글별, 사이트 전체(공지/회원 정보) 버전과 변경 시각을 두고
+# 글/댓글/좋아요/수정이 커밋된 뒤 올립니다. 목록/본문은 버전 조회(PK 조회 한 번)만으로
+# If-None-Match / If-Modified-Since 를 확인해 쿼리와 템플릿 렌더링 전에 304로 응답합니다.
+# 커밋 이후에 버전을 올리므로 이전 내용이 새 버전으로 캐시되는 일은 없습니다.
+import hashlib
+import time
+
+from flask import request, session, make_response
+
+from services import workers
+from services.notifications import get_notification_counts
+
+SCOPE_SITE = 'site'
+SCOPE_BOARD = 'board'
+SCOPE_POST = 'post'
+
+# 페이지의 CSRF 토큰 유효 시간(WTF_CSRF_TIME_LIMIT 3600초)보다 오래된 HTML을 재사용하지 않도록 ETag에 넣는 시간 단위
+CSRF_WINDOW = 1800
+
+
+def _bump(cur, scope, object_id):
+    cur.execute('''
+        INSERT INTO content_versions (scope, object_id, version, changed_at)
+        VALUES (%s, %s, 1, UTC_TIMESTAMP(3))
+        ON DUPLICATE KEY UPDATE version = version + 1, changed_at = UTC_TIMESTAMP(3)
+    ''', (scope, object_id))
+
+
+def bump_content_versions(cur, board_id, post_id=None):
+    """게시판(과 게시글)의 버전을 올립니다. 글/댓글/좋아요 변경을 커밋한 뒤 호출합니다."""
+    _bump(cur, SCOPE_BOARD, board_id)
+    if post_id is not None:
+        _bump(cur, SCOPE_POST, post_id)
+
+
+def bump_site_version(cur):
+    """모든 목록/본문에 보이는 정보(공지사항, 닉네임, VIP 등)가 바뀌었을 때 호출합니다."""
+    _bump(cur, SCOPE_SITE, 0)
+
+
+def publish_site_change():
+    """bump_site_version 을 커밋한 뒤 호출합니다. 버전을 조회하지 않는 홈 화면 캐시를 모든 워커에서 비웁니다."""
+    workers.publish('site')
+
+
+def fetch_content_versions(mysql, board_id, post_id=None):
+    """(scope, id, version) 목록과 가장 최근 변경 시각을 반환합니다. 행이 없으면 버전 0입니다."""
+    keys = [(SCOPE_SITE, 0), (SCOPE_BOARD, board_id)]
+    if post_id is not None:
+        keys.append((SCOPE_POST, post_id))
+    cur = mysql.connection.cursor()
+    cur.execute(f'''
+        SELECT scope, object_id, version, changed_at FROM content_versions
+        WHERE (scope, object_id) IN ({', '.join(['(%s, %s)'] * len(keys))})
+    ''', [value for key in keys for value in key])
+    rows = {(row['scope'], row['object_id']): row for row in cur.fetchall()}
+    cur.close()
+
+    versions = [(scope, object_id, rows[(scope, object_id)]['version'] if (scope, object_id) in rows else 0)
+                for scope, object_id in keys]
+    changed = [row['changed_at'] for row in rows.values()]
+    return versions, max(changed).replace(microsecond=0) if changed else None
+
+
+def _viewer_key(mysql):
+    # 로그인 여부/사용자와 상단 알림 수가 바뀌면 다른 페이지이므로 ETag에 포함
+    if 'loggedin' not in session:
+        return 'anon'
+    counts = get_notification_counts(mysql, session['id'])
+    return f"{session['id']}:{session.get('is_admin')}:{counts['unread_count']}:{counts['friend_request_count']}"
+
+
+def page_validators(mysql, board_id, post_id=None, html=True):
+    """요청(주소, 사용자, 모바일 여부)과 버전으로 만든 ETag와 Last-Modified(UTC)를 반환합니다."""
+    versions, last_modified = fetch_content_versions(mysql, board_id, post_id)
+    is_mobile = 'Mobile' in (request.headers.get('User-Agent') or '')
+    parts = [request.full_path, _viewer_key(mysql), str(is_mobile), *(f'{s}{i}.{v}' for s, i, v in versions)]
+    if html:
+        parts.append(str(int(time.time() // CSRF_WINDOW)))
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest(), last_modified
+
+
+def not_modified_response(etag, last_modified):
+    """클라이언트의 캐시가 최신이면 304 응답을, 아니면 None을 반환합니다."""
+    # 표시할 플래시 메시지가 있으면 새로 렌더링해야 함
+    if session.get('_flashes'):
+        return None
+    if request.if_none_match:
+        # RFC 7232: If-None-Match 가 있으면 If-Modified-Since 는 무시
+        fresh = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        fresh = last_modified <= request.if_modified_since.replace(tzinfo=None)
+    else:
+        fresh = False
+    if not fresh:
+        return None
+    return with_validators(make_response('', 304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    # 사용자별 내용이므로 공유 캐시에는 저장하지 않고, 브라우저는 매번 재검증
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
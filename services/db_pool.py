@@ -0,0 +1,252 @@
+# MySQL 커넥션 풀
+# flask_mysqldb.MySQL 과 같은 방식(mysql.connection)으로 사용하되, 요청마다 새로 접속하지 않고
+# 워커(프로세스)별 풀에서 커넥션을 빌려 쓰고 앱 컨텍스트가 끝나면 반납합니다.
+# 요청 스레드(MYSQL_POOL_SIZE)와 요청 밖의 백그라운드 작업(MYSQL_POOL_BACKGROUND_SIZE)은 따로 자리를 잡아
+# 오래 걸리는 백그라운드 작업이 요청 스레드의 커넥션을 빼앗지 않습니다.
+import os
+import threading
+import time
+
+import MySQLdb
+import MySQLdb.cursors
+from flask import g, has_app_context, has_request_context
+
+
+class PoolTimeout(Exception):
+    """풀에서 정해진 시간 안에 커넥션을 얻지 못한 경우"""
+
+
+POOL_KINDS = ('request', 'background')
+
+
+class _PooledConnection:
+    __slots__ = ('raw', 'kind', 'created_at')
+
+    def __init__(self, raw, kind):
+        self.raw = raw
+        self.kind = kind
+        self.created_at = time.monotonic()
+
+
+class _QueryCountingMixin:
+    """앱 컨텍스트(요청)마다 실행한 쿼리 수를 g.db_query_count 에 셉니다."""
+
+    def execute(self, query, args=None):
+        if has_app_context():
+            g.db_query_count = g.get('db_query_count', 0) + 1
+        return super().execute(query, args)
+
+
+_counting_cursor_classes = {}
+
+
+def _counting_cursor(base):
+    if base not in _counting_cursor_classes:
+        _counting_cursor_classes[base] = type(f'Counting{base.__name__}', (_QueryCountingMixin, base), {})
+    return _counting_cursor_classes[base]
+
+
+def query_count():
+    """현재 요청에서 지금까지 실행한 쿼리 수"""
+    return g.get('db_query_count', 0) if has_app_context() else 0
+
+
+class MySQLPool:
+    def __init__(self, app=None):
+        self.app = None
+        self._cond = threading.Condition()
+        self._reset_state()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MYSQL_HOST', 'localhost')
+        app.config.setdefault('MYSQL_USER', None)
+        app.config.setdefault('MYSQL_PASSWORD', None)
+        app.config.setdefault('MYSQL_DB', None)
+        app.config.setdefault('MYSQL_PORT', 3306)
+        app.config.setdefault('MYSQL_UNIX_SOCKET', None)
+        app.config.setdefault('MYSQL_CONNECT_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_CHARSET', 'utf8')
+        app.config.setdefault('MYSQL_USE_UNICODE', True)
+        app.config.setdefault('MYSQL_CURSORCLASS', None)
+        app.config.setdefault('MYSQL_CUSTOM_OPTIONS', None)
+        app.config.setdefault('MYSQL_POOL_SIZE', 4)
+        app.config.setdefault('MYSQL_POOL_BACKGROUND_SIZE', 2)
+        app.config.setdefault('MYSQL_POOL_TIMEOUT', 10)
+        app.config.setdefault('MYSQL_POOL_MAX_LIFETIME', 3600)
+        app.config.setdefault('MYSQL_POOL_SLOW_CHECKOUT_MS', 200)
+
+        self.app = app
+        app.teardown_appcontext(self.teardown)
+
+    def _reset_state(self):
+        # fork 이후에는 부모 프로세스의 커넥션을 공유하지 않도록 상태를 새로 만듭니다
+        self._pid = os.getpid()
+        self._idle = {kind: [] for kind in POOL_KINDS}
+        self._open = {kind: 0 for kind in POOL_KINDS}
+        self._metrics = {
+            'checkouts': 0,
+            'wait_total_ms': 0.0,
+            'wait_max_ms': 0.0,
+            'timeouts': 0,
+            'connects': 0,
+            'reconnects': 0,
+        }
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._reset_state()
+
+    def _limit(self, kind):
+        config = self.app.config
+        return config['MYSQL_POOL_SIZE'] if kind == 'request' else config['MYSQL_POOL_BACKGROUND_SIZE']
+
+    def _connect(self, kind):
+        config = self.app.config
+        kwargs = {
+            'host': config['MYSQL_HOST'],
+            'port': config['MYSQL_PORT'],
+            'connect_timeout': config['MYSQL_CONNECT_TIMEOUT'],
+            'charset': config['MYSQL_CHARSET'],
+            'use_unicode': config['MYSQL_USE_UNICODE'],
+        }
+        if config['MYSQL_USER']:
+            kwargs['user'] = config['MYSQL_USER']
+        if config['MYSQL_PASSWORD']:
+            kwargs['passwd'] = config['MYSQL_PASSWORD']
+        if config['MYSQL_DB']:
+            kwargs['db'] = config['MYSQL_DB']
+        if config['MYSQL_UNIX_SOCKET']:
+            kwargs['unix_socket'] = config['MYSQL_UNIX_SOCKET']
+        cursor_class = getattr(MySQLdb.cursors, config['MYSQL_CURSORCLASS']) if config['MYSQL_CURSORCLASS'] \
+            else MySQLdb.cursors.Cursor
+        kwargs['cursorclass'] = _counting_cursor(cursor_class)
+        if config['MYSQL_CUSTOM_OPTIONS']:
+            kwargs.update(config['MYSQL_CUSTOM_OPTIONS'])
+
+        raw = MySQLdb.connect(**kwargs)
+        with self._cond:
+            self._metrics['connects'] += 1
+        return _PooledConnection(raw, kind)
+
+    def _is_usable(self, conn):
+        # 최대 수명이 지났거나 ping에 실패한 커넥션은 다시 접속
+        if time.monotonic() - conn.created_at > self.app.config['MYSQL_POOL_MAX_LIFETIME']:
+            return False
+        try:
+            conn.raw.ping()
+            return True
+        except MySQLdb.Error:
+            return False
+
+    def _close_quietly(self, conn):
+        try:
+            conn.raw.close()
+        except MySQLdb.Error:
+            pass
+
+    def checkout(self, kind='request'):
+        """
+        풀에서 커넥션을 하나 빌립니다. kind('request' 또는 'background')별 자리가 모두 사용 중이면
+        MYSQL_POOL_TIMEOUT초까지 기다립니다.
+        """
+        start = time.monotonic()
+        deadline = start + self.app.config['MYSQL_POOL_TIMEOUT']
+        conn = None
+
+        with self._cond:
+            self._check_fork()
+            while True:
+                if self._idle[kind]:
+                    conn = self._idle[kind].pop()
+                    break
+                if self._open[kind] < self._limit(kind):
+                    self._open[kind] += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._metrics['timeouts'] += 1
+                    raise PoolTimeout('MySQL 커넥션 풀 대기 시간을 초과했습니다.')
+                self._cond.wait(remaining)
+
+            wait_ms = (time.monotonic() - start) * 1000
+            self._metrics['checkouts'] += 1
+            self._metrics['wait_total_ms'] += wait_ms
+            self._metrics['wait_max_ms'] = max(self._metrics['wait_max_ms'], wait_ms)
+
+        if wait_ms > self.app.config['MYSQL_POOL_SLOW_CHECKOUT_MS']:
+            print(f"MySQL 커넥션 대기 지연: {wait_ms:.1f}ms")
+
+        try:
+            if conn is None:
+                conn = self._connect(kind)
+            elif not self._is_usable(conn):
+                self._close_quietly(conn)
+                with self._cond:
+                    self._metrics['reconnects'] += 1
+                conn = self._connect(kind)
+        except Exception:
+            with self._cond:
+                self._open[kind] -= 1
+                self._cond.notify_all()
+            raise
+        return conn
+
+    def checkin(self, conn):
+        """빌린 커넥션을 반납합니다. 커밋되지 않은 작업은 롤백합니다."""
+        try:
+            conn.raw.rollback()
+            healthy = True
+        except MySQLdb.Error:
+            self._close_quietly(conn)
+            healthy = False
+
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+            if healthy:
+                self._idle[conn.kind].append(conn)
+            else:
+                self._open[conn.kind] -= 1
+            self._cond.notify_all()
+
+    @property
+    def connection(self):
+        """
+        현재 앱 컨텍스트에서 사용할 커넥션 (컨텍스트가 끝날 때 자동 반납)
+        요청 없이 앱 컨텍스트만 있는 경우(주기 작업, 스냅샷 재생성, CLI)는 백그라운드 자리에서 빌립니다.
+        """
+        if not has_app_context():
+            return None
+        if 'mysql_pool_conn' not in g:
+            g.mysql_pool_conn = self.checkout('request' if has_request_context() else 'background')
+        return g.mysql_pool_conn.raw
+
+    def teardown(self, exception):
+        conn = g.pop('mysql_pool_conn', None)
+        if conn is not None:
+            self.checkin(conn)
+
+    def stats(self):
+        """현재 워커의 풀 상태와 체크아웃 대기 지표"""
+        with self._cond:
+            self._check_fork()
+            checkouts = self._metrics['checkouts']
+            open_count = sum(self._open.values())
+            idle_count = sum(len(idle) for idle in self._idle.values())
+            return {
+                'pid': self._pid,
+                'size': self.app.config['MYSQL_POOL_SIZE'],
+                'background_size': self.app.config['MYSQL_POOL_BACKGROUND_SIZE'],
+                'open': open_count,
+                'idle': idle_count,
+                'in_use': open_count - idle_count,
+                'background_in_use': self._open['background'] - len(self._idle['background']),
+                'checkouts': checkouts,
+                'wait_avg_ms': round(self._metrics['wait_total_ms'] / checkouts, 2) if checkouts else 0.0,
+                'wait_max_ms': round(self._metrics['wait_max_ms'], 2),
+                'timeouts': self._metrics['timeouts'],
+                'connects': self._metrics['connects'],
+                'reconnects': self._metrics['reconnects'],
+            }
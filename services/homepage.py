@@ -0,0 +1,189 @@
+# 홈 화면 스냅샷
+# 베스트/게시판별 최신/실시간 게시글을 워커 메모리에 만들어 두고, 요청은 스냅샷만 읽습니다.
+# 글/댓글/좋아요가 바뀌면 request_refresh()로 모든 워커에 갱신을 요청하고,
+# 백그라운드 스레드가 짧은 지연(debounce) 뒤 여러 요청을 한 번에 모아 다시 만듭니다.
+import os
+import threading
+import time
+
+from services import workers
+
+
+def load_latest_posts_by_board(cur, board_list, limit=8):
+    """
+    모든 게시판의 최신 게시글 limit개씩을 한 번의 쿼리로 조회합니다.
+    반환값: {게시판 route: [게시글, ...]} (게시글이 없는 게시판은 빈 목록)
+    """
+    board_posts = {board['route']: [] for board in board_list}
+
+    # 익명 게시판은 작성자(user_id = 0)가 없어도 포함하고, 일반 게시판은 작성자가 있는 글만 포함
+    cur.execute('''
+        SELECT ranked.*
+        FROM (
+            SELECT posts.id, posts.title, posts.created_at, posts.view_count, posts.cover_thumb,
+                   users.nickname, users.is_vip, boards.route as board_route, boards.name as board_name,
+                   posts.comment_count, posts.like_count,
+                   ROW_NUMBER() OVER (PARTITION BY posts.board_id
+                                      ORDER BY posts.created_at DESC, posts.id DESC) AS row_num
+            FROM posts
+            JOIN boards ON posts.board_id = boards.id
+            LEFT JOIN users ON posts.user_id = users.id
+            WHERE boards.route = 'anonymous' OR users.id IS NOT NULL
+        ) AS ranked
+        WHERE ranked.row_num <= %s
+        ORDER BY ranked.board_route, ranked.row_num
+    ''', (limit,))
+
+    for post in cur.fetchall():
+        post.pop('row_num', None)
+        # 익명 게시판은 작성자 정보를 가림
+        if post['board_route'] == 'anonymous':
+            post['nickname'] = '익명'
+            post['is_vip'] = None
+        if post['board_route'] in board_posts:
+            board_posts[post['board_route']].append(post)
+    return board_posts
+
+
+def load_homepage_data(cur, board_list):
+    """홈 화면에 필요한 게시글 목록을 DB에서 조회합니다."""
+    # 베스트 게시글 가져오기 (시간 감쇠 인기글 점수 기준, post_scores.score 인덱스 순서)
+    cur.execute('''
+        SELECT 
+            posts.id, 
+            posts.title, 
+            posts.created_at, 
+            posts.view_count, 
+            CASE 
+                WHEN boards.route = 'anonymous' THEN '익명' 
+                ELSE users.nickname 
+            END as nickname,
+            CASE 
+                WHEN boards.route = 'anonymous' THEN NULL 
+                ELSE users.is_vip 
+            END as is_vip,
+            boards.name as board_name, 
+            posts.like_count,
+            posts.comment_count,
+            boards.route as board_route
+        FROM post_scores
+        JOIN posts ON posts.id = post_scores.post_id
+        LEFT JOIN users ON posts.user_id = users.id
+        JOIN boards ON posts.board_id = boards.id
+        ORDER BY post_scores.score DESC
+        LIMIT 8
+    ''')
+    best_posts = cur.fetchall()
+    
+    # 각 게시판별 최신 게시글 (한 번의 쿼리로 조회)
+    board_posts = load_latest_posts_by_board(cur, board_list)
+    
+    # 실시간 게시글 (모든 게시판에서 최신순으로)
+    cur.execute('''
+        SELECT 
+            posts.id, 
+            posts.title, 
+            posts.created_at, 
+            posts.view_count, 
+            CASE 
+                WHEN boards.route = 'anonymous' THEN '익명' 
+                ELSE users.nickname 
+            END as nickname,
+            CASE 
+                WHEN boards.route = 'anonymous' THEN NULL 
+                ELSE users.is_vip 
+            END as is_vip,
+            boards.name as board_name, 
+            boards.route as board_route,
+            posts.like_count,
+            posts.comment_count
+        FROM posts 
+        LEFT JOIN users ON posts.user_id = users.id
+        JOIN boards ON posts.board_id = boards.id
+        ORDER BY posts.created_at DESC
+        LIMIT 15
+    ''')
+    realtime_posts = cur.fetchall()
+
+    return {
+        'best_posts': best_posts,
+        'board_posts': board_posts,
+        'realtime_posts': realtime_posts,
+    }
+
+
+class HomepageSnapshot:
+    def __init__(self, app=None):
+        self.app = None
+        self._snapshot = None
+        self._built_at = 0.0
+        self._build_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._due = None
+        self._thread = None
+        self._thread_pid = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('HOMEPAGE_REFRESH_DELAY', 2)  # 갱신 요청을 모으는 시간(초)
+        app.config.setdefault('HOMEPAGE_SNAPSHOT_TTL', 60)  # 스냅샷 최대 유지 시간(초)
+        self.app = app
+        workers.subscribe('homepage', self._schedule)
+
+    def rebuild(self):
+        """스냅샷을 즉시 다시 만듭니다."""
+        with self.app.app_context():
+            board_list = self.app.extensions['boards'].all()
+            cur = self.app.extensions['mysql'].connection.cursor()
+            try:
+                snapshot = load_homepage_data(cur, board_list)
+            finally:
+                cur.close()
+        # 페이지 캐시가 스냅샷이 바뀐 것을 알 수 있도록 생성 시각을 함께 둠
+        snapshot['built_at'] = time.monotonic()
+        self._snapshot = snapshot
+        self._built_at = snapshot['built_at']
+        self._pid = os.getpid()
+
+    def get(self):
+        """현재 스냅샷을 반환합니다. 없으면 한 번만 직접 만들고, 오래됐으면 백그라운드 갱신을 예약합니다."""
+        if self._snapshot is None or self._pid != os.getpid():
+            with self._build_lock:
+                if self._snapshot is None or self._pid != os.getpid():
+                    self.rebuild()
+        elif time.monotonic() - self._built_at > self.app.config['HOMEPAGE_SNAPSHOT_TTL']:
+            self._schedule()
+        return self._snapshot
+
+    def request_refresh(self):
+        """글/댓글/좋아요 변경 후 모든 워커에 스냅샷 갱신을 요청합니다."""
+        workers.publish('homepage')
+
+    def _schedule(self):
+        with self._cond:
+            # 이미 예약된 갱신이 있으면 그 갱신에 합칩니다
+            if self._due is None:
+                self._due = time.monotonic() + self.app.config['HOMEPAGE_REFRESH_DELAY']
+            self._ensure_thread()
+            self._cond.notify()
+
+    def _ensure_thread(self):
+        # fork 이후에는 부모의 스레드가 없으므로 워커마다 새로 시작합니다
+        if self._thread is None or not self._thread.is_alive() or self._thread_pid != os.getpid():
+            self._thread = threading.Thread(target=self._run, name='homepage-snapshot', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._due is None or time.monotonic() < self._due:
+                    timeout = None if self._due is None else self._due - time.monotonic()
+                    self._cond.wait(timeout)
+                self._due = None
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"홈 화면 스냅샷 갱신 오류: {e}")
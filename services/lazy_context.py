@@ -0,0 +1,31 @@
+# 지연 템플릿 컨텍스트
+# 컨텍스트 프로세서가 값을 미리 계산하지 않고 프록시만 넘겨, 템플릿에서 처음 사용할 때 한 번 계산합니다.
+# 계산한 값은 요청이 끝날 때까지 g 에 보관하고, 계산하면서 실행한 쿼리 수를 요청별로 기록합니다.
+from flask import g
+from werkzeug.local import LocalProxy
+
+from services.db_pool import query_count
+
+
+def memoized(name, func):
+    """요청마다 func()를 한 번만 호출하는 함수를 반환합니다."""
+    def resolve():
+        values = g.setdefault('lazy_context', {})
+        if name not in values:
+            before = query_count()
+            values[name] = func()
+            stats = g.setdefault('lazy_context_stats', {'resolved': [], 'queries': 0})
+            stats['resolved'].append(name)
+            stats['queries'] += query_count() - before
+        return values[name]
+    return resolve
+
+
+def lazy_value(name, func):
+    """템플릿에서 처음 사용할 때 계산되는 값 (비교/출력/반복은 실제 값처럼 동작)"""
+    return LocalProxy(memoized(name, func))
+
+
+def context_stats():
+    """현재 요청에서 계산된 지연 컨텍스트 이름 목록과 그 쿼리 수"""
+    return g.get('lazy_context_stats') or {'resolved': [], 'queries': 0}
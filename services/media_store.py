@@ -0,0 +1,179 @@
+# 내용 주소 기반 업로드 저장소
+# 업로드 파일은 SHA-256 해시로 static/uploads/<해시 앞 2자리>/<해시>.<확장자> 에 저장하고,
+# media 테이블에 해시 -> 경로/크기/가로·세로를 기록합니다. 같은 내용을 다시 올리면 디스크에 쓰지 않고 기존 경로를 돌려줍니다.
+# 커밋은 호출한 쪽에서 수행합니다.
+import hashlib
+import os
+import re
+import shutil
+
+from services.atomic_files import replacing
+from services.thumbnails import IMAGE_EXTENSIONS, sniff_image_type
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow가 없으면 가로·세로는 비워 둠
+    Image = None
+
+CHUNK_SIZE = 64 * 1024
+
+UPLOADS_DIR = 'uploads'
+
+# 확장자 표기 통일
+EXTENSION_ALIASES = {'jpeg': 'jpg'}
+
+CONTENT_PATH_RE = re.compile(r'^uploads/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+
+
+def normalize_extension(filename):
+    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+    return EXTENSION_ALIASES.get(ext, ext)
+
+
+def hash_stream(stream):
+    """스트림 전체의 SHA-256 해시와 크기를 구하고 위치를 처음으로 되돌립니다."""
+    digest = hashlib.sha256()
+    size = 0
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+
+def content_relpath(sha256, ext):
+    """해시에 대응하는 static 기준 저장 경로 (uploads/ab/abcd....jpg)"""
+    return f'{UPLOADS_DIR}/{sha256[:2]}/{sha256}.{ext}'
+
+
+def image_dimensions(path):
+    if Image is None:
+        return None, None
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+
+def find_media(cur, sha256):
+    cur.execute('SELECT id, sha256, path, size, width, height FROM media WHERE sha256 = %s', (sha256,))
+    return cur.fetchone()
+
+
+def register_media(cur, static_folder, sha256, relpath, size):
+    """저장된 파일을 media 테이블에 등록하고 실제로 기록된 경로를 반환합니다."""
+    width, height = image_dimensions(os.path.join(static_folder, relpath))
+    cur.execute('''
+        INSERT IGNORE INTO media (sha256, path, size, width, height, created_at)
+        VALUES (%s, %s, %s, %s, %s, NOW())
+    ''', (sha256, relpath, size, width, height))
+    if cur.rowcount:
+        return relpath
+    # 동시에 같은 파일이 올라온 경우 먼저 기록된 경로를 사용
+    return find_media(cur, sha256)['path']
+
+
+def store_upload(cur, static_folder, stream, filename):
+    """
+    업로드 스트림을 내용 주소 경로에 저장하고 (static 기준 경로, 새로 저장했는지)를 반환합니다.
+    이미 같은 내용이 있으면 파일을 쓰지 않고 기존 경로를 반환합니다.
+    """
+    sha256, size = hash_stream(stream)
+    existing = find_media(cur, sha256)
+    if existing and os.path.exists(os.path.join(static_folder, existing['path'])):
+        return existing['path'], False
+
+    relpath = existing['path'] if existing else content_relpath(sha256, normalize_extension(filename))
+    # 같은 내용을 동시에 저장해도 각자 임시 파일에 쓰고 교체하므로 어느 쪽이 마지막이든 온전한 파일이 남음
+    with replacing(os.path.join(static_folder, relpath)) as tmp_path:
+        with open(tmp_path, 'wb') as out:
+            shutil.copyfileobj(stream, out, CHUNK_SIZE)
+
+    if existing:
+        return relpath, True
+    return register_media(cur, static_folder, sha256, relpath, size), True
+
+
+def store_file(cur, static_folder, path, sha256, size, filename):
+    """
+    이미 해시를 구한 임시 파일을 내용 주소 경로로 옮깁니다. (분할 업로드 완료 시 사용)
+    같은 내용이 있으면 임시 파일은 지우고 기존 경로를 반환합니다. 반환값은 store_upload 와 같습니다.
+    """
+    existing = find_media(cur, sha256)
+    if existing and os.path.exists(os.path.join(static_folder, existing['path'])):
+        os.remove(path)
+        return existing['path'], False
+
+    relpath = existing['path'] if existing else content_relpath(sha256, normalize_extension(filename))
+    # 임시 디렉터리가 다른 파일시스템일 수 있으므로 같은 디렉터리로 옮긴 뒤 교체
+    with replacing(os.path.join(static_folder, relpath)) as tmp_path:
+        shutil.move(path, tmp_path)
+
+    if existing:
+        return relpath, True
+    return register_media(cur, static_folder, sha256, relpath, size), True
+
+
+def _rewrite_references(cur, old_relpath, new_relpath):
+    """게시글 본문/이미지 목록/광고 이미지에 남아 있는 이전 경로를 새 경로로 바꿉니다."""
+    like = f'%{old_relpath}%'
+    cur.execute('''
+        UPDATE posts
+        SET content = REPLACE(content, %s, %s),
+            rendered_html = REPLACE(rendered_html, %s, %s),
+            images_data = REPLACE(images_data, %s, %s),
+            image_path = REPLACE(image_path, %s, %s)
+        WHERE content LIKE %s OR images_data LIKE %s OR image_path LIKE %s
+    ''', (old_relpath, new_relpath, old_relpath, new_relpath, old_relpath, new_relpath, old_relpath, new_relpath,
+          like, like, like))
+    updated = cur.rowcount
+    # 이미 만든 썸네일 파일은 지우지 않으므로 썸네일 경로는 그대로 둠
+    cur.execute('UPDATE post_media SET path = %s WHERE path = %s', (new_relpath, old_relpath))
+    cur.execute('UPDATE posts SET cover_thumb = %s WHERE cover_thumb = %s', (new_relpath, old_relpath))
+    cur.execute('UPDATE ads SET image_path = %s WHERE image_path = %s', (new_relpath, old_relpath))
+    return updated + cur.rowcount
+
+
+def _upload_extension(path):
+    # 확장자가 없는 이전 업로드(..._png)는 파일 내용으로 형식을 정함
+    ext = normalize_extension(os.path.basename(path))
+    if f'.{ext}' in IMAGE_EXTENSIONS:
+        return ext
+    return sniff_image_type(path) or ext
+
+
+def fold_existing_uploads(cur, static_folder, paths):
+    """
+    기존 업로드(이름 기반 경로)를 내용 주소 경로로 옮기고 중복을 하나로 합칩니다.
+    (이전 경로, 새 경로, 바뀐 행 수) 목록을 반환합니다. 이전 파일은 커밋 후 remove_folded_files 로 지웁니다.
+    """
+    folded = []
+    for relpath in paths:
+        if CONTENT_PATH_RE.match(relpath):
+            continue
+        source = os.path.join(static_folder, relpath)
+        with open(source, 'rb') as f:
+            sha256, size = hash_stream(f)
+        existing = find_media(cur, sha256)
+        if existing and os.path.exists(os.path.join(static_folder, existing['path'])):
+            new_relpath = existing['path']
+        else:
+            new_relpath = existing['path'] if existing else content_relpath(sha256, _upload_extension(source))
+            target = os.path.join(static_folder, new_relpath)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # 이전 파일은 참조를 바꾸고 커밋한 뒤에 지우므로 여기서는 복사만 합니다
+            shutil.copyfile(source, target)
+            if not existing:
+                new_relpath = register_media(cur, static_folder, sha256, new_relpath, size)
+        folded.append((relpath, new_relpath, _rewrite_references(cur, relpath, new_relpath)))
+    return folded
+
+
+def remove_folded_files(static_folder, folded):
+    for old_relpath, _, _ in folded:
+        try:
+            os.remove(os.path.join(static_folder, old_relpath))
+        except OSError as e:
+            print(f"이전 업로드 삭제 실패 ({old_relpath}): {e}")
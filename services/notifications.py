@@ -0,0 +1,100 @@
+# 알림 카운터 (읽지 않은 쪽지 수, 받은 친구 요청 수)
+# user_notification_counts 에 사용자별 카운터를 두고 쪽지/친구 처리에서 같은 트랜잭션으로 갱신합니다.
+# 화면 렌더링은 워커별 메모리 캐시(NOTIFICATION_CACHE_TTL초)만 읽으므로 캐시가 살아 있는 동안 쿼리가 없습니다.
+# 커밋은 항상 호출한 쪽에서 수행하고, 커밋한 뒤 publish_notification_counts()로 모든 워커의 캐시를 비웁니다.
+import threading
+import time
+
+from services import workers
+
+# 사용자별 카운터 캐시 유지 시간 (초) - 알림 없이 DB가 바뀐 경우(CLI 보정 등)의 최대 지연
+NOTIFICATION_CACHE_TTL = 15
+
+_cache = {}
+_cache_lock = threading.Lock()
+# 캐시를 비울 때마다 증가. 비우기 전에 읽기 시작한 값은 캐시에 넣지 않음
+_generation = 0
+
+
+def _adjust(cur, column, user_id, delta):
+    cur.execute(f'''
+        INSERT INTO user_notification_counts (user_id, {column}) VALUES (%s, GREATEST(%s, 0))
+        ON DUPLICATE KEY UPDATE {column} = GREATEST({column} + %s, 0)
+    ''', (user_id, delta, delta))
+
+
+def adjust_unread_messages(cur, user_id, delta):
+    """사용자의 읽지 않은 쪽지 수를 delta 만큼 증감합니다."""
+    if delta:
+        _adjust(cur, 'unread_messages', user_id, delta)
+
+
+def adjust_friend_requests(cur, user_id, delta):
+    """사용자가 받은 대기 중 친구 요청 수를 delta 만큼 증감합니다."""
+    if delta:
+        _adjust(cur, 'friend_requests', user_id, delta)
+
+
+def reconcile_notification_counts(cur, user_id=None):
+    """실제 쪽지/친구 요청과 카운터를 다시 맞춥니다. user_id가 없으면 전체 사용자를 보정합니다."""
+    user_filter = '' if user_id is None else 'WHERE users.id = %s'
+    cur.execute(f'''
+        INSERT INTO user_notification_counts (user_id, unread_messages, friend_requests)
+        SELECT users.id, COALESCE(m.cnt, 0), COALESCE(f.cnt, 0)
+        FROM users
+        LEFT JOIN (
+            SELECT receiver_id, COUNT(*) AS cnt FROM messages
+            WHERE is_read = 0 AND receiver_deleted = 0 GROUP BY receiver_id
+        ) AS m ON m.receiver_id = users.id
+        LEFT JOIN (
+            SELECT friend_id, COUNT(*) AS cnt FROM friendships
+            WHERE status = 'pending' GROUP BY friend_id
+        ) AS f ON f.friend_id = users.id
+        {user_filter}
+        ON DUPLICATE KEY UPDATE
+            unread_messages = VALUES(unread_messages),
+            friend_requests = VALUES(friend_requests)
+    ''', () if user_id is None else (user_id,))
+
+
+def get_notification_counts(mysql, user_id):
+    """
+    {'unread_count', 'friend_request_count'}를 반환합니다.
+    캐시에 있으면 DB 커넥션도 빌리지 않습니다.
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(user_id)
+        if cached and cached[1] > now:
+            return dict(cached[0])
+        generation = _generation
+
+    cur = mysql.connection.cursor()
+    cur.execute('SELECT unread_messages, friend_requests FROM user_notification_counts WHERE user_id = %s',
+                (user_id,))
+    row = cur.fetchone()
+    cur.close()
+
+    counts = {
+        'unread_count': row['unread_messages'] if row else 0,
+        'friend_request_count': row['friend_requests'] if row else 0,
+    }
+    with _cache_lock:
+        if generation == _generation:
+            _cache[user_id] = (counts, now + NOTIFICATION_CACHE_TTL)
+    return dict(counts)
+
+
+def _clear_cache():
+    global _generation
+    with _cache_lock:
+        _cache.clear()
+        _generation += 1
+
+
+def publish_notification_counts():
+    """쪽지/친구 요청 카운터 변경을 커밋한 뒤 호출합니다. 모든 워커의 카운터 캐시를 비웁니다."""
+    workers.publish('notifications')
+
+
+workers.subscribe('notifications', _clear_cache)
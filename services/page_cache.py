@@ -0,0 +1,107 @@
+# 비로그인 방문자용 전체 페이지 캐시
+# 홈/게시판 목록/게시글 화면을 로그인하지 않은 요청에 한해 렌더링 결과 그대로 워커별로 보관합니다.
+# 게시판/게시글 화면의 키는 ETag(주소, 모바일 여부, 게시판·게시글·사이트 버전 포함)이므로
+# 글/댓글/좋아요/수정으로 태그(board id, post id) 버전이 오르면 모든 워커에서 이전 페이지는 더 이상 쓰이지 않고,
+# 쓰기가 일어난 워커는 invalidate()로 해당 태그의 페이지를 바로 비웁니다.
+# 홈 화면은 DB를 조회하지 않으므로 키에 스냅샷 생성 시각만 두고, 공지/회원 정보가 바뀌면 'site' 알림으로 비웁니다.
+# 공유 페이지에는 CSRF 토큰과 추천 여부를 넣지 않고, 브라우저가 viewer_fragment 로 따로 받아 채웁니다.
+# (토큰을 받기 전에 보낸 폼은 layout.html 이 토큰을 채운 뒤 다시 보내고, JS가 없으면 app.handle_csrf_error 가
+#  플래시 메시지와 함께 캐시를 거치지 않는 페이지로 돌려보냅니다)
+# 캐시는 uwsgi 프로세스마다 따로 채우므로 같은 페이지도 프로세스 수(2)만큼 렌더링되고 적중률도 그만큼 낮습니다.
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, make_response, render_template, request, session
+
+from services import workers
+
+
+class PageCache:
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PAGE_CACHE_TTL', 60)  # 광고 로테이션이 멈춰 보이지 않도록 짧게 유지(초)
+        app.config.setdefault('PAGE_CACHE_MAX_BYTES', 32 * 1024 * 1024)  # 워커별 최대 크기 (reload-on-rss 고려)
+        self.app = app
+        # 광고/게시판 설정이 바뀌면 모든 페이지가 달라짐
+        workers.subscribe('ads', self.clear)
+        workers.subscribe('boards', self.clear)
+        workers.subscribe('site', lambda: self.invalidate(('homepage',)))
+
+    def eligible(self):
+        """로그인하지 않았고 표시할 플래시 메시지가 없는 GET 요청만 공유 페이지를 사용합니다."""
+        return request.method == 'GET' and 'loggedin' not in session and not session.get('_flashes')
+
+    def cached_response(self, key):
+        """캐시된 페이지가 있으면 응답을, 없으면 None을 반환합니다."""
+        if not self.eligible():
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] <= now:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            body = entry['body']
+        response = make_response(body)
+        response.headers['X-Page-Cache'] = 'hit'
+        return response
+
+    def render(self, key, tags, template_name, fragment_args=None, **context):
+        """템플릿을 렌더링합니다. 비로그인 요청이면 공유 페이지로 렌더링해 캐시에 저장합니다."""
+        shared = self.eligible()
+        if shared:
+            g.shared_page = True
+            g.viewer_fragment_args = fragment_args or {}
+        body = render_template(template_name, **context)
+        response = make_response(body)
+        if shared:
+            self._store(key, tags, body.encode('utf-8'))
+            response.headers['X-Page-Cache'] = 'miss'
+        return response
+
+    def _store(self, key, tags, body):
+        entry = {'body': body, 'tags': frozenset(tags), 'expires_at': time.monotonic() + self.app.config['PAGE_CACHE_TTL']}
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= len(old['body'])
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while self._bytes > self.app.config['PAGE_CACHE_MAX_BYTES'] and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted['body'])
+
+    def invalidate(self, *tags):
+        """태그(예: ('board', 3), ('post', 10))가 붙은 현재 워커의 페이지를 비웁니다."""
+        tags = set(tags)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry['tags'] & tags]:
+                self._bytes -= len(self._entries.pop(key)['body'])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 3) if total else None,
+            }
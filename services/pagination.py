@@ -0,0 +1,126 @@
+# 게시판 목록 페이지네이션
+# (created_at, id) 기준 커서(keyset) 페이지네이션과 기존 ?page= 요청을 위한 지연 조인 방식을 제공합니다.
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+
+# ?page= 방식으로 접근 가능한 최대 페이지 (이후는 커서로만 이동)
+MAX_OFFSET_PAGE = 100
+
+# 게시판별 총 게시글 수 캐시 유지 시간 (초)
+TOTAL_COUNT_TTL = 60
+
+CURSOR_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_total_cache = {}
+_total_lock = threading.Lock()
+
+
+def encode_cursor(post):
+    """게시글의 (created_at, id)를 URL에 사용할 수 있는 불투명 토큰으로 변환합니다."""
+    raw = json.dumps([post['created_at'].strftime(CURSOR_DATETIME_FORMAT), post['id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """커서 토큰을 (created_at, id)로 변환합니다. 잘못된 토큰이면 None을 반환합니다."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.strptime(created_at, CURSOR_DATETIME_FORMAT), int(post_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def fetch_posts_page(cur, select_sql, board_id, per_page, page=1, before=None, after=None):
+    """
+    게시판의 한 페이지 분량 게시글을 조회합니다.
+
+    select_sql은 'SELECT ... FROM posts [JOIN ...]' 형태(WHERE/ORDER BY 제외)여야 합니다.
+    before/after 커서가 있으면 커서 방식으로, 없으면 page 번호로 조회합니다.
+    반환값: (posts, page, cursors) - 커서 방식이면 page는 None 입니다.
+    """
+    before_key = decode_cursor(before)
+    after_key = decode_cursor(after)
+
+    if before_key:
+        # 커서보다 오래된 게시글
+        cur.execute(select_sql + '''
+            WHERE posts.board_id = %s
+              AND (posts.created_at < %s OR (posts.created_at = %s AND posts.id < %s))
+            ORDER BY posts.created_at DESC, posts.id DESC
+            LIMIT %s
+        ''', (board_id, before_key[0], before_key[0], before_key[1], per_page + 1))
+        posts = list(cur.fetchall())
+        has_older = len(posts) > per_page
+        posts = posts[:per_page]
+        has_newer = True
+        page = None
+    elif after_key:
+        # 커서보다 최신 게시글 (오름차순으로 가져와 뒤집음)
+        cur.execute(select_sql + '''
+            WHERE posts.board_id = %s
+              AND (posts.created_at > %s OR (posts.created_at = %s AND posts.id > %s))
+            ORDER BY posts.created_at ASC, posts.id ASC
+            LIMIT %s
+        ''', (board_id, after_key[0], after_key[0], after_key[1], per_page + 1))
+        posts = list(cur.fetchall())
+        has_newer = len(posts) > per_page
+        posts = posts[:per_page]
+        posts.reverse()
+        has_older = True
+        page = None
+    else:
+        # 기존 ?page= 요청: id만 먼저 잘라낸 뒤 조인하는 지연 조인 (최대 MAX_OFFSET_PAGE 페이지)
+        page = min(max(page or 1, 1), MAX_OFFSET_PAGE)
+        offset = (page - 1) * per_page
+        cur.execute(select_sql + '''
+            JOIN (
+                SELECT id FROM posts
+                WHERE board_id = %s
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s OFFSET %s
+            ) AS page_ids ON page_ids.id = posts.id
+            ORDER BY posts.created_at DESC, posts.id DESC
+        ''', (board_id, per_page + 1, offset))
+        posts = list(cur.fetchall())
+        has_older = len(posts) > per_page
+        posts = posts[:per_page]
+        has_newer = page > 1
+
+    cursors = {
+        'next': encode_cursor(posts[-1]) if posts and has_older else None,
+        'prev': encode_cursor(posts[0]) if posts and has_newer else None,
+    }
+    return posts, page, cursors
+
+
+def get_board_total(cur, board_id):
+    """게시판의 총 게시글 수를 반환합니다. (워커별로 TOTAL_COUNT_TTL초 동안 캐시)"""
+    now = time.monotonic()
+    with _total_lock:
+        cached = _total_cache.get(board_id)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    cur.execute('SELECT COUNT(*) as count FROM posts WHERE board_id = %s', (board_id,))
+    total = cur.fetchone()['count']
+
+    with _total_lock:
+        _total_cache[board_id] = (total, now + TOTAL_COUNT_TTL)
+    return total
+
+
+def invalidate_board_total(board_id):
+    """게시글 작성/삭제 후 해당 게시판의 총 게시글 수 캐시를 비웁니다."""
+    with _total_lock:
+        _total_cache.pop(board_id, None)
+
+
+def count_pages(total_count, per_page):
+    """페이지 바에 표시할 페이지 수 (지연 조인 상한까지만)"""
+    return min((total_count + per_page - 1) // per_page, MAX_OFFSET_PAGE)
@@ -0,0 +1,48 @@
+# 게시글 댓글/좋아요 카운터 관리
+# posts.comment_count, posts.like_count 는 댓글/좋아요 변경과 같은 트랜잭션 안에서 갱신합니다.
+# 커밋은 항상 호출한 쪽에서 수행합니다.
+
+
+def adjust_comment_count(cur, post_id, delta):
+    """게시글의 댓글 수를 delta 만큼 증감합니다."""
+    cur.execute('''
+        UPDATE posts SET comment_count = GREATEST(comment_count + %s, 0)
+        WHERE id = %s
+    ''', (delta, post_id))
+
+
+def adjust_like_count(cur, post_id, delta):
+    """게시글의 좋아요 수를 delta 만큼 증감하고 변경된 좋아요 수를 반환합니다."""
+    # LAST_INSERT_ID(expr)로 갱신된 값을 같은 문장에서 돌려받습니다 (추가 SELECT 없음)
+    cur.execute('''
+        UPDATE posts SET like_count = LAST_INSERT_ID(GREATEST(like_count + %s, 0))
+        WHERE id = %s
+    ''', (delta, post_id))
+    return cur.lastrowid
+
+
+def reconcile_post_counters(cur, post_id=None):
+    """실제 댓글/좋아요 수와 어긋난 카운터를 다시 계산합니다. 보정된 게시글 수를 반환합니다."""
+    if post_id is None:
+        post_filter = ''
+        id_filter = ''
+        params = ()
+    else:
+        post_filter = 'WHERE post_id = %s'
+        id_filter = 'AND posts.id = %s'
+        params = (post_id, post_id, post_id)
+
+    cur.execute(f'''
+        UPDATE posts
+        LEFT JOIN (
+            SELECT post_id, COUNT(*) AS cnt FROM comments {post_filter} GROUP BY post_id
+        ) AS c ON c.post_id = posts.id
+        LEFT JOIN (
+            SELECT post_id, COUNT(*) AS cnt FROM post_likes {post_filter} GROUP BY post_id
+        ) AS l ON l.post_id = posts.id
+        SET posts.comment_count = COALESCE(c.cnt, 0),
+            posts.like_count = COALESCE(l.cnt, 0)
+        WHERE (posts.comment_count <> COALESCE(c.cnt, 0) OR posts.like_count <> COALESCE(l.cnt, 0))
+        {id_filter}
+    ''', params)
+    return cur.rowcount
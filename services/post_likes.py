@@ -0,0 +1,33 @@
+# 게시글 좋아요 토글
+# 로그인 좋아요는 unique_post_user(post_id, user_id), 비로그인 좋아요는 unique_post_anon_ip(post_id, anon_ip)
+# 유니크 키에 맡겨 SELECT 없이 DELETE/INSERT IGNORE 만으로 토글하므로, 연속 클릭이 겹쳐도 중복 좋아요가 생기지 않습니다.
+# 커밋은 항상 호출한 쪽에서 수행합니다.
+
+
+def toggle_like(cur, post_id, user_id=None, ip_address=None):
+    """
+    좋아요를 토글합니다. user_id가 없으면 ip_address 기준 비로그인 좋아요로 처리합니다.
+    반환값: (liked, delta) - 토글 후 좋아요 상태와 실제로 변한 좋아요 수(-1, 0, 1)
+    """
+    if user_id is not None:
+        cur.execute('DELETE FROM post_likes WHERE post_id = %s AND user_id = %s', (post_id, user_id))
+    else:
+        cur.execute('DELETE FROM post_likes WHERE post_id = %s AND anon_ip = %s', (post_id, ip_address))
+    if cur.rowcount:
+        return False, -cur.rowcount
+
+    # 좋아요가 없었으면 추가 (동시에 다른 요청이 먼저 추가했다면 무시되고 좋아요 상태로 응답)
+    cur.execute('''
+        INSERT IGNORE INTO post_likes (post_id, user_id, ip_address, created_at)
+        VALUES (%s, %s, %s, NOW())
+    ''', (post_id, user_id, ip_address))
+    return True, cur.rowcount
+
+
+def has_liked(cur, post_id, user_id=None, ip_address=None):
+    """현재 사용자(또는 IP)가 게시글에 좋아요를 눌렀는지 확인합니다."""
+    if user_id is not None:
+        cur.execute('SELECT 1 FROM post_likes WHERE post_id = %s AND user_id = %s', (post_id, user_id))
+    else:
+        cur.execute('SELECT 1 FROM post_likes WHERE post_id = %s AND anon_ip = %s', (post_id, ip_address))
+    return cur.fetchone() is not None
@@ -0,0 +1,120 @@
+# 게시글 이미지 목록 (post_media)
+# 게시글의 업로드 이미지를 순서대로 post_media 에 저장하고 첫 이미지(대표 이미지)의 썸네일 경로를 posts.cover_thumb 에 둡니다.
+# 목록/홈 카드는 images_data JSON 을 해석하지 않고 cover_thumb 를 그대로 static 주소로 씁니다.
+# 썸네일이 아직 없으면 원본 경로를 두었다가 썸네일 작업이 끝나면 record_thumbnail 로 바꿉니다.
+# 글 작성/수정 시 본문(<img>)과 이전 형식(images_data, image_path)에서 다시 만들며, 커밋은 호출한 쪽에서 수행합니다.
+import json
+import os
+from html.parser import HTMLParser
+
+from services.media_store import image_dimensions
+from services.thumbnails import static_relpath, derivative_relpath, generate_derivatives
+
+COVER_SIZE = 'thumb'
+CAPTION_MAX_LENGTH = 255
+
+
+class _ImageCollector(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.images = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'img':
+            attrs = dict(attrs)
+            self.images.append((attrs.get('src'), attrs.get('alt') or ''))
+
+
+def _legacy_images(images_data, image_path):
+    try:
+        data = json.loads(images_data) if images_data else None
+    except (ValueError, TypeError):
+        data = None
+    if isinstance(data, dict) and isinstance(data.get('paths'), list):
+        captions = data.get('captions') if isinstance(data.get('captions'), list) else []
+        return [(path, captions[i] if i < len(captions) and isinstance(captions[i], str) else '')
+                for i, path in enumerate(data['paths']) if isinstance(path, str)]
+    # 이전 형식의 단일 이미지
+    return [(image_path, '')] if image_path else []
+
+
+def post_images(content, images_data=None, image_path=None):
+    """게시글의 업로드 이미지 (static 기준 경로, 설명) 목록. 이전 형식 이미지가 먼저이고 중복은 제외합니다."""
+    parser = _ImageCollector()
+    parser.feed(content or '')
+    parser.close()
+    images = []
+    seen = set()
+    for path, caption in _legacy_images(images_data, image_path) + parser.images:
+        relpath = static_relpath(path)
+        if relpath and relpath not in seen:
+            seen.add(relpath)
+            images.append((relpath, caption[:CAPTION_MAX_LENGTH]))
+    return images
+
+
+def _thumb_relpath(static_folder, relpath, make_thumb=None):
+    """썸네일 경로. 없으면 make_thumb(원본 경로)로 생성을 맡기고, 그래도 아직 없으면 None."""
+    derived = derivative_relpath(relpath, COVER_SIZE)
+    if make_thumb is not None and not os.path.exists(os.path.join(static_folder, derived)):
+        make_thumb(relpath)
+    return derived if os.path.exists(os.path.join(static_folder, derived)) else None
+
+
+def save_post_media(cur, static_folder, post_id, images, make_thumb=None):
+    """
+    게시글의 post_media 를 images 로 바꾸고 cover_thumb 를 갱신합니다. 저장한 이미지 수를 반환합니다.
+    요청 처리 중에는 make_thumb 로 ThumbnailWorker.enqueue 를 넘겨 썸네일 생성을 백그라운드에 맡깁니다.
+    """
+    rows = []
+    for ordinal, (relpath, caption) in enumerate(images):
+        width, height = image_dimensions(os.path.join(static_folder, relpath))
+        thumb = _thumb_relpath(static_folder, relpath, make_thumb)
+        rows.append((post_id, ordinal, relpath, thumb, width, height, caption))
+
+    cur.execute('DELETE FROM post_media WHERE post_id = %s', (post_id,))
+    if rows:
+        cur.executemany('''
+            INSERT INTO post_media (post_id, ordinal, path, thumb_path, width, height, caption)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ''', rows)
+    cover_thumb = (rows[0][3] or rows[0][2]) if rows else None
+    cur.execute('UPDATE posts SET cover_thumb = %s WHERE id = %s', (cover_thumb, post_id))
+    return len(rows)
+
+
+def record_thumbnail(cur, relpath):
+    """원본(relpath)의 썸네일이 만들어진 뒤 호출합니다. 아직 원본을 가리키는 thumb_path/cover_thumb 를 썸네일로 바꿉니다."""
+    thumb = derivative_relpath(relpath, COVER_SIZE)
+    cur.execute('UPDATE post_media SET thumb_path = %s WHERE path = %s AND thumb_path IS NULL', (thumb, relpath))
+    cur.execute('''
+        UPDATE posts
+        JOIN post_media ON post_media.post_id = posts.id AND post_media.path = %s
+        SET posts.cover_thumb = %s
+        WHERE posts.cover_thumb = %s
+    ''', (relpath, thumb, relpath))
+    return cur.rowcount
+
+
+def rebuild_post_media(cur, static_folder, batch_size=500):
+    """모든 게시글의 이미지 목록과 썸네일을 다시 만듭니다. (CLI용, 썸네일을 바로 생성) 이미지가 있는 게시글 수를 반환합니다."""
+    def make_thumb(relpath):
+        try:
+            generate_derivatives(static_folder, relpath)
+        except Exception as e:
+            print(f"썸네일 생성 오류 ({relpath}): {e}")
+
+    count = 0
+    last_id = 0
+    while True:
+        cur.execute('''
+            SELECT id, content, images_data, image_path FROM posts
+            WHERE id > %s ORDER BY id LIMIT %s
+        ''', (last_id, batch_size))
+        posts = cur.fetchall()
+        if not posts:
+            return count
+        for post in posts:
+            images = post_images(post['content'], post['images_data'], post['image_path'])
+            count += bool(save_post_media(cur, static_folder, post['id'], images, make_thumb))
+        last_id = posts[-1]['id']
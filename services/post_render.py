@@ -0,0 +1,248 @@
+# 게시글 본문 렌더링
+# 글 작성/수정 시 본문 HTML을 허용 목록 기준으로 정리하고 동영상 주소를 임베드 주소로 바꿔
+# 바로 내보낼 수 있는 HTML을 posts.rendered_html 에 저장합니다. 조회 화면은 그대로 출력만 합니다.
+# 렌더링 방식이 바뀌면 RENDERER_VERSION 을 올리면 되고, 이전 버전으로 저장된 글은
+# 조회될 때(또는 `flask --app app rerender-posts`로) 다시 렌더링됩니다.
+import json
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+RENDERER_VERSION = 1
+
+# 동영상 주소 -> 임베드 주소 (모듈 로드 시 한 번만 컴파일)
+EMBED_PATTERNS = (
+    # YouTube
+    (re.compile(r'(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})'),
+     'https://www.youtube.com/embed/{}'),
+    # Vimeo
+    (re.compile(r'(?:https?:\/\/)?(?:www\.)?vimeo\.com\/(\d+)'),
+     'https://player.vimeo.com/video/{}'),
+    # 네이버TV
+    (re.compile(r'(?:https?:\/\/)?(?:tv\.naver\.com\/v\/(\d+))'),
+     'https://tv.naver.com/embed/{}'),
+)
+
+ALLOWED_TAGS = {
+    'a', 'b', 'strong', 'i', 'em', 'u', 's', 'strike', 'del', 'sub', 'sup', 'small', 'mark', 'font', 'span',
+    'p', 'div', 'br', 'hr', 'blockquote', 'pre', 'code', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'ul', 'ol', 'li', 'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'caption',
+    'img', 'figure', 'figcaption', 'iframe',
+}
+VOID_TAGS = {'br', 'hr', 'img'}
+# 태그와 내용을 모두 버림
+DROP_CONTENT_TAGS = {'script', 'style'}
+
+GLOBAL_ATTRS = {'class', 'style', 'title', 'align'}
+TAG_ATTRS = {
+    'a': {'href', 'target'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'iframe': {'src', 'width', 'height', 'allowfullscreen', 'frameborder', 'allow'},
+    'font': {'color', 'size', 'face'},
+    'ol': {'start'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+ALLOWED_CSS = {
+    'color', 'background-color', 'text-align', 'text-decoration', 'font-weight', 'font-style', 'font-size',
+    'width', 'max-width', 'height', 'margin', 'margin-top', 'margin-bottom', 'padding',
+}
+# 임베드 코드의 iframe 은 이 호스트만 허용
+EMBED_HOSTS = {
+    'www.youtube.com', 'youtube.com', 'www.youtube-nocookie.com', 'player.vimeo.com',
+    'tv.naver.com', 'serviceapi.nmv.naver.com', 'chzzk.naver.com', 'play-tv.kakao.com', 'tv.kakao.com',
+    'player.twitch.tv', 'clips.twitch.tv', 'www.dailymotion.com', 'geo.dailymotion.com',
+    'www.instagram.com', 'www.tiktok.com', 'www.facebook.com', 'platform.twitter.com', 'streamable.com',
+}
+
+SCHEME_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+CONTROL_CHARS_RE = re.compile(r'[\x00-\x20]+')
+DATA_IMAGE_RE = re.compile(r'^data:image/(?:png|jpeg|gif|webp);base64,[A-Za-z0-9+/=\s]+$')
+CLASS_RE = re.compile(r'^[\w-]+$')
+UNSAFE_CSS_RE = re.compile(r'url\s*\(|expression|javascript:|[\\<>]|/\*', re.IGNORECASE)
+
+
+def get_embed_url(url):
+    """동영상 URL을 임베드 URL로 변환합니다. 지원하지 않는 URL은 그대로 반환합니다."""
+    for pattern, embed in EMBED_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return embed.format(match.group(1))
+    return url
+
+
+def _safe_url(tag, attr, value):
+    """href/src 값을 검사해 허용되면 정리한 값을, 아니면 None을 반환합니다."""
+    value = value.strip()
+    # 브라우저는 스킴 사이의 공백/제어 문자를 무시하므로 제거한 값으로 스킴 판단
+    compact = CONTROL_CHARS_RE.sub('', value)
+    if tag == 'iframe':
+        parts = urlsplit(compact)
+        if parts.scheme not in ('http', 'https', '') or parts.hostname not in EMBED_HOSTS:
+            return None
+        return value
+    if tag == 'img' and compact.startswith('data:'):
+        return value if DATA_IMAGE_RE.match(value) else None
+    match = SCHEME_RE.match(compact)
+    if match is None:
+        return value  # 상대 주소
+    allowed = ('http', 'https', 'mailto') if attr == 'href' else ('http', 'https')
+    return value if match.group(1).lower() in allowed else None
+
+
+def _clean_style(value):
+    declarations = []
+    for declaration in value.split(';'):
+        name, sep, css = declaration.partition(':')
+        name, css = name.strip().lower(), css.strip()
+        if sep and name in ALLOWED_CSS and css and not UNSAFE_CSS_RE.search(css):
+            declarations.append(f'{name}: {css}')
+    return '; '.join(declarations) or None
+
+
+def _clean_attrs(tag, attrs):
+    """허용된 속성만 남긴 (이름, 값) 목록을 반환합니다. 태그를 버려야 하면 None."""
+    allowed = GLOBAL_ATTRS | TAG_ATTRS.get(tag, set())
+    cleaned = []
+    for name, value in attrs:
+        if name not in allowed:
+            continue
+        if value is not None:
+            if name in ('href', 'src'):
+                value = _safe_url(tag, name, value)
+            elif name == 'style':
+                value = _clean_style(value)
+            elif name == 'class':
+                value = ' '.join(token for token in value.split() if CLASS_RE.match(token)) or None
+            elif name == 'target':
+                value = '_blank' if value == '_blank' else None
+            if value is None:
+                continue
+        cleaned.append((name, value))
+    if tag in ('iframe', 'img') and not any(name == 'src' for name, _ in cleaned):
+        return None
+    if tag == 'a' and any(name == 'href' for name, _ in cleaned):
+        cleaned.append(('rel', 'noopener noreferrer nofollow'))
+    return cleaned
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        attrs = _clean_attrs(tag, attrs)
+        if attrs is None:
+            return
+        rendered = ''.join(f' {name}' if value is None else f' {name}="{escape(value)}"' for name, value in attrs)
+        self.out.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        # 닫히지 않은 안쪽 태그를 함께 닫음
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.out.append(escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        self.out.extend(f'</{tag}>' for tag in reversed(self.open_tags))
+        self.open_tags = []
+        return ''.join(self.out)
+
+
+def sanitize_html(content):
+    """허용된 태그/속성만 남긴 HTML을 반환합니다. 주석과 script/style 은 제거합니다."""
+    parser = _Sanitizer()
+    parser.feed(content or '')
+    return parser.result()
+
+
+def _load_videos(video_data):
+    try:
+        videos = json.loads(video_data or '[]')
+    except (ValueError, TypeError):
+        return []
+    if not isinstance(videos, list):
+        return []
+    return [video for video in videos if isinstance(video, dict) and isinstance(video.get('content'), str)]
+
+
+def _render_video(video):
+    if video.get('type') != 'url':
+        embed = sanitize_html(video['content'])
+        return f'<div class="mb-3"><div class="embed-responsive">{embed}</div></div>' if embed.strip() else ''
+    url = video['content'].strip()
+    src = _safe_url('iframe', 'src', get_embed_url(url))
+    if src is None:
+        return ''
+    link = escape(url)
+    return (
+        '<div class="mb-3">'
+        f'<div class="ratio ratio-16x9 mb-2"><iframe src="{escape(src)}" allowfullscreen></iframe></div>'
+        f'<p class="small text-muted">원본 링크: <a href="{link}" target="_blank" rel="noopener noreferrer nofollow">{link}</a></p>'
+        '</div>'
+    )
+
+
+def render_post(content, video_data):
+    """본문과 동영상 목록을 조회 화면에 그대로 출력할 HTML로 렌더링합니다."""
+    html = f'<div class="post-content mb-4">{sanitize_html(content)}</div>'
+    videos = ''.join(_render_video(video) for video in _load_videos(video_data))
+    if videos:
+        html += ('<div class="video-content mb-4"><h5 class="mb-3">동영상</h5>'
+                 f'<div class="video-container">{videos}</div></div>')
+    return html
+
+
+def ensure_rendered(cur, post):
+    """저장된 렌더링 결과가 없거나 이전 버전이면 다시 렌더링해 저장합니다. (커밋은 호출한 쪽에서)"""
+    if post.get('rendered_html') is not None and post.get('renderer_version') == RENDERER_VERSION:
+        return False
+    post['rendered_html'] = render_post(post['content'], post['video_data'])
+    # 그 사이 수정된 글(이미 현재 버전)은 덮어쓰지 않음
+    cur.execute('''
+        UPDATE posts SET rendered_html = %s, renderer_version = %s
+        WHERE id = %s AND (renderer_version <> %s OR rendered_html IS NULL)
+    ''', (post['rendered_html'], RENDERER_VERSION, post['id'], RENDERER_VERSION))
+    post['renderer_version'] = RENDERER_VERSION
+    return True
+
+
+def rerender_stale_posts(cur, batch_size=500):
+    """이전 버전으로 렌더링된 게시글을 모두 다시 렌더링합니다. 렌더링한 게시글 수를 반환합니다."""
+    count = 0
+    last_id = 0
+    while True:
+        cur.execute('''
+            SELECT id, content, video_data, rendered_html, renderer_version FROM posts
+            WHERE id > %s AND (renderer_version <> %s OR rendered_html IS NULL)
+            ORDER BY id LIMIT %s
+        ''', (last_id, RENDERER_VERSION, batch_size))
+        posts = cur.fetchall()
+        if not posts:
+            return count
+        for post in posts:
+            count += ensure_rendered(cur, post)
+        last_id = posts[-1]['id']
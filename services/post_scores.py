@@ -0,0 +1,98 @@
+# 인기글 점수 (시간 감쇠)
+# post_scores.score 는 좋아요/댓글/조회 이벤트마다 가중치만큼 더하고, 반감기(HALF_LIFE)에 따라 줄어듭니다.
+# 이벤트 시점에 해당 행만 현재 시각 기준으로 감쇠한 뒤 더하고, 전체 행은 주기적으로 decay_post_scores()로
+# 같은 기준 시각에 맞춰 두므로 (score), (board_id, score) 인덱스 순서가 곧 인기 순서가 됩니다.
+# 커밋은 항상 호출한 쪽에서 수행합니다.
+
+# 이벤트별 가중치
+LIKE_WEIGHT = 3.0
+COMMENT_WEIGHT = 2.0
+VIEW_WEIGHT = 0.1
+
+# 점수가 절반으로 줄어드는 시간 (초)
+HALF_LIFE = 24 * 3600
+
+# 주기적 감쇠 간격 (초) - 이 간격 안에서 갱신된 글은 감쇠 기준 시각 차이만큼 약간 유리합니다
+DECAY_INTERVAL = 600
+
+# 감쇠 후 이 값보다 작아진 행은 삭제해 테이블을 작게 유지합니다
+PRUNE_BELOW = 0.01
+
+
+def add_post_score(cur, post_id, board_id, delta):
+    """게시글 점수를 현재 시각 기준으로 감쇠한 뒤 delta 만큼 더합니다. (0 미만으로 내려가지 않음)"""
+    if not delta:
+        return
+    # ON DUPLICATE KEY UPDATE 는 왼쪽부터 적용되므로 score 계산에는 이전 decayed_at 이 쓰입니다
+    cur.execute('''
+        INSERT INTO post_scores (post_id, board_id, score, decayed_at)
+        VALUES (%s, %s, GREATEST(%s, 0), NOW())
+        ON DUPLICATE KEY UPDATE
+            score = GREATEST(score * POW(0.5, TIMESTAMPDIFF(SECOND, decayed_at, NOW()) / %s) + %s, 0),
+            decayed_at = NOW()
+    ''', (post_id, board_id, delta, HALF_LIFE, delta))
+
+
+def add_view_scores(cur, batch):
+    """[(post_id, 조회수), ...] 묶음의 조회 점수를 한 번에 더합니다. (삭제된 게시글은 건너뜀)"""
+    cases = ' '.join(['WHEN %s THEN %s'] * len(batch))
+    placeholders = ', '.join(['%s'] * len(batch))
+    params = [value for post_id, count in batch for value in (post_id, count * VIEW_WEIGHT)]
+    params += [post_id for post_id, _ in batch] + [HALF_LIFE]
+    cur.execute(f'''
+        INSERT INTO post_scores (post_id, board_id, score, decayed_at)
+        SELECT posts.id, posts.board_id, CASE posts.id {cases} END, NOW()
+        FROM posts
+        WHERE posts.id IN ({placeholders})
+        ON DUPLICATE KEY UPDATE
+            score = post_scores.score * POW(0.5, TIMESTAMPDIFF(SECOND, post_scores.decayed_at, NOW()) / %s)
+                    + VALUES(score),
+            decayed_at = NOW()
+    ''', params)
+
+
+def decay_post_scores(cur):
+    """모든 점수를 현재 시각 기준으로 감쇠하고 작아진 행을 정리합니다. 삭제된 행 수를 반환합니다."""
+    cur.execute('''
+        UPDATE post_scores
+        SET score = score * POW(0.5, TIMESTAMPDIFF(SECOND, decayed_at, NOW()) / %s),
+            decayed_at = NOW()
+    ''', (HALF_LIFE,))
+    cur.execute('DELETE FROM post_scores WHERE score < %s', (PRUNE_BELOW,))
+    return cur.rowcount
+
+
+def rebuild_post_scores(cur):
+    """
+    게시글 카운터로 점수를 처음부터 다시 계산합니다. 반영된 게시글 수를 반환합니다.
+    개별 이벤트 시각은 알 수 없으므로 게시글 작성 시각 기준으로 감쇠합니다.
+    """
+    cur.execute('DELETE FROM post_scores')
+    cur.execute('''
+        INSERT INTO post_scores (post_id, board_id, score, decayed_at)
+        SELECT id, board_id, scored.score, NOW()
+        FROM (
+            SELECT id, board_id,
+                   (like_count * %s + comment_count * %s + view_count * %s)
+                   * POW(0.5, TIMESTAMPDIFF(SECOND, created_at, NOW()) / %s) AS score
+            FROM posts
+        ) AS scored
+        WHERE scored.score >= %s
+    ''', (LIKE_WEIGHT, COMMENT_WEIGHT, VIEW_WEIGHT, HALF_LIFE, PRUNE_BELOW))
+    return cur.rowcount
+
+
+def fetch_hot_posts(cur, board_id, limit=15):
+    """게시판의 인기글 limit개를 (board_id, score) 인덱스 순서로 조회합니다."""
+    cur.execute('''
+        SELECT posts.*, users.nickname, users.is_vip, boards.name as board_name, boards.route as route,
+               post_scores.score as hot_score
+        FROM post_scores
+        JOIN posts ON posts.id = post_scores.post_id
+        JOIN boards ON posts.board_id = boards.id
+        LEFT JOIN users ON posts.user_id = users.id
+        WHERE post_scores.board_id = %s
+        ORDER BY post_scores.score DESC
+        LIMIT %s
+    ''', (board_id, limit))
+    return list(cur.fetchall())
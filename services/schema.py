@@ -0,0 +1,235 @@
+# 스키마 마이그레이션 적용 및 인덱스 검증
+# migrations/ 디렉터리의 NNN_이름.sql 파일을 버전 순서대로 적용하고 schema_migrations 테이블에 기록합니다.
+#
+# 주의
+# - 파일은 split_statements()로 문장 단위로 나눠 실행합니다. 따옴표/주석 안의 세미콜론은 구분자로 보지 않지만
+#   DELIMITER 를 바꾸는 저장 프로시저/트리거 정의는 지원하지 않습니다.
+# - MySQL의 DDL(ALTER/CREATE)은 바로 커밋되어 되돌릴 수 없으므로, 문장 하나를 실행할 때마다
+#   schema_migration_progress 에 몇 번째 문장까지 적용했는지 기록합니다. 중간에 실패하면 실패한 문장 번호를 알리고,
+#   원인을 고친 뒤 다시 실행하면 기록된 다음 문장부터 이어서 실행합니다.
+#   (이미 적용된 앞부분 문장은 고치지 말고, 실패한 문장과 그 뒤만 수정해야 합니다)
+import os
+import re
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+MIGRATION_FILE_RE = re.compile(r'^(\d+)_([\w-]+)\.sql$')
+
+# 자주 사용하는 조회를 위해 반드시 있어야 하는 인덱스 (테이블 -> {인덱스명: 컬럼 목록})
+EXPECTED_INDEXES = {
+    'posts': {
+        'idx_posts_board_created': ('board_id', 'created_at'),
+        'idx_posts_user_created': ('user_id', 'created_at'),
+    },
+    'comments': {
+        'idx_comments_post_created': ('post_id', 'created_at'),
+    },
+    'post_likes': {
+        'unique_post_user': ('post_id', 'user_id'),
+        'unique_post_anon_ip': ('post_id', 'anon_ip'),
+        'idx_post_likes_post_ip_user': ('post_id', 'ip_address', 'user_id'),
+    },
+    'post_scores': {
+        'idx_post_scores_score': ('score',),
+        'idx_post_scores_board_score': ('board_id', 'score'),
+    },
+    'search_documents': {
+        'unique_search_doc': ('doc_type', 'doc_id'),
+        'ft_search_title': ('title',),
+        'ft_search_title_body': ('title', 'body'),
+    },
+    'media': {
+        'unique_media_sha256': ('sha256',),
+    },
+    'post_media': {
+        'unique_post_media_ordinal': ('post_id', 'ordinal'),
+        'idx_post_media_path': ('path',),
+    },
+    'messages': {
+        'idx_messages_receiver_unread': ('receiver_id', 'is_read', 'receiver_deleted'),
+    },
+    'friendships': {
+        'unique_friendship': ('user_id', 'friend_id'),
+        'idx_friendships_friend_status': ('friend_id', 'status'),
+    },
+    'blocked_ips': {
+        'idx_blocked_ips_ip_expires': ('ip_address', 'expires_at'),
+    },
+    'blocked_users': {
+        'idx_blocked_users_user_expires': ('user_id', 'expires_at'),
+    },
+}
+
+
+class MigrationError(Exception):
+    def __init__(self, version, name, index, total, statement, error):
+        super().__init__(f'{version:03d}_{name}: {total}개 문장 중 {index}번째 실패 ({error})\n{statement}')
+        self.version = version
+        self.index = index
+
+
+def ensure_migrations_table(cur):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    ''')
+    # 적용 중인(중간에 실패한) 마이그레이션이 몇 번째 문장까지 실행됐는지
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migration_progress (
+            version INT PRIMARY KEY,
+            statements_done INT NOT NULL,
+            updated_at DATETIME NOT NULL
+        )
+    ''')
+
+
+def list_migrations(migrations_dir=MIGRATIONS_DIR):
+    """(버전, 이름, 파일 경로) 목록을 버전 순으로 반환합니다."""
+    migrations = []
+    for filename in os.listdir(migrations_dir):
+        match = MIGRATION_FILE_RE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(migrations_dir, filename)))
+    return sorted(migrations)
+
+
+def split_statements(sql):
+    """
+    주석(-- ..., /* ... */)을 제거하고 세미콜론 기준으로 SQL 문을 나눕니다.
+    따옴표('...', "...", `...`) 안의 세미콜론과 주석 표시는 그대로 둡니다.
+    """
+    statements = []
+    current = []
+    quote = None
+    i, n = 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if quote:
+            current.append(c)
+            if c == '\\' and quote != '`' and i + 1 < n:
+                current.append(sql[i + 1])
+                i += 2
+                continue
+            if c == quote:
+                # '' 처럼 두 번 쓴 따옴표는 문자열 안의 따옴표
+                if i + 1 < n and sql[i + 1] == quote:
+                    current.append(sql[i + 1])
+                    i += 2
+                    continue
+                quote = None
+            i += 1
+            continue
+
+        if c in '\'"`':
+            quote = c
+        elif sql.startswith('--', i) and (i + 2 == n or sql[i + 2] in ' \t\r\n'):
+            end = sql.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            current.append(' ')
+            continue
+        elif c == ';':
+            statements.append(''.join(current).strip())
+            current = []
+            i += 1
+            continue
+        current.append(c)
+        i += 1
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+def pending_migrations(cur, migrations_dir=MIGRATIONS_DIR):
+    ensure_migrations_table(cur)
+    cur.execute('SELECT version FROM schema_migrations')
+    applied = {row['version'] for row in cur.fetchall()}
+    return [m for m in list_migrations(migrations_dir) if m[0] not in applied]
+
+
+def apply_migration(connection, version, name, path, fake=False):
+    """
+    마이그레이션 하나를 적용하고 기록합니다. fake=True면 실행 없이 적용된 것으로만 기록합니다.
+    문장마다 진행 상황을 커밋하고, 이전에 중간까지 적용했다면 그다음 문장부터 실행합니다.
+    실패하면 MigrationError 를 발생시킵니다.
+    """
+    cur = connection.cursor()
+    try:
+        if not fake:
+            with open(path, encoding='utf-8') as f:
+                statements = split_statements(f.read())
+            cur.execute('SELECT statements_done FROM schema_migration_progress WHERE version = %s', (version,))
+            row = cur.fetchone()
+            done = row['statements_done'] if row else 0
+            for index in range(done, len(statements)):
+                try:
+                    cur.execute(statements[index])
+                except Exception as e:
+                    connection.rollback()
+                    raise MigrationError(version, name, index + 1, len(statements), statements[index], e) from e
+                cur.execute('''
+                    INSERT INTO schema_migration_progress (version, statements_done, updated_at)
+                    VALUES (%s, %s, NOW())
+                    ON DUPLICATE KEY UPDATE statements_done = VALUES(statements_done), updated_at = NOW()
+                ''', (version, index + 1))
+                connection.commit()
+        cur.execute('INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, NOW())',
+                    (version, name))
+        cur.execute('DELETE FROM schema_migration_progress WHERE version = %s', (version,))
+        connection.commit()
+    finally:
+        cur.close()
+
+
+def fetch_live_indexes(cur):
+    """현재 DB의 인덱스를 {테이블: {인덱스명: {'columns': (...), 'unique': bool}}} 형태로 반환합니다."""
+    cur.execute('''
+        SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, SEQ_IN_INDEX, NON_UNIQUE
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    ''')
+    live = {}
+    for row in cur.fetchall():
+        index = live.setdefault(row['TABLE_NAME'], {}).setdefault(
+            row['INDEX_NAME'], {'columns': (), 'unique': not row['NON_UNIQUE']})
+        index['columns'] += (row['COLUMN_NAME'],)
+    return live
+
+
+def verify_schema(cur):
+    """
+    기대 인덱스와 실제 스키마를 비교합니다.
+    반환값: (missing, redundant)
+      missing   - [(테이블, 인덱스명, 컬럼)] 기대 컬럼 구성을 가진 인덱스가 없는 경우
+      redundant - [(테이블, 인덱스명, 컬럼, 대체 인덱스명)] 다른 인덱스의 앞부분과 같아 불필요한 인덱스
+    """
+    live = fetch_live_indexes(cur)
+    missing = []
+    for table, indexes in EXPECTED_INDEXES.items():
+        live_columns = {index['columns'] for index in live.get(table, {}).values()}
+        for name, columns in indexes.items():
+            if tuple(columns) not in live_columns:
+                missing.append((table, name, columns))
+
+    redundant = []
+    for table, indexes in live.items():
+        for name, index in indexes.items():
+            if name == 'PRIMARY' or index['unique']:
+                continue
+            columns = index['columns']
+            for other_name, other in indexes.items():
+                if other_name == name:
+                    continue
+                other_columns = other['columns']
+                covers = other_columns[:len(columns)] == columns
+                # 완전히 같은 인덱스끼리는 이름 순으로 한쪽만 중복으로 보고
+                if covers and (len(other_columns) > len(columns) or other['unique'] or other_name < name):
+                    redundant.append((table, name, columns, other_name))
+                    break
+    return missing, redundant
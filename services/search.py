@@ -0,0 +1,192 @@
+# 게시글/댓글 전문 검색
+# search_documents 테이블에 게시글(제목+본문)과 댓글(본문)의 태그를 제거한 텍스트를 두고,
+# ngram 파서 FULLTEXT 인덱스(한국어 2글자 단위)로 검색합니다.
+# 색인은 글/댓글 작성·수정·삭제와 같은 트랜잭션 안에서 갱신하며, 커밋은 호출한 쪽에서 수행합니다.
+import base64
+import html
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# 검색 결과 캐시 유지 시간(초)과 워커별 최대 항목 수
+SEARCH_CACHE_TTL = 30
+SEARCH_CACHE_SIZE = 256
+
+# 이 시간(ms)보다 오래 걸린 검색은 로그로 남김
+SLOW_SEARCH_MS = 200
+
+# 제목 일치에 주는 가중치 (본문보다 제목에 있는 검색어를 우선)
+TITLE_WEIGHT = 2
+
+# ngram_token_size(기본 2)보다 짧은 검색어는 색인으로 찾을 수 없음
+MIN_TERM_LENGTH = 2
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+# 불리언 모드 연산자로 해석되는 문자
+BOOLEAN_OPERATORS_RE = re.compile(r'[+\-<>()~*"@]')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def strip_content(text):
+    """HTML 태그와 엔티티를 제거하고 공백을 정리한 색인용 텍스트"""
+    if not text:
+        return ''
+    return SPACE_RE.sub(' ', html.unescape(TAG_RE.sub(' ', text))).strip()
+
+
+def index_post(cur, post_id, board_id, title, content, created_at=None):
+    """게시글 색인을 추가하거나 갱신합니다."""
+    cur.execute('''
+        INSERT INTO search_documents (doc_type, doc_id, post_id, board_id, title, body, created_at)
+        VALUES ('post', %s, %s, %s, %s, %s, COALESCE(%s, NOW()))
+        ON DUPLICATE KEY UPDATE title = VALUES(title), body = VALUES(body)
+    ''', (post_id, post_id, board_id, title or '', strip_content(content), created_at))
+
+
+def index_comment(cur, comment_id, post_id, board_id, content, created_at=None):
+    """댓글 색인을 추가합니다."""
+    cur.execute('''
+        INSERT INTO search_documents (doc_type, doc_id, post_id, board_id, title, body, created_at)
+        VALUES ('comment', %s, %s, %s, '', %s, COALESCE(%s, NOW()))
+        ON DUPLICATE KEY UPDATE body = VALUES(body)
+    ''', (comment_id, post_id, board_id, strip_content(content), created_at))
+
+
+def unindex_comment(cur, comment_id):
+    """댓글 색인을 삭제합니다. (게시글 색인과 그 댓글 색인은 posts 삭제 시 FK로 함께 삭제됨)"""
+    cur.execute("DELETE FROM search_documents WHERE doc_type = 'comment' AND doc_id = %s", (comment_id,))
+
+
+def rebuild_search_index(cur):
+    """모든 게시글/댓글을 다시 색인합니다. 색인된 문서 수를 반환합니다."""
+    cur.execute('DELETE FROM search_documents')
+    count = 0
+    cur.execute('SELECT id, board_id, title, content, created_at FROM posts')
+    for post in cur.fetchall():
+        index_post(cur, post['id'], post['board_id'], post['title'], post['content'], post['created_at'])
+        count += 1
+    cur.execute('''
+        SELECT comments.id, comments.post_id, posts.board_id, comments.content, comments.created_at
+        FROM comments JOIN posts ON comments.post_id = posts.id
+    ''')
+    for comment in cur.fetchall():
+        index_comment(cur, comment['id'], comment['post_id'], comment['board_id'], comment['content'],
+                      comment['created_at'])
+        count += 1
+    return count
+
+
+def build_boolean_query(query):
+    """
+    검색어를 불리언 모드 쿼리로 변환합니다. 공백으로 나눈 각 단어를 구문("...")으로 묶어 모두 포함해야 일치합니다.
+    유효한 단어가 없으면 None을 반환합니다.
+    """
+    terms = [term for term in BOOLEAN_OPERATORS_RE.sub(' ', query or '').split() if len(term) >= MIN_TERM_LENGTH]
+    if not terms:
+        return None
+    return ' '.join(f'+"{term}"' for term in terms[:10])
+
+
+def encode_search_cursor(hit):
+    raw = json.dumps([hit['score'], hit['id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_search_cursor(token):
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        score, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return float(score), int(doc_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def _run_search(cur, boolean_query, board_id, cursor, per_page):
+    board_filter = 'AND sd.board_id = %s' if board_id is not None else ''
+    cursor_filter = 'WHERE (hits.score < %s OR (hits.score = %s AND hits.id < %s))' if cursor else ''
+    params = [boolean_query, boolean_query, boolean_query]
+    if board_id is not None:
+        params.append(board_id)
+    if cursor:
+        params += [cursor[0], cursor[0], cursor[1]]
+    params.append(per_page + 1)
+
+    # 같은 검색어는 항상 같은 점수가 나오도록 반올림한 점수와 문서 id로 커서를 만듭니다
+    cur.execute(f'''
+        SELECT hits.id, hits.doc_type, hits.doc_id, hits.post_id, hits.body, hits.created_at, hits.score,
+               posts.title, posts.is_anonymous, boards.route as board_route, boards.name as board_name,
+               CASE
+                   WHEN boards.route = 'anonymous' THEN '익명'
+                   WHEN hits.doc_type = 'comment' THEN comment_users.nickname
+                   ELSE users.nickname
+               END as nickname
+        FROM (
+            SELECT sd.id, sd.doc_type, sd.doc_id, sd.post_id, sd.body, sd.created_at,
+                   ROUND(MATCH(sd.title) AGAINST (%s IN BOOLEAN MODE) * {TITLE_WEIGHT}
+                         + MATCH(sd.title, sd.body) AGAINST (%s IN BOOLEAN MODE), 6) AS score
+            FROM search_documents sd
+            WHERE MATCH(sd.title, sd.body) AGAINST (%s IN BOOLEAN MODE)
+            {board_filter}
+        ) AS hits
+        JOIN posts ON posts.id = hits.post_id
+        JOIN boards ON boards.id = posts.board_id
+        LEFT JOIN users ON users.id = posts.user_id
+        LEFT JOIN comments ON hits.doc_type = 'comment' AND comments.id = hits.doc_id
+        LEFT JOIN users AS comment_users ON comment_users.id = comments.user_id
+        {cursor_filter}
+        ORDER BY hits.score DESC, hits.id DESC
+        LIMIT %s
+    ''', params)
+    return list(cur.fetchall())
+
+
+def search(mysql, query, board_id=None, cursor=None, per_page=20):
+    """
+    게시글/댓글을 검색합니다. 결과는 SEARCH_CACHE_TTL초 동안 워커별로 캐시합니다.
+    반환값: {'hits', 'next_cursor', 'took_ms', 'cached'}
+    """
+    boolean_query = build_boolean_query(query)
+    if boolean_query is None:
+        return {'hits': [], 'next_cursor': None, 'took_ms': 0.0, 'cached': False}
+
+    key = (boolean_query, board_id, cursor, per_page)
+    start = time.perf_counter()
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[1] > now:
+            _cache.move_to_end(key)
+            result = dict(cached[0])
+            result['took_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            result['cached'] = True
+            return result
+
+    cur = mysql.connection.cursor()
+    try:
+        hits = _run_search(cur, boolean_query, board_id, decode_search_cursor(cursor), per_page)
+    finally:
+        cur.close()
+
+    for hit in hits:
+        # 본문 앞부분만 미리보기로 사용
+        hit['snippet'] = hit.pop('body')[:150]
+    next_cursor = encode_search_cursor(hits[per_page - 1]) if len(hits) > per_page else None
+    result = {'hits': hits[:per_page], 'next_cursor': next_cursor}
+
+    took_ms = (time.perf_counter() - start) * 1000
+    if took_ms > SLOW_SEARCH_MS:
+        print(f"느린 검색 ({took_ms:.1f}ms): {boolean_query} board={board_id}")
+
+    with _cache_lock:
+        _cache[key] = (result, now + SEARCH_CACHE_TTL)
+        _cache.move_to_end(key)
+        while len(_cache) > SEARCH_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return dict(result, took_ms=round(took_ms, 3), cached=False)
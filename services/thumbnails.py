@@ -0,0 +1,174 @@
+# 업로드 이미지 썸네일/중간 크기 파생 이미지
+# 원본(static/uploads/...)마다 static/thumbs/<크기>/... 에 JPEG 파생 이미지를 만들어 목록/홈 카드에서 사용합니다.
+# 생성은 워커별 백그라운드 스레드가 큐에서 꺼내 처리하고, 끝나면 on_generated 로 등록한 처리기가
+# 게시글 대표 이미지 경로 등을 썸네일로 바꿉니다. (그 전까지는 원본을 그대로 사용)
+import os
+import queue
+import threading
+
+from services.atomic_files import replacing
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow가 없으면 파생 이미지 없이 원본을 사용
+    Image = None
+    ImageOps = None
+
+# 크기 이름 -> ((너비, 높이), 잘라서 채울지 여부)
+SIZES = {
+    'thumb': ((400, 300), True),     # 목록/홈 카드 (fixed-thumb 비율)
+    'medium': ((1280, 1280), False),  # 본문/광고용 축소본 (비율 유지)
+}
+
+JPEG_QUALITY = 82
+
+UPLOADS_PREFIX = 'uploads/'
+THUMBS_DIR = 'thumbs'
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+
+
+def static_relpath(path):
+    """'/static/uploads/a.jpg', 'static/uploads/a.jpg', 'uploads/a.jpg' 을 static 기준 경로(uploads/a.jpg)로 바꿉니다."""
+    if not path:
+        return None
+    path = path.replace('\\', '/').lstrip('/')
+    if path.startswith('static/'):
+        path = path[len('static/'):]
+    if not path.startswith(UPLOADS_PREFIX) or '..' in path.split('/'):
+        return None
+    return path
+
+
+def derivative_relpath(relpath, size):
+    """원본(uploads/...)에 대응하는 파생 이미지 경로 (thumbs/<size>/....jpg)"""
+    stem = os.path.splitext(relpath[len(UPLOADS_PREFIX):])[0]
+    return f'{THUMBS_DIR}/{size}/{stem}.jpg'
+
+
+def generate_derivatives(static_folder, relpath, force=False):
+    """원본 하나의 파생 이미지를 모두 만듭니다. 새로 만든 개수를 반환합니다."""
+    if Image is None:
+        return 0
+    source = os.path.join(static_folder, relpath)
+    if not os.path.isfile(source):
+        return 0
+
+    targets = []
+    for size in SIZES:
+        target = os.path.join(static_folder, derivative_relpath(relpath, size))
+        if force or not os.path.exists(target):
+            targets.append((size, target))
+    if not targets:
+        return 0
+
+    with Image.open(source) as original:
+        # 휴대폰 사진의 회전 정보 반영, 투명 배경은 흰색으로
+        image = ImageOps.exif_transpose(original)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+
+        for size, target in targets:
+            dimensions, crop = SIZES[size]
+            if crop:
+                derived = ImageOps.fit(image, dimensions, Image.LANCZOS)
+            else:
+                derived = image.copy()
+                derived.thumbnail(dimensions, Image.LANCZOS)
+            with replacing(target) as tmp_path:
+                derived.save(tmp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return len(targets)
+
+
+def sniff_image_type(path):
+    """파일 앞부분으로 이미지 형식(png/jpg/gif/webp)을 판별합니다. 이미지가 아니면 None."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(12)
+    except OSError:
+        return None
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def iter_uploads(static_folder):
+    """
+    static/uploads 아래의 모든 이미지 원본 경로(uploads/...)
+    확장자가 없는 이전 업로드(예: 20250504204151_0_png)는 파일 내용으로 이미지인지 확인합니다.
+    """
+    uploads_dir = os.path.join(static_folder, UPLOADS_PREFIX)
+    for root, _, files in os.walk(uploads_dir):
+        for filename in files:
+            # 저장 중인 임시 파일(.xxxx.tmp) 제외
+            if filename.startswith('.'):
+                continue
+            full_path = os.path.join(root, filename)
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS or sniff_image_type(full_path):
+                yield os.path.relpath(full_path, static_folder).replace(os.sep, '/')
+
+
+class ThumbnailWorker:
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._generated_handlers = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+
+    def on_generated(self, handler):
+        """파생 이미지가 준비되면 백그라운드 스레드에서 handler(원본 static 기준 경로)를 호출합니다. (데코레이터)"""
+        self._generated_handlers.append(handler)
+        return handler
+
+    def enqueue(self, path):
+        """파생 이미지 생성을 예약합니다. (업로드 경로 형식 그대로 전달)"""
+        relpath = static_relpath(path)
+        if relpath is None or Image is None:
+            return
+        with self._lock:
+            if relpath in self._queued:
+                return
+            self._queued.add(relpath)
+            self._ensure_thread()
+        self._queue.put(relpath)
+
+    def _ensure_thread(self):
+        # fork 이후에는 부모의 스레드가 없으므로 워커마다 새로 시작합니다
+        if self._thread is None or not self._thread.is_alive() or self._thread_pid != os.getpid():
+            self._thread = threading.Thread(target=self._run, name='thumbnails', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            relpath = self._queue.get()
+            try:
+                generate_derivatives(self.app.static_folder, relpath)
+                if all(os.path.exists(os.path.join(self.app.static_folder, derivative_relpath(relpath, size)))
+                       for size in SIZES):
+                    for handler in self._generated_handlers:
+                        handler(relpath)
+            except Exception as e:
+                print(f"썸네일 생성 오류 ({relpath}): {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard(relpath)
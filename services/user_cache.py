@@ -0,0 +1,56 @@
+# 로그인 사용자 정보(principal) 메모리 캐시
+# load_user 가 요청마다 users 를 조회하지 않도록 워커별로 id/닉네임/권한만 USER_CACHE_TTL초 동안 보관합니다.
+# 회원 정보/권한을 바꾸면 bump()로 버전을 올려 모든 워커의 캐시를 비웁니다.
+# 버전이 바뀌는 동안 읽고 있던 값은 저장하지 않으므로 이전 권한이 다시 캐시되지 않습니다.
+import threading
+import time
+
+from services import workers
+
+PRINCIPAL_COLUMNS = ('id', 'username', 'nickname', 'is_admin', 'is_vip')
+
+
+class UserCache:
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('USER_CACHE_TTL', 300)  # 알림 없이 바뀐 경우를 대비한 최대 유지 시간(초)
+        self.app = app
+        workers.subscribe('users', self.invalidate)
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def bump(self):
+        """회원 정보/권한 변경 후 호출합니다. 모든 워커의 사용자 캐시를 비웁니다."""
+        workers.publish('users')
+
+    def _load(self, user_id):
+        cur = self.app.extensions['mysql'].connection.cursor()
+        cur.execute(f'SELECT {", ".join(PRINCIPAL_COLUMNS)} FROM users WHERE id = %s', (user_id,))
+        user = cur.fetchone()
+        cur.close()
+        return dict(user) if user else None
+
+    def get(self, user_id):
+        """사용자 정보를 반환합니다. 없는(삭제된) 사용자는 None 입니다. (앱 컨텍스트 필요)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            version = self._version
+        if entry and entry[1] > now:
+            return dict(entry[0]) if entry[0] else None
+
+        user = self._load(user_id)
+        with self._lock:
+            if self._version == version:
+                self._entries[user_id] = (user, now + self.app.config['USER_CACHE_TTL'])
+        return dict(user) if user else None
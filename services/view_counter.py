@@ -0,0 +1,163 @@
+# 조회수 쓰기 지연(write-behind) 버퍼
+# 조회마다 posts 행을 UPDATE/커밋하지 않고 워커 메모리에 모아 두었다가,
+# 백그라운드 스레드가 VIEW_FLUSH_INTERVAL초마다(그리고 워커 종료 시) 한 번의 UPDATE ... CASE 로 반영합니다.
+# 워커가 비정상 종료되면 마지막 반영 이후의 조회수(최대 VIEW_FLUSH_INTERVAL초 분량)만 유실됩니다.
+import os
+import threading
+import time
+
+from services import workers
+from services.post_scores import add_view_scores
+
+# 한 번의 UPDATE 에 넣을 최대 게시글 수
+FLUSH_BATCH_SIZE = 500
+
+
+class ViewCountBuffer:
+    def __init__(self, app=None):
+        self.app = None
+        self._cond = threading.Condition()
+        self._reset_state()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('VIEW_FLUSH_INTERVAL', 5)  # 반영 주기(초), 유실 가능 구간의 상한
+        app.config.setdefault('VIEW_BUFFER_MAX_POSTS', 1000)  # 이 개수를 넘으면 주기를 기다리지 않고 반영
+        self.app = app
+        workers.on_worker_exit(self.flush)
+
+    def _reset_state(self):
+        # fork 이후에는 부모 프로세스의 버퍼/스레드를 이어받지 않습니다
+        self._pid = os.getpid()
+        self._pending = {}
+        self._oldest = None
+        self._thread = None
+        self._flush_now = False
+        self._flush_lock = threading.Lock()
+        self._metrics = {
+            'flushes': 0,
+            'flushed_views': 0,
+            'errors': 0,
+            'last_flush_at': None,
+            'last_flush_ms': 0.0,
+            'last_lag_ms': 0.0,
+            'max_lag_ms': 0.0,
+        }
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._reset_state()
+
+    def record(self, post_id, count=1):
+        """조회수를 버퍼에 더합니다."""
+        with self._cond:
+            self._check_fork()
+            self._pending[post_id] = self._pending.get(post_id, 0) + count
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._pending) >= self.app.config['VIEW_BUFFER_MAX_POSTS']:
+                self._flush_now = True
+                self._cond.notify()
+            self._ensure_thread()
+
+    def pending(self, post_id):
+        """아직 DB에 반영되지 않은 이 워커의 조회수"""
+        with self._cond:
+            self._check_fork()
+            return self._pending.get(post_id, 0)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='view-counter', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._flush_now:
+                    self._cond.wait(self.app.config['VIEW_FLUSH_INTERVAL'])
+                self._flush_now = False
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"조회수 반영 오류: {e}")
+
+    def _take(self):
+        with self._cond:
+            self._check_fork()
+            pending, oldest = self._pending, self._oldest
+            self._pending, self._oldest = {}, None
+        return pending, oldest
+
+    def _restore(self, pending, oldest):
+        # 반영에 실패한 조회수는 다음 주기에 다시 시도합니다
+        with self._cond:
+            for post_id, count in pending.items():
+                self._pending[post_id] = self._pending.get(post_id, 0) + count
+            if oldest is not None and (self._oldest is None or oldest < self._oldest):
+                self._oldest = oldest
+            self._metrics['errors'] += 1
+
+    def flush(self):
+        """버퍼의 조회수를 DB에 반영합니다. 반영한 게시글 수를 반환합니다."""
+        with self._flush_lock:
+            pending, oldest = self._take()
+            if not pending:
+                return 0
+
+            start = time.monotonic()
+            try:
+                with self.app.app_context():
+                    connection = self.app.extensions['mysql'].connection
+                    cur = connection.cursor()
+                    try:
+                        items = sorted(pending.items())
+                        for i in range(0, len(items), FLUSH_BATCH_SIZE):
+                            batch = items[i:i + FLUSH_BATCH_SIZE]
+                            apply_view_counts(cur, batch)
+                            add_view_scores(cur, batch)
+                        connection.commit()
+                    finally:
+                        cur.close()
+            except Exception:
+                self._restore(pending, oldest)
+                raise
+
+            now = time.monotonic()
+            with self._cond:
+                lag_ms = (now - oldest) * 1000
+                self._metrics['flushes'] += 1
+                self._metrics['flushed_views'] += sum(pending.values())
+                self._metrics['last_flush_at'] = time.time()
+                self._metrics['last_flush_ms'] = round((now - start) * 1000, 2)
+                self._metrics['last_lag_ms'] = round(lag_ms, 2)
+                self._metrics['max_lag_ms'] = round(max(self._metrics['max_lag_ms'], lag_ms), 2)
+            return len(pending)
+
+    def stats(self):
+        """현재 워커의 버퍼 상태와 반영 지연(flush lag) 지표"""
+        with self._cond:
+            self._check_fork()
+            oldest = self._oldest
+            return dict(
+                self._metrics,
+                pid=self._pid,
+                pending_posts=len(self._pending),
+                pending_views=sum(self._pending.values()),
+                # 가장 오래 기다린 조회수가 버퍼에 머문 시간 (유실 가능 구간)
+                current_lag_ms=round((time.monotonic() - oldest) * 1000, 2) if oldest is not None else 0.0,
+                flush_interval=self.app.config['VIEW_FLUSH_INTERVAL'],
+            )
+
+
+def apply_view_counts(cur, batch):
+    """[(post_id, 조회수), ...]를 한 번의 UPDATE ... CASE 로 반영합니다."""
+    cases = ' '.join(['WHEN %s THEN %s'] * len(batch))
+    placeholders = ', '.join(['%s'] * len(batch))
+    params = [value for item in batch for value in item] + [post_id for post_id, _ in batch]
+    cur.execute(f'''
+        UPDATE posts
+        SET view_count = view_count + CASE id {cases} ELSE 0 END
+        WHERE id IN ({placeholders})
+    ''', params)
@@ -0,0 +1,45 @@
+# 워커 예열
+# 워커가 fork 된 직후 메모리 캐시와 홈 화면 스냅샷을 미리 만들고 모든 템플릿을 컴파일해 둡니다.
+# 템플릿은 Jinja 바이트코드 캐시(파일)에서 읽으므로 max-requests/reload-on-rss 로 재시작된 워커도 다시 파싱하지 않습니다.
+# 단계별 소요 시간을 워커 시작 보고로 남깁니다.
+import os
+import time
+
+
+def compile_templates(app):
+    """모든 .html 템플릿을 컴파일(또는 바이트코드 캐시에서 로드)해 Jinja 캐시에 올립니다. 템플릿 수를 반환합니다."""
+    names = app.jinja_env.list_templates(filter_func=lambda name: name.endswith('.html'))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def warm_up(steps):
+    """(이름, 함수) 단계를 차례로 실행하고 단계별 소요 시간 보고를 반환합니다. 실패한 단계는 건너뜁니다."""
+    report = {'pid': os.getpid(), 'steps': [], 'errors': []}
+    start = time.perf_counter()
+    for name, func in steps:
+        step_start = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            report['errors'].append(f'{name}: {e}')
+            result = None
+        report['steps'].append({
+            'name': name,
+            'ms': round((time.perf_counter() - step_start) * 1000, 1),
+            'count': result if isinstance(result, int) else None,
+        })
+    report['total_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return report
+
+
+def format_report(report):
+    steps = ', '.join(
+        f"{step['name']} {step['ms']}ms" + (f" ({step['count']}개)" if step['count'] is not None else '')
+        for step in report['steps']
+    )
+    line = f"워커 {report['pid']} 예열 {report['total_ms']}ms: {steps}"
+    if report['errors']:
+        line += f" / 실패: {'; '.join(report['errors'])}"
+    return line
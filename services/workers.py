@@ -0,0 +1,143 @@
+# uwsgi 워커 연동
+# uwsgi 아래에서는 시그널로 모든 워커(프로세스)에 캐시 무효화를 전달하고,
+# 개발 서버(python app.py)처럼 uwsgi가 없으면 현재 프로세스 안에서만 처리합니다.
+import threading
+import time
+
+try:
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
+# 사용자 정의 uwsgi 시그널 번호 시작값 (채널/타이머마다 1씩 증가)
+SIGNAL_BASE = 30
+
+_channels = {}
+_timers = []
+
+# 현재 워커가 보낸 뒤 아직 돌아오지 않은 채널별 시그널 수 (이미 바로 반영했으므로 돌아온 시그널은 건너뜀)
+_own_signals = {}
+_own_signals_lock = threading.Lock()
+
+# uwsgi가 없을 때 every() 로 등록한 (이름, 주기, 함수) - 첫 요청에서 start_local_timers()가 스레드를 시작
+_local_timers = []
+_local_timers_started = False
+_local_timers_lock = threading.Lock()
+
+
+def _next_signal():
+    return SIGNAL_BASE + len(_channels) + len(_timers)
+
+
+def _dispatch(channel):
+    for handler in _channels[channel][1]:
+        try:
+            handler()
+        except Exception as e:
+            print(f"캐시 무효화 처리 오류 ({channel}): {e}")
+
+
+def _on_signal(channel):
+    with _own_signals_lock:
+        if _own_signals.get(channel):
+            _own_signals[channel] -= 1
+            return
+    _dispatch(channel)
+
+
+def subscribe(channel, handler):
+    """channel 무효화 알림을 받을 handler를 등록합니다. (앱 로딩 시점, 워커 fork 이전에 호출)"""
+    if channel not in _channels:
+        signum = _next_signal()
+        _channels[channel] = (signum, [])
+        if uwsgi is not None:
+            uwsgi.register_signal(signum, 'workers', lambda num, channel=channel: _on_signal(channel))
+    _channels[channel][1].append(handler)
+
+
+def publish(channel):
+    """모든 워커에 channel 무효화를 알립니다. 현재 워커는 즉시 반영하고 자신에게 돌아온 시그널은 무시합니다."""
+    if channel not in _channels:
+        return
+    _dispatch(channel)
+    if uwsgi is not None:
+        with _own_signals_lock:
+            _own_signals[channel] = _own_signals.get(channel, 0) + 1
+        try:
+            uwsgi.signal(_channels[channel][0])
+        except Exception:
+            with _own_signals_lock:
+                _own_signals[channel] -= 1
+            raise
+
+
+def on_worker_start(func):
+    """워커 fork 직후 실행할 함수를 등록합니다. (uwsgi가 아니면 등록하지 않음)"""
+    if uwsgi is not None:
+        from uwsgidecorators import postfork
+        postfork(func)
+    return func
+
+
+def on_worker_exit(func):
+    """워커 종료 직전 실행할 함수를 등록합니다. (uwsgi.atexit, 아니면 파이썬 atexit)"""
+    if uwsgi is not None:
+        previous = getattr(uwsgi, 'atexit', None)
+
+        def chained():
+            try:
+                func()
+            except Exception as e:
+                print(f"종료 작업 오류 ({func.__name__}): {e}")
+            if previous is not None:
+                previous()
+        uwsgi.atexit = chained
+    else:
+        import atexit
+        atexit.register(func)
+    return func
+
+
+def every(seconds):
+    """
+    seconds초마다 실행할 함수를 등록하는 데코레이터입니다.
+    uwsgi에서는 타이머 시그널로 워커 하나에서만 실행하고, 아니면 start_local_timers()가 시작한 데몬 스레드에서 실행합니다.
+    (import 시점에는 스레드를 만들지 않으므로 flask CLI 명령에서는 실행되지 않음)
+    """
+    def decorator(func):
+        def run(*args):
+            try:
+                func()
+            except Exception as e:
+                print(f"주기 작업 오류 ({func.__name__}): {e}")
+
+        if uwsgi is not None:
+            signum = _next_signal()
+            _timers.append(signum)
+            uwsgi.register_signal(signum, 'worker', run)
+            uwsgi.add_timer(signum, seconds)
+        else:
+            _timers.append(None)
+            _local_timers.append((func.__name__, seconds, run))
+        return func
+    return decorator
+
+
+def start_local_timers():
+    """
+    uwsgi 없이 요청을 처리할 때(python app.py) every() 작업 스레드를 한 번만 시작합니다.
+    before_request 에 등록해 실제로 요청을 처리하는 프로세스에서만 시작합니다.
+    """
+    global _local_timers_started
+    if _local_timers_started or uwsgi is not None:
+        return
+    with _local_timers_lock:
+        if _local_timers_started:
+            return
+        _local_timers_started = True
+        for name, seconds, run in _local_timers:
+            def loop(seconds=seconds, run=run):
+                while True:
+                    time.sleep(seconds)
+                    run()
+            threading.Thread(target=loop, name=f'every-{name}', daemon=True).start()
@@ -0,0 +1,69 @@
+/**
+ * BLACK COMBAT LAND
+ * 이미지 분할(청크) 업로드
+ *
+ * uploadImageChunked(file, csrfToken) 은 /upload_image 와 같은 형식({success, path, error})으로 결과를 돌려줍니다.
+ * 연결이 끊기면 서버에 받은 위치를 물어본 뒤 그 위치부터 다시 보냅니다.
+ */
+(function() {
+    const MAX_RETRIES = 5;
+
+    function request(method, url, csrfToken, body, headers) {
+        return fetch(url, {
+            method: method,
+            headers: Object.assign({'X-CSRFToken': csrfToken}, headers || {}),
+            body: body
+        }).then(response => response.json().then(data => {
+            data.status = response.status;
+            return data;
+        }));
+    }
+
+    function sleep(ms) {
+        return new Promise(resolve => setTimeout(resolve, ms));
+    }
+
+    async function uploadImageChunked(file, csrfToken) {
+        const init = await request('POST', '/upload_image/chunked', csrfToken,
+            JSON.stringify({filename: file.name, size: file.size}),
+            {'Content-Type': 'application/json'});
+        if (!init.success) {
+            return init;
+        }
+
+        const url = '/upload_image/chunked/' + init.upload_id;
+        let received = init.received;
+        let retries = 0;
+        while (received < file.size) {
+            const chunk = file.slice(received, received + init.chunk_size);
+            let result;
+            try {
+                result = await request('PUT', url + '?offset=' + received, csrfToken, chunk,
+                    {'Content-Type': 'application/octet-stream'});
+            } catch (error) {
+                // 연결이 끊긴 경우 서버가 받은 위치부터 다시 전송
+                if (++retries > MAX_RETRIES) {
+                    return {success: false, error: '네트워크 오류로 업로드하지 못했습니다.'};
+                }
+                await sleep(1000 * retries);
+                try {
+                    result = await request('GET', url, csrfToken);
+                } catch (statusError) {
+                    continue;
+                }
+            }
+            if (result.success) {
+                received = result.received;
+            } else if (result.status === 409 && result.received !== undefined) {
+                // 서버가 받은 위치와 다르면 그 위치부터 다시 전송
+                received = result.received;
+            } else {
+                return result;
+            }
+        }
+
+        return request('POST', url + '/finalize', csrfToken);
+    }
+
+    window.uploadImageChunked = uploadImageChunked;
+})();
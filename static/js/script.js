@@ -47,8 +47,10 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    // 페이지네이션 활성화
-    const currentPage = new URLSearchParams(window.location.search).get('page') || 1;
+    // 페이지네이션 활성화 (커서 방식 목록에서는 활성 페이지 번호 없음)
+    const searchParams = new URLSearchParams(window.location.search);
+    const isCursorPage = searchParams.has('before') || searchParams.has('after');
+    const currentPage = searchParams.get('page') || (isCursorPage ? null : 1);
     const pageLinks = document.querySelectorAll('.pagination .page-link');
     
     pageLinks.forEach(function(link) {
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip('flask')
+
+from services.assets import _rewrite_css_urls  # noqa: E402
+
+MANIFEST = {
+    'vendor/fonts/icons.woff2': 'dist/vendor/fonts/icons.0123abcd.woff2',
+    'img/bg.png': 'dist/img/bg.89abcdef.png',
+}
+
+
+def test_rewrite_css_urls_relative_paths():
+    css = "@font-face { src: url('../fonts/icons.woff2?v=1#iefix') } .a { background: url(../../img/bg.png) }"
+    assert _rewrite_css_urls('vendor/css/icons.css', css, MANIFEST) == (
+        "@font-face { src: url('../fonts/icons.0123abcd.woff2?v=1#iefix') } "
+        ".a { background: url(../../img/bg.89abcdef.png) }"
+    )
+
+
+def test_rewrite_css_urls_leaves_other_urls():
+    css = ('url(data:image/png;base64,AAAA) url("https://example.com/a.png") url(/static/a.png) '
+           'url(#clip) url(missing.png)')
+    assert _rewrite_css_urls('css/style.css', css, MANIFEST) == css
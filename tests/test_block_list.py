@@ -0,0 +1,96 @@
+import ipaddress
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from services.block_list import BlockList, _RadixTree, parse_network
+
+DB_NOW = datetime(2025, 5, 4, 12, 0, 0)
+
+
+class FakeCursor:
+    def __init__(self, ip_rows, user_rows):
+        self.results = [[{'db_now': DB_NOW}], ip_rows, user_rows]
+        self.rows = None
+
+    def execute(self, sql, params=None):
+        self.rows = self.results.pop(0)
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def make_block_list(ip_rows=(), user_rows=()):
+    cursor = FakeCursor(list(ip_rows), list(user_rows))
+    mysql = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+    blocks = BlockList()
+    blocks.app = SimpleNamespace(extensions={'mysql': mysql})
+    blocks.load()
+    return blocks
+
+
+def test_parse_network():
+    assert parse_network(' 1.2.3.4 ') == ipaddress.ip_network('1.2.3.4/32')
+    assert parse_network('1.2.3.77/24') == ipaddress.ip_network('1.2.3.0/24')
+    assert parse_network('::ffff:1.2.3.0/120') == ipaddress.ip_network('1.2.3.0/24')
+    with pytest.raises(ValueError):
+        parse_network('1.2.3')
+
+
+def test_radix_tree_prefers_narrowest_active_entry():
+    tree = _RadixTree()
+    wide = {'id': 1, 'expires_at': None}
+    narrow = {'id': 2, 'expires_at': DB_NOW + timedelta(hours=1)}
+    tree.insert(parse_network('10.0.0.0/8'), wide)
+    tree.insert(parse_network('10.1.2.0/24'), narrow)
+
+    assert tree.match(ipaddress.ip_address('10.1.2.3'), DB_NOW) is narrow
+    assert tree.match(ipaddress.ip_address('10.9.9.9'), DB_NOW) is wide
+    assert tree.match(ipaddress.ip_address('10.1.2.3'), DB_NOW + timedelta(hours=2)) is wide
+    assert tree.match(ipaddress.ip_address('11.0.0.1'), DB_NOW) is None
+
+
+def test_check_ip_and_user():
+    blocks = make_block_list(
+        ip_rows=[
+            {'id': 1, 'ip_address': '192.168.0.0/16', 'reason': 'range', 'expires_at': None},
+            {'id': 2, 'ip_address': 'bogus', 'reason': 'ignored', 'expires_at': None},
+        ],
+        user_rows=[{'id': 3, 'user_id': 7, 'reason': 'spam', 'expires_at': None}],
+    )
+    assert blocks.check_ip('192.168.10.20')['id'] == 1
+    assert blocks.check_ip('::ffff:192.168.10.20')['id'] == 1
+    assert blocks.check_ip('10.0.0.1') is None
+    assert blocks.check_ip('not an ip') is None
+    assert blocks.check_user(7)['id'] == 3
+    assert blocks.check_user(8) is None
+
+
+def test_expired_entries_are_purged_on_db_clock():
+    expires_at = DB_NOW + timedelta(minutes=5)
+    blocks = make_block_list(
+        ip_rows=[{'id': 1, 'ip_address': '1.2.3.4', 'reason': 'temp', 'expires_at': expires_at}],
+        user_rows=[
+            {'id': 2, 'user_id': 7, 'reason': 'temp', 'expires_at': expires_at},
+            {'id': 3, 'user_id': 7, 'reason': 'perm', 'expires_at': None},
+        ],
+    )
+    assert blocks.check_ip('1.2.3.4')['id'] == 1
+    assert blocks.check_user(7)['id'] == 2
+    users_before = blocks._users[7]
+
+    # DB 시각을 만료 이후로 옮김
+    blocks._db_now = (expires_at, blocks._db_now[1])
+    assert blocks.check_ip('1.2.3.4') is None
+    assert blocks.check_user(7)['id'] == 3
+    assert blocks._expiry == []
+    # 순회 중인 목록은 그대로 두고 새 목록으로 바꿈
+    assert [entry['id'] for entry in users_before] == [2, 3]
+    assert [entry['id'] for entry in blocks._users[7]] == [3]
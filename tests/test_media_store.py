@@ -0,0 +1,58 @@
+import hashlib
+import io
+
+from services.media_store import (
+    CHUNK_SIZE, CONTENT_PATH_RE, _upload_extension, content_relpath, hash_stream, normalize_extension,
+)
+from services.thumbnails import sniff_image_type
+
+PNG_HEADER = b'\x89PNG\r\n\x1a\n' + b'\x00' * 16
+
+
+def test_hash_stream_rewinds_and_counts():
+    data = b'x' * (CHUNK_SIZE * 2 + 123)
+    stream = io.BytesIO(data)
+    stream.read(10)
+    assert hash_stream(stream) == (hashlib.sha256(data).hexdigest(), len(data))
+    assert stream.tell() == 0
+
+
+def test_content_relpath():
+    sha256 = hashlib.sha256(b'image').hexdigest()
+    relpath = content_relpath(sha256, 'jpg')
+    assert relpath == f'uploads/{sha256[:2]}/{sha256}.jpg'
+    assert CONTENT_PATH_RE.match(relpath)
+
+
+def test_normalize_extension():
+    assert normalize_extension('photo.JPEG') == 'jpg'
+    assert normalize_extension('a.b.Png') == 'png'
+    assert normalize_extension('noext') == ''
+
+
+def test_upload_extension_sniffs_extensionless_files(tmp_path):
+    legacy = tmp_path / '20250504120000_png'
+    legacy.write_bytes(PNG_HEADER)
+    named = tmp_path / 'photo.jpeg'
+    named.write_bytes(PNG_HEADER)
+    other = tmp_path / 'notes'
+    other.write_bytes(b'hello')
+
+    assert _upload_extension(str(legacy)) == 'png'
+    assert _upload_extension(str(named)) == 'jpg'
+    assert _upload_extension(str(other)) == ''
+
+
+def test_sniff_image_type(tmp_path):
+    samples = {
+        'png': PNG_HEADER,
+        'jpg': b'\xff\xd8\xff\xe0' + b'\x00' * 8,
+        'gif': b'GIF89a' + b'\x00' * 6,
+        'webp': b'RIFF\x00\x00\x00\x00WEBP',
+        None: b'plain text',
+    }
+    for expected, data in samples.items():
+        path = tmp_path / f'sample_{expected}'
+        path.write_bytes(data)
+        assert sniff_image_type(str(path)) == expected
+    assert sniff_image_type(str(tmp_path / 'missing')) is None
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from services.pagination import MAX_OFFSET_PAGE, count_pages, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    post = {'created_at': datetime(2025, 5, 4, 12, 30, 15), 'id': 42}
+    token = encode_cursor(post)
+    assert '=' not in token
+    assert decode_cursor(token) == (post['created_at'], 42)
+
+
+def test_decode_cursor_rejects_bad_tokens():
+    assert decode_cursor(None) is None
+    assert decode_cursor('') is None
+    assert decode_cursor('not-a-cursor') is None
+    assert decode_cursor(encode_cursor({'created_at': datetime(2025, 1, 1), 'id': 1})[:-3]) is None
+
+
+def test_count_pages():
+    assert count_pages(0, 20) == 0
+    assert count_pages(1, 20) == 1
+    assert count_pages(40, 20) == 2
+    assert count_pages(41, 20) == 3
+    assert count_pages(20 * (MAX_OFFSET_PAGE + 5), 20) == MAX_OFFSET_PAGE
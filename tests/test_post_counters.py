@@ -0,0 +1,124 @@
+# posts.comment_count / like_count 카운터 테스트
+# 실제 MySQL 이 필요합니다. TEST_MYSQL_DB 에 지정한 데이터베이스를 지우고 schema.sql 로 다시 만듭니다.
+#   TEST_MYSQL_DB=blackcombat_test TEST_MYSQL_USER=root TEST_MYSQL_PASSWORD=... python -m pytest
+import os
+
+import pytest
+
+from services.post_counters import adjust_comment_count, adjust_like_count, reconcile_post_counters
+from services.post_likes import toggle_like
+from services.schema import split_statements
+
+MySQLdb = pytest.importorskip('MySQLdb')
+import MySQLdb.cursors  # noqa: E402
+
+TEST_DB = os.environ.get('TEST_MYSQL_DB')
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'schema.sql')
+
+pytestmark = pytest.mark.skipif(not TEST_DB, reason='TEST_MYSQL_DB 가 설정되지 않음')
+
+
+@pytest.fixture
+def cur():
+    connection = MySQLdb.connect(
+        host=os.environ.get('TEST_MYSQL_HOST', 'localhost'),
+        port=int(os.environ.get('TEST_MYSQL_PORT', 3306)),
+        user=os.environ.get('TEST_MYSQL_USER', 'root'),
+        passwd=os.environ.get('TEST_MYSQL_PASSWORD', ''),
+        charset='utf8mb4',
+        cursorclass=MySQLdb.cursors.DictCursor,
+    )
+    cursor = connection.cursor()
+    cursor.execute(f'DROP DATABASE IF EXISTS `{TEST_DB}`')
+    cursor.execute(f'CREATE DATABASE `{TEST_DB}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci')
+    cursor.execute(f'USE `{TEST_DB}`')
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        for statement in split_statements(f.read()):
+            if not statement.upper().startswith(('CREATE DATABASE', 'USE ')):
+                cursor.execute(statement)
+    cursor.execute("INSERT INTO boards (name, route, created_at) VALUES ('자유', 'free', NOW())")
+    cursor.execute('''
+        INSERT INTO posts (board_id, user_id, title, content, created_at)
+        VALUES (%s, 1, '제목', '내용', NOW())
+    ''', (cursor.lastrowid,))
+    connection.commit()
+    try:
+        yield cursor
+    finally:
+        cursor.execute(f'DROP DATABASE IF EXISTS `{TEST_DB}`')
+        connection.close()
+
+
+def _post_id(cur):
+    cur.execute('SELECT id FROM posts LIMIT 1')
+    return cur.fetchone()['id']
+
+
+def _counters(cur, post_id):
+    cur.execute('SELECT comment_count, like_count FROM posts WHERE id = %s', (post_id,))
+    row = cur.fetchone()
+    return row['comment_count'], row['like_count']
+
+
+def _write_comment(cur, post_id):
+    cur.execute("INSERT INTO comments (post_id, user_id, content, created_at) VALUES (%s, 1, '댓글', NOW())",
+                (post_id,))
+    comment_id = cur.lastrowid
+    adjust_comment_count(cur, post_id, 1)
+    return comment_id
+
+
+def _delete_comment(cur, post_id, comment_id):
+    cur.execute('DELETE FROM comments WHERE id = %s', (comment_id,))
+    adjust_comment_count(cur, post_id, -cur.rowcount)
+
+
+def _toggle_like(cur, post_id, **who):
+    liked, delta = toggle_like(cur, post_id, **who)
+    if delta:
+        adjust_like_count(cur, post_id, delta)
+    return liked
+
+
+def test_comment_counter_follows_create_and_delete(cur):
+    post_id = _post_id(cur)
+    first = _write_comment(cur, post_id)
+    _write_comment(cur, post_id)
+    assert _counters(cur, post_id) == (2, 0)
+
+    _delete_comment(cur, post_id, first)
+    assert _counters(cur, post_id) == (1, 0)
+    # 이미 삭제된 댓글을 다시 지워도 카운터는 그대로
+    _delete_comment(cur, post_id, first)
+    assert _counters(cur, post_id) == (1, 0)
+
+
+def test_like_counter_follows_like_and_unlike(cur):
+    post_id = _post_id(cur)
+    assert _toggle_like(cur, post_id, user_id=1) is True
+    assert _toggle_like(cur, post_id, ip_address='10.0.0.1') is True
+    assert _counters(cur, post_id) == (0, 2)
+    assert adjust_like_count(cur, post_id, 0) == 2
+
+    assert _toggle_like(cur, post_id, user_id=1) is False
+    assert _counters(cur, post_id) == (0, 1)
+    assert _toggle_like(cur, post_id, ip_address='10.0.0.1') is False
+    assert _counters(cur, post_id) == (0, 0)
+    # 카운터는 음수가 되지 않음
+    adjust_like_count(cur, post_id, -1)
+    assert _counters(cur, post_id) == (0, 0)
+
+
+def test_reconcile_fixes_drift(cur):
+    post_id = _post_id(cur)
+    _write_comment(cur, post_id)
+    _toggle_like(cur, post_id, user_id=1)
+    cur.execute('UPDATE posts SET comment_count = 7, like_count = 0 WHERE id = %s', (post_id,))
+
+    assert reconcile_post_counters(cur, post_id) == 1
+    assert _counters(cur, post_id) == (1, 1)
+    assert reconcile_post_counters(cur) == 0
+
+    cur.execute('DELETE FROM post_likes WHERE post_id = %s', (post_id,))
+    assert reconcile_post_counters(cur) == 1
+    assert _counters(cur, post_id) == (1, 0)
@@ -0,0 +1,72 @@
+import json
+
+from services.post_media import CAPTION_MAX_LENGTH, post_images, save_post_media
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((' '.join(sql.split()), params))
+
+    def executemany(self, sql, rows):
+        self.statements.append((' '.join(sql.split()), list(rows)))
+
+    def cover_thumb(self):
+        return next(params[0] for sql, params in self.statements if sql.startswith('UPDATE posts SET cover_thumb'))
+
+
+def test_post_images_from_content():
+    content = ('<p><img src="/static/uploads/ab/one.jpg" alt="첫 번째">'
+               '<img src="https://example.com/remote.png">'
+               '<img src="static/uploads/cd/two.png"></p>')
+    assert post_images(content) == [('uploads/ab/one.jpg', '첫 번째'), ('uploads/cd/two.png', '')]
+
+
+def test_post_images_legacy_first_and_deduplicated():
+    images_data = json.dumps({'paths': ['uploads/a.jpg', 'uploads/b.jpg', 3], 'captions': ['a']})
+    content = '<img src="/static/uploads/b.jpg" alt="dup"><img src="/static/uploads/c.jpg">'
+    assert post_images(content, images_data) == [
+        ('uploads/a.jpg', 'a'), ('uploads/b.jpg', ''), ('uploads/c.jpg', ''),
+    ]
+
+
+def test_post_images_single_legacy_image_and_bad_json():
+    assert post_images('', '{not json', '/static/uploads/old.gif') == [('uploads/old.gif', '')]
+    assert post_images(None) == []
+
+
+def test_post_images_rejects_paths_outside_uploads():
+    content = '<img src="/static/uploads/../secret.png"><img src="/static/img/logo.png">'
+    assert post_images(content) == []
+
+
+def test_post_images_truncates_caption():
+    content = f'<img src="/static/uploads/a.jpg" alt="{"가" * (CAPTION_MAX_LENGTH + 10)}">'
+    assert len(post_images(content)[0][1]) == CAPTION_MAX_LENGTH
+
+
+def test_save_post_media_stores_existing_thumbnail_as_cover(tmp_path):
+    thumb = tmp_path / 'thumbs' / 'thumb' / 'ab' / 'one.jpg'
+    thumb.parent.mkdir(parents=True)
+    thumb.write_bytes(b'jpg')
+    cur = RecordingCursor()
+    queued = []
+
+    assert save_post_media(cur, str(tmp_path), 1, [('uploads/ab/one.png', ''), ('uploads/cd/two.png', '')],
+                           queued.append) == 2
+    assert cur.cover_thumb() == 'thumbs/thumb/ab/one.jpg'
+    assert queued == ['uploads/cd/two.png']
+
+
+def test_save_post_media_uses_original_until_thumbnail_exists(tmp_path):
+    cur = RecordingCursor()
+    queued = []
+    save_post_media(cur, str(tmp_path), 1, [('uploads/ab/one.png', '')], queued.append)
+    assert cur.cover_thumb() == 'uploads/ab/one.png'
+    assert queued == ['uploads/ab/one.png']
+
+    cur = RecordingCursor()
+    assert save_post_media(cur, str(tmp_path), 1, []) == 0
+    assert cur.cover_thumb() is None
@@ -0,0 +1,37 @@
+from services.schema import list_migrations, split_statements
+
+
+def test_split_statements_basic():
+    sql = '''
+        CREATE TABLE a (id INT);
+        -- comment; with semicolon
+        /* block; comment */ INSERT INTO a VALUES (1);
+    '''
+    assert split_statements(sql) == ['CREATE TABLE a (id INT)', 'INSERT INTO a VALUES (1)']
+
+
+def test_split_statements_keeps_quoted_semicolons_and_comment_markers():
+    sql = ("INSERT INTO t VALUES ('a;b', \"c -- d\", 'it''s', 'x\\';y');\n"
+           "SELECT `odd;name` FROM t")
+    assert split_statements(sql) == [
+        "INSERT INTO t VALUES ('a;b', \"c -- d\", 'it''s', 'x\\';y')",
+        'SELECT `odd;name` FROM t',
+    ]
+
+
+def test_split_statements_double_dash_needs_whitespace():
+    assert split_statements('SELECT 1--1;\n-- tail') == ['SELECT 1--1']
+
+
+def test_split_statements_ignores_empty_statements():
+    assert split_statements(';;\n  ;') == []
+
+
+def test_existing_migrations_split():
+    migrations = list_migrations()
+    assert migrations
+    for version, name, path in migrations:
+        with open(path, encoding='utf-8') as f:
+            statements = split_statements(f.read())
+        assert statements, f'{version}_{name}'
+        assert not any(statement.endswith(';') for statement in statements)